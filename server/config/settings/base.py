@@ -152,6 +152,12 @@ CACHES = {
     },
 }
 
+# how often (in seconds) the process-local copy of a SingletonMixin
+# (ie: SafersSettings) is checked against the version in the shared cache
+SINGLETON_CACHE_CHECK_INTERVAL = env.float(
+    "DJANGO_SINGLETON_CACHE_CHECK_INTERVAL", default=5
+)
+
 #########
 # Admin #
 #########
@@ -246,6 +252,29 @@ FUSIONAUTH_INTERNAL_URL = env(
 )
 FUSIONAUTH_REDIRECT_URL = env("FUSIONAUTH_REDIRECT_URL", default="")
 
+# JWTs are verified locally against FusionAuth's (cached) public keys; tokens
+# which cannot be verified locally (ie: HS256) are validated remotely by
+# FusionAuth if FUSIONAUTH_REMOTE_JWT_VALIDATION is set
+FUSIONAUTH_LOCAL_JWT_VALIDATION = env.bool(
+    "FUSIONAUTH_LOCAL_JWT_VALIDATION", default=True
+)
+FUSIONAUTH_REMOTE_JWT_VALIDATION = env.bool(
+    "FUSIONAUTH_REMOTE_JWT_VALIDATION", default=True
+)
+FUSIONAUTH_JWT_KEYS_TIMEOUT = env.int(
+    "FUSIONAUTH_JWT_KEYS_TIMEOUT", default=3600
+)  # seconds
+FUSIONAUTH_JWT_LEEWAY = env.int("FUSIONAUTH_JWT_LEEWAY", default=0)  # seconds
+FUSIONAUTH_JWT_CACHE_SIZE = env.int("FUSIONAUTH_JWT_CACHE_SIZE", default=1024)
+
+# authenticated users are cached (per-process) for a short time
+SAFERS_AUTH_USER_CACHE_SIZE = env.int(
+    "DJANGO_SAFERS_AUTH_USER_CACHE_SIZE", default=1024
+)
+SAFERS_AUTH_USER_CACHE_TIMEOUT = env.int(
+    "DJANGO_SAFERS_AUTH_USER_CACHE_TIMEOUT", default=30
+)  # seconds
+
 #############
 # Passwords #
 #############
@@ -400,6 +429,8 @@ RMQ = {
         "USERNAME": env("DJANGO_RMQ_USERNAME", default=""),
         "PASSWORD": env("DJANGO_RMQ_PASSWORD", default=""),
         "APP_ID": env("DJANGO_RMQ_APP_ID", default="dsh"),
+        "WORKERS": env.int("DJANGO_RMQ_WORKERS", default=0),
+        "PREFETCH_COUNT": env.int("DJANGO_RMQ_PREFETCH_COUNT", default=0),
     }
 }
 
@@ -459,10 +490,66 @@ SAFERS_MAX_FAVORITE_CAMERA_MEDIA = DynamicSetting(
     3,
 )
 
+# build the in-memory country index in a background thread (tests build it
+# synchronously, since their Countries are never committed)
+SAFERS_COUNTRY_INDEX_BUILD_IN_BACKGROUND = env.bool(
+    "SAFERS_COUNTRY_INDEX_BUILD_IN_BACKGROUND", default=True
+)
+
+# (batching only applies when DJANGO_RMQ_WORKERS > 1; otherwise alerts are
+# processed one at a time regardless of SAFERS_ALERT_BATCH_SIZE)
+SAFERS_ALERT_BATCH_SIZE = env.int("SAFERS_ALERT_BATCH_SIZE", default=1)
+SAFERS_ALERT_BATCH_WINDOW = env.float("SAFERS_ALERT_BATCH_WINDOW", default=1.0)
+
 SAFERS_GATEWAY_URL = env(
     "SAFERS_GATEWAY_URL",
     default="https://api-test.safers-project.cloud/",
 )
+# max number of concurrent requests made to the gateway by a single call
+SAFERS_GATEWAY_MAX_WORKERS = env.int("SAFERS_GATEWAY_MAX_WORKERS", default=8)
+# number of (keep-alive) connections pooled per host; this should be at
+# least the number of threads per worker that make concurrent requests
+SAFERS_GATEWAY_POOL_SIZE = env.int(
+    "SAFERS_GATEWAY_POOL_SIZE", default=SAFERS_GATEWAY_MAX_WORKERS
+)
+# idempotent (GET) requests are retried w/ exponential backoff
+SAFERS_GATEWAY_MAX_RETRIES = env.int("SAFERS_GATEWAY_MAX_RETRIES", default=2)
+SAFERS_GATEWAY_RETRY_BACKOFF = env.float(
+    "SAFERS_GATEWAY_RETRY_BACKOFF", default=0.2
+)
+# max number of concurrent requests made to the gateway by each async
+# (ASGI) worker; SAFERS_ASYNC_PROXY_VIEWS serves the proxy views w/ async
+# views (which should only be enabled when running under ASGI)
+SAFERS_GATEWAY_ASYNC_MAX_CLIENTS = env.int(
+    "SAFERS_GATEWAY_ASYNC_MAX_CLIENTS", default=256
+)
+SAFERS_ASYNC_PROXY_VIEWS = env.bool("SAFERS_ASYNC_PROXY_VIEWS", default=False)
+SAFERS_GATEWAY_ORGANIZATIONS_MAX_DEPTH = env.int(
+    "SAFERS_GATEWAY_ORGANIZATIONS_MAX_DEPTH", default=10
+)
+SAFERS_ORGANIZATIONS_CACHE_TIMEOUT = env.int(
+    "SAFERS_ORGANIZATIONS_CACHE_TIMEOUT", default=60 * 60
+)
+# the layer catalog is cached (per-process) & refreshed in the background
+# for up to MAX_STALE seconds after it expires; new data (as announced by
+# RMQ) invalidates it straightaway
+SAFERS_GATEWAY_LAYERS_CACHE_TIMEOUT = env.int(
+    "SAFERS_GATEWAY_LAYERS_CACHE_TIMEOUT", default=60
+)
+SAFERS_GATEWAY_LAYERS_CACHE_MAX_STALE = env.int(
+    "SAFERS_GATEWAY_LAYERS_CACHE_MAX_STALE", default=10 * 60
+)
+# layer metadata doesn't change; it is cached per-process (up to SIZE
+# records) and in the db, in both cases for TIMEOUT seconds
+SAFERS_METADATA_CACHE_SIZE = env.int("SAFERS_METADATA_CACHE_SIZE", default=1024)
+SAFERS_METADATA_CACHE_TIMEOUT = env.int(
+    "SAFERS_METADATA_CACHE_TIMEOUT", default=7 * 24 * 60 * 60
+)
+# merged GetTimeSeries CSVs are cached (in the shared cache) per layer,
+# bbox & timestamps
+SAFERS_TIMESERIES_CACHE_TIMEOUT = env.int(
+    "SAFERS_TIMESERIES_CACHE_TIMEOUT", default=24 * 60 * 60
+)
 
 SAFERS_GEOSERVER_URL = env(
     "SAFERS_GEOSERVER_URL",
@@ -475,6 +562,22 @@ SAFERS_GEOSERVER_URLS = env(
     "https://geoserver-test1.safers-project.cloud/,https://geoserver-test2.safers-project.cloud/,https://geoserver-test3.safers-project.cloud/,https://geoserver-test4.safers-project.cloud/",
 ).split(",")
 
+# WMTS tiles can be served by a caching proxy rather than straight from
+# SAFERS_GEOSERVER_URLS; tiles are stored on disk (shared by every process
+# on the host) and the least recently used ones are evicted once the store
+# grows beyond MAX_SIZE bytes; only layers in the given GeoServer
+# workspaces can be requested through the proxy
+SAFERS_TILE_PROXY = env.bool("SAFERS_TILE_PROXY", default=False)
+SAFERS_TILE_PROXY_WORKSPACES = env(
+    "SAFERS_TILE_PROXY_WORKSPACES", default="ermes"
+).split(",")
+SAFERS_TILE_CACHE_DIR = env(
+    "SAFERS_TILE_CACHE_DIR", default=str(BASE_DIR / "_tiles")
+)
+SAFERS_TILE_CACHE_MAX_SIZE = env.int(
+    "SAFERS_TILE_CACHE_MAX_SIZE", default=1024 * 1024 * 1024
+)
+
 SAFERS_GEODATA_API_URL = env(
     "SAFERS_IMPORTER_API_URL",
     default="https://geoapi-test.safers-project.cloud/",
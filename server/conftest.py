@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def country_index(settings):
+    """
+    Builds the country index synchronously and from scratch for every test;
+    a background build would use its own db connection, which cannot see the
+    test's (uncommitted) Countries, and an index built by one test must not
+    be used by the next.
+    """
+    from safers.core.models import COUNTRY_INDEX
+
+    settings.SAFERS_COUNTRY_INDEX_BUILD_IN_BACKGROUND = False
+    COUNTRY_INDEX.clear()
+    yield COUNTRY_INDEX
+    COUNTRY_INDEX.clear()
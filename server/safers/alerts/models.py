@@ -12,7 +12,7 @@ from sequences import Sequence
 
 from safers.core.mixins import HashableMixin
 from safers.core.models import Country
-from safers.core.utils import CaseInsensitiveTextChoices, cap_area_to_geojson
+from safers.core.utils import CaseInsensitiveTextChoices, aggregate_geometries, cap_area_to_geojson
 from safers.rmq.exceptions import RMQException
 
 ALERT_SEQUENCE_GENERATOR = Sequence("alerts")
@@ -113,14 +113,17 @@ class AlertGeometry(HashableMixin, gis_models.Model):
         if self.geometry:
             return self.geometry.hexewkb
 
+    def calculate_geometries(self):
+        self.bounding_box = self.geometry.buffer(
+            self.MIN_BOUNDING_BOX_SIZE
+        ).envelope if self.geometry.geom_type == "Point" else self.geometry.envelope
+        self.center = self.geometry.centroid
+
     def save(self, *args, **kwargs):
         geometry_updated = False
         if self.hash_source and self.has_hash_source_changed(self.hash_source):
             geometry_updated = True
-            self.bounding_box = self.geometry.buffer(
-                self.MIN_BOUNDING_BOX_SIZE
-            ).envelope if self.geometry.geom_type == "Point" else self.geometry.envelope
-            self.center = self.geometry.centroid
+            self.calculate_geometries()
         super().save(*args, **kwargs)
         if geometry_updated:
             from safers.core.signals import geometry_updated as geometry_updated_signal
@@ -239,30 +242,21 @@ class Alert(models.Model):
             )
         )
 
+    def calculate_geometries(self, geometries, centers, bounding_boxes):
+        self.geometry_collection = GeometryCollection(*geometries)
+        self.center = GeometryCollection(*centers).centroid
+        self.bounding_box = GeometryCollection(*bounding_boxes).envelope
+
     def recalculate_geometries(self, force_save=True):
         """
         called by signal hander in response to one of the AlertGeometries having their geometry updated
         """
-        geometries_geometries = self.geometries.values(
-            "geometry", "bounding_box", "center"
-        )
-        self.geometry_collection = GeometryCollection(
-            *geometries_geometries.values_list("geometry", flat=True)
-        )
-        self.center = GeometryCollection(
-            *geometries_geometries.values_list("center", flat=True)
-        ).centroid
-        self.bounding_box = GeometryCollection(
-            *geometries_geometries.values_list("bounding_box", flat=True)
-        ).envelope
-
-        self.country = Country.objects.filter(
-            # geometry__intersects=self.geometry_collection  # TODO: if geometry_collection is malformed can potentially get "GEOSIntersects: TopologyException: side location conflict"
-            geometry__intersects=self.center
-        ).first()
+        values = aggregate_geometries(self.geometries, country_field="country")
+        for attr, value in values.items():
+            setattr(self, attr, value)
 
         if force_save:
-            self.save()
+            self.save(update_fields=[*values, "modified"])
 
     def save(self, *args, **kwargs):
         if not self.sequence_number:
@@ -351,6 +345,158 @@ class Alert(models.Model):
 
         return {"detail": [f"created alert: {alert}" for alert in alerts]}
 
+    @classmethod
+    def process_messages(cls, message_bodies, **kwargs):
+        """
+        Bulk version of `process_message`.  Rather than saving each alert and
+        geometry (and recalculating the alert geometries every time one of its
+        geometries is saved), this validates each message w/ AlertSerializer,
+        computes everything in memory and then uses `bulk_create`.  Returns a
+        list of results, one per message_body; the result of a message that
+        could not be processed is an RMQException rather than a dict, so that
+        one invalid message does not fail the rest of the batch.
+        """
+
+        from safers.alerts.serializers import AlertSerializer
+
+        results = []
+        messages_alerts = {}
+        messages_geometries = {}
+
+        for i, message_body in enumerate(message_bodies):
+            try:
+                message_type = message_body["msgType"]
+                assert message_type.lower() == "alert", f"attempting to process {message_type} as an Alert"
+
+                message_timestamp = message_body.get("sent")
+                message_status = message_body.get("status", "Actual")
+                message_source = message_body.get("source")
+                if message_source:
+                    message_source = AlertSource.find_enum(message_source)
+                message_scope = message_body.get("scope")
+                message_category = message_body.get("category")
+
+                message_alerts = []
+                message_geometries = []
+                for info in message_body["info"]:
+                    serializer = AlertSerializer(
+                        data={
+                            "timestamp":
+                                message_timestamp,
+                            "status":
+                                message_status,
+                            "source":
+                                message_source,
+                            "scope":
+                                message_scope,
+                            "category":
+                                message_category,
+                            "event":
+                                info.get("event"),
+                            "urgency":
+                                info.get("urgency"),
+                            "severity":
+                                info.get("severity"),
+                            "certainty":
+                                info.get("certainty"),
+                            "description":
+                                info.get("description"),
+                            "geometry":
+                                cap_area_to_geojson(info.get("area", []))
+                                ["features"],
+                            "message":
+                                message_body,
+                        }
+                    )
+                    serializer.is_valid(raise_exception=True)
+                    validated_data = dict(serializer.validated_data)
+                    geometries_data = validated_data.pop("geometries", [])
+
+                    alert = cls(
+                        sequence_number=next(ALERT_SEQUENCE_GENERATOR),
+                        **validated_data,
+                    )
+
+                    geometries = []
+                    for geometry_data in geometries_data:
+                        geometry = AlertGeometry(**geometry_data, alert=alert)
+                        geometry.calculate_geometries()
+                        geometry._hash = AlertGeometry.compute_hash(
+                            geometry.hash_source
+                        )
+                        geometries.append(geometry)
+
+                    alert.calculate_geometries(
+                        [geometry.geometry for geometry in geometries],
+                        [geometry.center for geometry in geometries],
+                        [geometry.bounding_box for geometry in geometries],
+                    )
+                    message_alerts.append(alert)
+                    message_geometries.extend(geometries)
+
+            except Exception as e:
+                results.append(
+                    RMQException(f"unable to process_messages: {e}")
+                )
+                continue
+
+            messages_alerts[i] = message_alerts
+            messages_geometries[i] = message_geometries
+            results.append(None)
+
+        alerts = [
+            alert for message_alerts in messages_alerts.values()
+            for alert in message_alerts
+        ]
+        # (this falls back to the db if the country index is unavailable)
+        for alert, country in zip(
+            alerts,
+            Country.objects.countries_for_points(
+                [alert.center for alert in alerts]
+            ),
+        ):
+            alert.country = country
+
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create(alerts)
+                AlertGeometry.objects.bulk_create([
+                    geometry
+                    for message_geometries in messages_geometries.values()
+                    for geometry in message_geometries
+                ])
+            created_messages = list(messages_alerts)
+
+        except Exception:
+            # the batch failed as a whole; retry each message in its own
+            # transaction so that only the messages that actually fail are
+            # reported as failures (a failed bulk_create leaves its objects'
+            # pks either unset or set consistently w/ their geometries, so
+            # they can be created again)
+            created_messages = []
+            for i, message_alerts in messages_alerts.items():
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_create(message_alerts)
+                        AlertGeometry.objects.bulk_create(
+                            messages_geometries[i]
+                        )
+                    created_messages.append(i)
+                except Exception as e:
+                    results[i] = RMQException(
+                        f"unable to process_messages: {e}"
+                    )
+
+        # only describe alerts once they (and their countries) are saved
+        for i in created_messages:
+            results[i] = {
+                "detail": [
+                    f"created alert: {alert}" for alert in messages_alerts[i]
+                ]
+            }
+
+        return results
+
 
 #################
 # ALERT MESSAGE #
@@ -3,6 +3,8 @@ from rest_framework_gis import serializers as gis_serializers
 
 from drf_spectacular.utils import extend_schema_field
 
+from safers.core.signals import GeometryRecalculationScope
+
 from safers.alerts.models import Alert, AlertGeometry, AlertType
 
 
@@ -69,9 +71,11 @@ class AlertSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         geometries_data = validated_data.pop("geometries", {})
         alert = super().create(validated_data)
-        for geometry_data in geometries_data:
-            alert_geometry = AlertGeometry(**geometry_data, alert=alert)
-            alert_geometry.save()
+        with GeometryRecalculationScope():
+            # recalculate the alert geometries once, rather than once per AlertGeometry
+            for geometry_data in geometries_data:
+                alert_geometry = AlertGeometry(**geometry_data, alert=alert)
+                alert_geometry.save()
         return alert
 
 
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+
+# Benchmark comparing the (old) Python-side aggregation of an Alert's geometries
+# (loading every AlertGeometry into GEOS) w/ the PostGIS-side aggregation used
+# by Alert.recalculate_geometries; the alert geometries are the (large) AOI
+# polygons from "safers/aois/fixtures"; nothing is committed to the db (run
+# from the "server" directory):
+# $ python -m safers.alerts.tests.benchmark_geometries [n_iterations]
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_aoi_geometries():
+    import glob
+    import json
+    import os
+
+    from django.contrib.gis import geos
+
+    from safers import aois
+
+    aoi_geometries = []
+    aoi_fixture_paths = sorted(
+        glob.glob(
+            os.path.join(os.path.dirname(aois.__file__), "fixtures", "*.geojson")
+        )
+    )
+    for aoi_fixture_path in aoi_fixture_paths:
+        with open(aoi_fixture_path) as fp:
+            for feature in json.load(fp)["features"]:
+                aoi_geometries.append(
+                    geos.GEOSGeometry(json.dumps(feature["geometry"]))
+                )
+
+    return aoi_geometries
+
+
+def recalculate_geometries_in_python(alert):
+    # this is what Alert.recalculate_geometries used to do
+    from safers.core.models import Country
+
+    geometries_geometries = alert.geometries.values(
+        "geometry", "bounding_box", "center"
+    )
+    alert.calculate_geometries(
+        geometries_geometries.values_list("geometry", flat=True),
+        geometries_geometries.values_list("center", flat=True),
+        geometries_geometries.values_list("bounding_box", flat=True),
+    )
+    alert.country = Country.objects.filter(geometry__intersects=alert.center
+                                          ).first()
+    alert.save()
+
+
+def time_recalculation(fn, alert, n_iterations):
+    import time
+
+    start = time.perf_counter()
+    for _ in range(n_iterations):
+        fn(alert)
+    return time.perf_counter() - start
+
+
+def run_benchmark(n_iterations=50):
+    from django.db import transaction
+
+    from safers.alerts.models import Alert, AlertGeometry
+
+    aoi_geometries = get_aoi_geometries()
+
+    try:
+        with transaction.atomic():
+            alert = Alert.objects.create()
+            for aoi_geometry in aoi_geometries:
+                # AlertGeometry.save computes center & bounding_box
+                AlertGeometry(alert=alert, geometry=aoi_geometry).save()
+
+            python_time = time_recalculation(
+                recalculate_geometries_in_python, alert, n_iterations
+            )
+            postgis_time = time_recalculation(
+                Alert.recalculate_geometries, alert, n_iterations
+            )
+            raise Rollback()
+    except Rollback:
+        pass
+
+    n_points = sum(aoi_geometry.num_points for aoi_geometry in aoi_geometries)
+    print(f"recalculated an alert w/ {len(aoi_geometries)} geometries ({n_points} points) {n_iterations} times")  # yapf: disable
+    print(f"python:  {python_time:.2f}s ({1000 * python_time / n_iterations:.1f}ms/recalculation)")  # yapf: disable
+    print(f"postgis: {postgis_time:.2f}s ({1000 * postgis_time / n_iterations:.1f}ms/recalculation)")  # yapf: disable
+    print(f"speedup: {python_time / postgis_time:.1f}x")
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    run_benchmark(*map(int, sys.argv[1:2]))
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+# Benchmark comparing per-message alert ingestion (Alert.process_message) w/
+# bulk ingestion (Alert.process_messages) by replaying stored alert messages;
+# nothing is committed to the db (run from the "server" directory):
+# $ python -m safers.alerts.tests.benchmark_ingestion [n_messages] [batch_size]
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_message_bodies(n_messages):
+    from copy import deepcopy
+    from itertools import cycle, islice
+
+    from safers.rmq.models import Message
+    from safers.alerts.tests.test_alerts import TestAlertMessages
+
+    stored_message_bodies = list(
+        Message.objects.filter(routing_key__startswith="alert.").values_list(
+            "body", flat=True
+        )
+    ) or [TestAlertMessages.MESSAGE_BODY]
+
+    return [
+        deepcopy(message_body)
+        for message_body in islice(cycle(stored_message_bodies), n_messages)
+    ]
+
+
+def time_ingestion(fn, message_bodies):
+    import time
+
+    from django.db import transaction
+
+    start = time.perf_counter()
+    try:
+        with transaction.atomic():
+            fn(message_bodies)
+            raise Rollback()
+    except Rollback:
+        pass
+    return time.perf_counter() - start
+
+
+def run_benchmark(n_messages=2000, batch_size=100):
+    from safers.core.utils import chunk
+    from safers.alerts.models import Alert
+
+    message_bodies = get_message_bodies(n_messages)
+
+    def _process_message(message_bodies):
+        for message_body in message_bodies:
+            Alert.process_message(message_body)
+
+    def _process_messages(message_bodies):
+        for message_bodies_chunk in chunk(message_bodies, batch_size):
+            Alert.process_messages(message_bodies_chunk)
+
+    single_time = time_ingestion(_process_message, message_bodies)
+    bulk_time = time_ingestion(_process_messages, message_bodies)
+
+    print(f"replayed {n_messages} alert messages")
+    print(f"process_message:  {single_time:.2f}s ({n_messages / single_time:.1f} messages/s)")  # yapf: disable
+    print(f"process_messages: {bulk_time:.2f}s ({n_messages / bulk_time:.1f} messages/s) [batch_size={batch_size}]")  # yapf: disable
+    print(f"speedup:          {single_time / bulk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    run_benchmark(*map(int, sys.argv[1:3]))
@@ -1,9 +1,13 @@
+import json
 import pytest
 import urllib
 
+from copy import deepcopy
 from datetime import timedelta
 
 from django.conf import settings
+from django.contrib.gis import geos
+from django.db.models.signals import post_save
 from django.urls import resolve, reverse
 from django.utils import timezone
 
@@ -11,8 +15,12 @@ from rest_framework import status
 
 from .factories import *
 
-from safers.alerts.models import Alert
+from safers.core.models import Country, COUNTRY_INDEX
+from safers.core.signals import GeometryRecalculationScope, GEOMETRY_RECALCULATION_COUNTERS
+
+from safers.alerts.models import Alert, AlertGeometry
 from safers.events.models import Event
+from safers.rmq.exceptions import RMQException
 
 
 @pytest.mark.django_db
@@ -49,6 +57,126 @@ class TestAlertViews:
         assert content[1]["id"] == str(alerts[2].id)
         assert content[2]["id"] == str(alerts[0].id)
 
+    @pytest.mark.parametrize("order", ["-date", "date"])
+    def test_keyset_pagination(self, order, remote_user, api_client):
+
+        TODAY = timezone.now()
+
+        alerts = [
+            AlertFactory(timestamp=TODAY + timedelta(days=i % 3))
+            for i in range(7)
+        ]
+        remote_user.favorite_alerts.add(alerts[3], alerts[4])
+
+        client = api_client(remote_user)
+        url = f"{reverse('alerts-list')}?order={order}&default_bbox=false&default_date=false"
+
+        response = client.get(url, format="json")
+        unpaginated_ids = [alert["id"] for alert in response.json()]
+
+        paginated_ids = []
+        next_url = f"{url}&page_size=3"
+        n_pages = 0
+        while next_url:
+            response = client.get(next_url, format="json")
+            content = response.json()
+            assert status.is_success(response.status_code)
+            assert len(content["results"]) <= 3
+            paginated_ids.extend(alert["id"] for alert in content["results"])
+            next_url = content["next"]
+            n_pages += 1
+
+        assert n_pages == 3
+        assert len(paginated_ids) == len(alerts)
+        assert set(paginated_ids) == set(unpaginated_ids)
+        # favorites come first
+        assert set(paginated_ids[:2]) == {str(alerts[3].id), str(alerts[4].id)}
+
+        # going backwards returns the previous page
+        response = client.get(f"{url}&page_size=3", format="json")
+        first_page = response.json()
+        response = client.get(first_page["next"], format="json")
+        second_page = response.json()
+        response = client.get(second_page["previous"], format="json")
+        assert response.json()["results"] == first_page["results"]
+        assert response.json()["previous"] is None
+
+    def test_keyset_pagination_default_order(self, remote_user, api_client):
+
+        TODAY = timezone.now()
+
+        alerts = [
+            AlertFactory(timestamp=TODAY + timedelta(hours=i)) for i in range(5)
+        ]
+        remote_user.favorite_alerts.add(alerts[1])
+
+        client = api_client(remote_user)
+        url = f"{reverse('alerts-list')}?default_bbox=false&default_date=false"
+
+        response = client.get(url, format="json")
+        unpaginated_ids = [alert["id"] for alert in response.json()]
+
+        response = client.get(f"{url}&page_size=10", format="json")
+        paginated_ids = [alert["id"] for alert in response.json()["results"]]
+
+        # favorites first, then most-recent-first; paginated or not
+        assert paginated_ids == unpaginated_ids
+        assert unpaginated_ids == [
+            str(alert.id)
+            for alert in [alerts[1], alerts[4], alerts[3], alerts[2], alerts[0]]
+        ]
+
+    def test_keyset_pagination_microseconds(self, remote_user, api_client):
+
+        TIMESTAMP = timezone.now().replace(microsecond=500)
+
+        alerts = [
+            AlertFactory(timestamp=TIMESTAMP + timedelta(microseconds=i))
+            for i in range(2)
+        ]
+
+        client = api_client(remote_user)
+        url = f"{reverse('alerts-list')}?default_bbox=false&default_date=false"
+
+        response = client.get(f"{url}&page_size=1", format="json")
+        first_page = response.json()
+        response = client.get(first_page["next"], format="json")
+        second_page = response.json()
+
+        # alerts 1µs apart straddle the page boundary w/out being skipped or repeated
+        assert [alert["id"] for alert in first_page["results"]] == [str(alerts[1].id)]
+        assert [alert["id"] for alert in second_page["results"]] == [str(alerts[0].id)]
+        assert second_page["next"] is None
+
+    def test_geojson_stream(self, remote_user, api_client):
+
+        alerts = AlertFactory.create_batch(3)
+
+        client = api_client(remote_user)
+        url = f"{reverse('alerts-list')}?default_bbox=false&default_date=false"
+
+        response = client.get(url, format="json")
+        content = response.json()
+
+        response = client.get(f"{url}&format=geojson-stream")
+        assert status.is_success(response.status_code)
+        assert response.streaming
+        assert response["Content-Type"] == "application/geo+json"
+
+        feature_collection = json.loads(
+            b"".join(response.streaming_content)
+        )
+        assert feature_collection["type"] == "FeatureCollection"
+        features = feature_collection["features"]
+        assert len(features) == len(alerts)
+        content_by_id = {data["id"]: data for data in content}
+        for feature in features:
+            data = content_by_id[feature["id"]]
+            assert feature["geometry"]["type"] == "GeometryCollection"
+            assert feature["properties"] == {
+                k: v for k, v in data.items() if k != "geometry"
+            }
+
     def test_favorite_alert(self, remote_user, api_client):
         alert = AlertFactory()
 
@@ -143,3 +271,257 @@ class TestAlertViews:
         event = Event.objects.first()
         assert alert1 not in event.alerts.all()
         assert alert2 in event.alerts.all()
+
+
+@pytest.mark.django_db
+class TestAlertMessages:
+
+    MESSAGE_BODY = {
+        "identifier": "identifier",
+        "sender": "sem",
+        "sent": "2022-04-13T14:28:25+03:00",
+        "status": "Actual",
+        "msgType": "Alert",
+        "source": "DSS",
+        "scope": "Public",
+        "code": [],
+        "info": [
+            {
+                "category": "Fire ",
+                "event": "Fire detection in area",
+                "urgency": "Immediate",
+                "severity": "Severe",
+                "certainty": "Likely",
+                "description": "There's a fire in this location",
+                "area": [
+                    {"areaDesc": "some point", "point": "40.648142, 22.95255"},
+                    {"areaDesc": "some polygon", "polygon": "40.1, 22.1 40.2, 22.2 40.1, 22.3 40.1, 22.1"},
+                ]
+            },
+            {
+                "category": "Fire ",
+                "event": "Fire detection in area",
+                "description": "There's another fire in this location",
+                "area": [
+                    {"areaDesc": "some circle", "circle": "40.5, 22.5 0.1"},
+                ]
+            },
+        ]
+    }  # yapf: disable
+
+    def test_process_messages(self):
+
+        N_MESSAGES = 3
+
+        results = Alert.process_messages([
+            deepcopy(self.MESSAGE_BODY) for _ in range(N_MESSAGES)
+        ])
+
+        assert len(results) == N_MESSAGES
+        assert Alert.objects.count() == N_MESSAGES * 2
+        assert AlertGeometry.objects.count() == N_MESSAGES * 3
+
+        for alert in Alert.objects.all():
+            geometry_collection = alert.geometry_collection
+            center = alert.center
+            bounding_box = alert.bounding_box
+
+            # the bulk-computed geometries should match the per-alert ones
+            alert.recalculate_geometries(force_save=False)
+            assert geometry_collection.equals_exact(alert.geometry_collection)
+            assert center.equals_exact(alert.center, tolerance=1e-9)
+            assert bounding_box.equals_exact(alert.bounding_box, tolerance=1e-9)
+
+            assert alert.sequence_number is not None
+
+    def test_process_messages_invalid_message(self):
+
+        invalid_message_body = deepcopy(self.MESSAGE_BODY)
+        invalid_message_body["sent"] = "not a timestamp"
+
+        results = Alert.process_messages([
+            deepcopy(self.MESSAGE_BODY),
+            invalid_message_body,
+            deepcopy(self.MESSAGE_BODY),
+        ])
+
+        # only the invalid message fails
+        assert isinstance(results[1], RMQException)
+        assert not isinstance(results[0], Exception)
+        assert not isinstance(results[2], Exception)
+        assert Alert.objects.count() == 2 * 2
+
+    def test_process_messages_retries_failed_batch(self, monkeypatch):
+
+        failing_message_body = deepcopy(self.MESSAGE_BODY)
+        failing_message_body["info"][1]["area"][0]["areaDesc"] = "failing"
+
+        bulk_create = AlertGeometry.objects.bulk_create
+
+        def _bulk_create(objs, *args, **kwargs):
+            if any(obj.description == "failing" for obj in objs):
+                raise ValueError("unable to create geometries")
+            return bulk_create(objs, *args, **kwargs)
+
+        monkeypatch.setattr(AlertGeometry.objects, "bulk_create", _bulk_create)
+
+        results = Alert.process_messages([
+            failing_message_body,
+            deepcopy(self.MESSAGE_BODY),
+        ])
+
+        # the batch is rolled back & each message is retried on its own
+        assert isinstance(results[0], RMQException)
+        assert not isinstance(results[1], Exception)
+        assert Alert.objects.count() == 2
+        assert AlertGeometry.objects.count() == 3
+        assert not AlertGeometry.objects.filter(description="failing").exists()
+
+    def test_process_messages_details(self, monkeypatch):
+
+        country = Country.objects.create(
+            sovereign_name="Everywhere",
+            sovereign_code="EVR",
+            admin_name="Everywhere",
+            admin_code="EVR",
+            geometry=geos.Polygon.from_bbox((-180, -90, 180, 90)),
+        )
+
+        def _query(points):
+            raise ValueError("broken index")
+
+        monkeypatch.setattr(COUNTRY_INDEX, "query", _query)
+
+        results = Alert.process_messages([deepcopy(self.MESSAGE_BODY)])
+
+        # countries are still assigned w/out the index, and the alerts are
+        # only reported once they have been saved
+        alerts = Alert.objects.order_by("sequence_number")
+        assert all(alert.country == country for alert in alerts)
+        assert results[0]["detail"] == [
+            f"created alert: {alert}" for alert in alerts
+        ]
+
+    def test_process_messages_matches_process_message(self):
+
+        Alert.process_message(deepcopy(self.MESSAGE_BODY))
+        Alert.process_messages([deepcopy(self.MESSAGE_BODY)])
+
+        alert_single, alert_bulk = Alert.objects.filter(
+            description="There's a fire in this location"
+        ).order_by("sequence_number")
+        for field in [
+            "timestamp", "status", "source", "scope", "category", "event",
+            "urgency", "severity", "certainty", "country"
+        ]:
+            assert getattr(alert_single, field) == getattr(alert_bulk, field)
+
+
+@pytest.mark.django_db
+class TestAlertGeometryRecalculation:
+    def test_recalculation_scope(self, monkeypatch):
+
+        N_GEOMETRIES = 4
+
+        alert = AlertFactory(geometries=N_GEOMETRIES)
+
+        n_recalculations = 0
+        recalculate_geometries = Alert.recalculate_geometries
+
+        def _recalculate_geometries(instance, *args, **kwargs):
+            nonlocal n_recalculations
+            n_recalculations += 1
+            return recalculate_geometries(instance, *args, **kwargs)
+
+        monkeypatch.setattr(
+            Alert, "recalculate_geometries", _recalculate_geometries
+        )
+        GEOMETRY_RECALCULATION_COUNTERS.reset()
+
+        with GeometryRecalculationScope():
+            with GeometryRecalculationScope():
+                for alert_geometry in alert.geometries.all():
+                    alert_geometry.geometry = alert_geometry.geometry.buffer(1)
+                    alert_geometry.save()
+            # nothing is recalculated until the outermost scope exits
+            assert n_recalculations == 0
+
+        # (and then it is recalculated straightaway, in the same transaction)
+        assert n_recalculations == 1
+        assert GEOMETRY_RECALCULATION_COUNTERS.as_dict() == {
+            "requested": N_GEOMETRIES,
+            "recalculated": 1,
+            "coalesced": N_GEOMETRIES - 1,
+        }
+
+        alert.refresh_from_db()
+        assert len(alert.geometry_collection) == N_GEOMETRIES
+
+    def test_no_recalculation_scope(self):
+
+        alert = AlertFactory(geometries=2)
+
+        GEOMETRY_RECALCULATION_COUNTERS.reset()
+
+        for alert_geometry in alert.geometries.all():
+            alert_geometry.geometry = alert_geometry.geometry.buffer(1)
+            alert_geometry.save()
+
+        assert GEOMETRY_RECALCULATION_COUNTERS.coalesced == 0
+        assert GEOMETRY_RECALCULATION_COUNTERS.recalculated == 2
+
+    def test_recalculate_geometries_matches_calculate_geometries(self):
+
+        alert = AlertFactory(geometries=3)
+        alert_geometries = list(alert.geometries.all())
+
+        expected_alert = Alert(pk=alert.pk)
+        expected_alert.calculate_geometries(
+            [alert_geometry.geometry for alert_geometry in alert_geometries],
+            [alert_geometry.center for alert_geometry in alert_geometries],
+            [alert_geometry.bounding_box for alert_geometry in alert_geometries],
+        )
+
+        alert.recalculate_geometries(force_save=False)
+        assert alert.geometry_collection.equals(
+            expected_alert.geometry_collection
+        )
+        assert alert.center.equals_exact(expected_alert.center, 1e-9)
+        assert alert.bounding_box.equals(expected_alert.bounding_box)
+
+        alert.recalculate_geometries(force_save=True)
+        alert.refresh_from_db()
+        assert alert.geometry_collection.equals(
+            expected_alert.geometry_collection
+        )
+        assert alert.center.equals_exact(expected_alert.center, 1e-9)
+
+    def test_recalculate_geometries_saves(self):
+
+        alert = AlertFactory(geometries=2)
+
+        saved_update_fields = []
+
+        def _post_save_handler(sender, instance, update_fields, **kwargs):
+            saved_update_fields.append(update_fields)
+
+        post_save.connect(_post_save_handler, sender=Alert)
+        try:
+            alert.recalculate_geometries(force_save=True)
+        finally:
+            post_save.disconnect(_post_save_handler, sender=Alert)
+
+        # the recalculated geometries are saved via Model.save
+        assert len(saved_update_fields) == 1
+        assert {"geometry_collection", "center", "bounding_box"
+               } <= set(saved_update_fields[0])
+
+    def test_recalculate_geometries_no_geometries(self):
+
+        alert = AlertFactory(geometries=1)
+        alert.geometries.all().delete()
+
+        alert.recalculate_geometries(force_save=True)
+        alert.refresh_from_db()
+        assert alert.geometry_collection is not None
+        assert alert.geometry_collection.empty
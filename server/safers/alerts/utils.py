@@ -0,0 +1,35 @@
+import threading
+
+from django.conf import settings
+
+from safers.rmq.buffers import MessageBuffer
+
+from safers.alerts.models import Alert
+
+_ALERT_MESSAGE_BUFFER = None
+_ALERT_MESSAGE_BUFFER_LOCK = threading.Lock()
+
+
+def get_alert_message_buffer():
+    global _ALERT_MESSAGE_BUFFER
+    with _ALERT_MESSAGE_BUFFER_LOCK:
+        if _ALERT_MESSAGE_BUFFER is None:
+            _ALERT_MESSAGE_BUFFER = MessageBuffer(
+                Alert.process_messages,
+                max_size=settings.SAFERS_ALERT_BATCH_SIZE,
+                max_wait=settings.SAFERS_ALERT_BATCH_WINDOW,
+            )
+        return _ALERT_MESSAGE_BUFFER
+
+
+def process_messages(message_body, **kwargs):
+    """
+    Handler for alert messages.  If SAFERS_ALERT_BATCH_SIZE is greater than 1
+    and there are several RMQ workers then messages received concurrently are
+    buffered and created in bulk, otherwise each message is processed as soon
+    as it is received (w/ a single consumer a batch could only ever contain
+    one message, and waiting for more would just block the consumer).
+    """
+    if settings.SAFERS_ALERT_BATCH_SIZE > 1 and settings.RMQ["default"]["WORKERS"] > 1:  # yapf: disable
+        return get_alert_message_buffer().add(message_body, **kwargs)
+    return Alert.process_message(message_body, **kwargs)
@@ -18,7 +18,9 @@ from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema, extend_schema_field, OpenApiExample, OpenApiResponse, OpenApiTypes
 
 from safers.core.decorators import swagger_fake
+from safers.core.generics import GeoJSONStreamListModelMixin
 from safers.core.filters import CaseInsensitiveChoiceFilter, DefaultFilterSetMixin, MultiFieldOrderingFilter
+from safers.core.pagination import FavoriteKeysetPagination
 
 from safers.alerts.models import Alert, AlertType, AlertSource
 from safers.alerts.serializers import AlertViewSetSerializer
@@ -43,7 +45,9 @@ class AlertFilterSet(DefaultFilterSetMixin, filters.FilterSet):
     source = CaseInsensitiveChoiceFilter(choices=AlertSource.choices)
 
     order = MultiFieldOrderingFilter(
-        fields=(("timestamp", "date"), ), multi_fields=["-favorite"]
+        fields=(("timestamp", "date"), ),
+        multi_fields=["-favorite"],
+        default=["-date"],
     )
 
     start_date = filters.DateFilter(
@@ -110,6 +114,7 @@ class AlertFilterSet(DefaultFilterSetMixin, filters.FilterSet):
 
 
 class AlertViewSet(
+    GeoJSONStreamListModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -118,6 +123,7 @@ class AlertViewSet(
 
     filter_backends = (filters.DjangoFilterBackend, )
     filterset_class = AlertFilterSet
+    pagination_class = FavoriteKeysetPagination
 
     lookup_field = "id"
     lookup_url_kwarg = "alert_id"
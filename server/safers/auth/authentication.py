@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from rest_framework.authentication import (
@@ -8,7 +9,9 @@ from rest_framework.authentication import (
 from rest_framework.exceptions import AuthenticationFailed
 
 from safers.auth.clients import AUTH_CLIENT
+from safers.auth.tokens import InvalidTokenError, TokenVerificationUnavailable, JWT_VERIFIER, VERIFIED_TOKEN_CACHE
 from safers.auth.utils import reshape_auth_errors
+from safers.users.caches import AUTHENTICATED_USER_CACHE
 
 UserModel = get_user_model()
 
@@ -26,11 +29,7 @@ class OAuth2Authentication(BaseAuthentication):
         if not access_token:
             return None
 
-        auth_jwt_response = AUTH_CLIENT.validate_jwt(access_token)
-        if not auth_jwt_response.was_successful():
-            errors = reshape_auth_errors(auth_jwt_response.error_response)
-            raise AuthenticationFailed(errors)
-        auth_jwt = auth_jwt_response.success_response["jwt"]
+        auth_jwt = self.verify_access_token(access_token)
         auth_id = auth_jwt["sub"]
 
         # TODO: THE JWT HAS THE ID IN IT ALREADY,
@@ -43,13 +42,61 @@ class OAuth2Authentication(BaseAuthentication):
         #     raise AuthenticationFailed(errors)
         # auth_id = auth_user_response.success_response["sub"]
 
+        user = self.get_user(auth_id)
+
+        return user, access_token
+
+    def get_user(self, auth_id):
+        """
+        Returns the active user w/ auth_id (and their default_aoi); users are
+        cached for a short time since every (polling) request needs them.
+        """
+        user = AUTHENTICATED_USER_CACHE.get(auth_id)
+        if user is not None:
+            return user
+
         try:
-            user = UserModel.objects.active().get(auth_id=auth_id)
+            user = UserModel.objects.active().select_related(
+                "default_aoi"
+            ).get(auth_id=auth_id)
         except UserModel.DoesNotExist as e:
             msg = "User does not exist"
             raise AuthenticationFailed(msg) from e
 
-        return user, access_token
+        AUTHENTICATED_USER_CACHE.set(auth_id, user)
+
+        return user
+
+    def verify_access_token(self, access_token):
+        """
+        Returns the claims of access_token.  The token is verified locally if
+        possible, and by FusionAuth otherwise; verified tokens are cached
+        until they expire.
+        """
+        auth_jwt = VERIFIED_TOKEN_CACHE.get(access_token)
+        if auth_jwt is not None:
+            return auth_jwt
+
+        auth_jwt = None
+        if settings.FUSIONAUTH_LOCAL_JWT_VALIDATION:
+            try:
+                auth_jwt = JWT_VERIFIER.verify(access_token)
+            except InvalidTokenError as e:
+                raise AuthenticationFailed(str(e)) from e
+            except TokenVerificationUnavailable as e:
+                if not settings.FUSIONAUTH_REMOTE_JWT_VALIDATION:
+                    raise AuthenticationFailed(str(e)) from e
+
+        if auth_jwt is None:
+            auth_jwt_response = AUTH_CLIENT.validate_jwt(access_token)
+            if not auth_jwt_response.was_successful():
+                errors = reshape_auth_errors(auth_jwt_response.error_response)
+                raise AuthenticationFailed(errors)
+            auth_jwt = auth_jwt_response.success_response["jwt"]
+
+        VERIFIED_TOKEN_CACHE.set(access_token, auth_jwt)
+
+        return auth_jwt
 
     def get_access_token(self, request):
         """
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+# Benchmark of the per-request overhead of verifying an access token in
+# OAuth2Authentication: remote validation by FusionAuth (the old behaviour)
+# vs local verification vs a cached verification (run from the "server"
+# directory; if no FusionAuth access token is provided then remote validation
+# is not measured):
+# $ python -m safers.auth.tests.benchmark_authentication [n_requests] [access_token]
+
+
+def time_verification(fn, token, n_requests):
+    import time
+
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        fn(token)
+    return time.perf_counter() - start
+
+
+def run_benchmark(n_requests=1000, access_token=None):
+    import time
+
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    from safers.auth.clients import AUTH_CLIENT
+    from safers.auth.tokens import JWTPublicKeySet, JWTVerifier, VerifiedTokenCache
+    from safers.auth.tests.test_authentication import create_jwt
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_set = JWTPublicKeySet()
+    key_set.set_keys({"test": private_key.public_key()})
+    verifier = JWTVerifier(key_set)
+    token = create_jwt(
+        private_key, {"sub": "some-auth-id", "exp": int(time.time()) + 3600}
+    )
+
+    token_cache = VerifiedTokenCache()
+
+    def _cached_verify(token):
+        claims = token_cache.get(token)
+        if claims is None:
+            claims = verifier.verify(token)
+            token_cache.set(token, claims)
+        return claims
+
+    timings = {}
+    if access_token:
+        timings["remote"] = time_verification(
+            AUTH_CLIENT.validate_jwt, access_token, n_requests
+        )
+    timings["local"] = time_verification(verifier.verify, token, n_requests)
+    timings["cached"] = time_verification(_cached_verify, token, n_requests)
+
+    print(f"verified {n_requests} access tokens")
+    for name, timing in timings.items():
+        print(f"{name + ':':<8}{timing:.3f}s ({1e6 * timing / n_requests:.1f}us/request)")  # yapf: disable
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    run_benchmark(*[int(arg) if i == 0 else arg for i, arg in enumerate(sys.argv[1:3])])
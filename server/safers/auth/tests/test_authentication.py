@@ -0,0 +1,226 @@
+import base64
+import json
+import pytest
+import time
+import uuid
+from unittest import mock
+
+from rest_framework.exceptions import AuthenticationFailed
+
+from safers.auth.authentication import OAuth2Authentication
+from safers.users.caches import AUTHENTICATED_USER_CACHE
+from safers.users.tests.factories import UserFactory
+from safers.auth.tokens import JWTPublicKeySet, JWTVerifier, InvalidTokenError, TokenVerificationUnavailable, VERIFIED_TOKEN_CACHE, JWT_PUBLIC_KEY_SET
+
+cryptography = pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+
+def base64url_encode(value):
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def create_jwt(private_key, claims, kid="test", alg="RS256"):
+    encoded_header = base64url_encode(
+        json.dumps({"alg": alg, "typ": "JWT", "kid": kid}).encode()
+    )
+    encoded_payload = base64url_encode(json.dumps(claims).encode())
+    signature = private_key.sign(
+        f"{encoded_header}.{encoded_payload}".encode("ascii"),
+        padding.PKCS1v15(),
+        hashes.SHA256(),
+    )
+    return f"{encoded_header}.{encoded_payload}.{base64url_encode(signature)}"
+
+
+@pytest.fixture
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def key_set(private_key):
+    key_set = JWTPublicKeySet()
+    key_set.set_keys({"test": private_key.public_key()})
+    return key_set
+
+
+class TestJWTVerifier:
+    def test_verify(self, private_key, key_set):
+        claims = {"sub": "some-auth-id", "exp": int(time.time()) + 60}
+        token = create_jwt(private_key, claims)
+
+        verifier = JWTVerifier(key_set)
+        assert verifier.verify(token) == claims
+
+    def test_verify_expired(self, private_key, key_set):
+        claims = {"sub": "some-auth-id", "exp": int(time.time()) - 60}
+        token = create_jwt(private_key, claims)
+
+        verifier = JWTVerifier(key_set)
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token)
+
+    def test_verify_tampered(self, private_key, key_set):
+        claims = {"sub": "some-auth-id", "exp": int(time.time()) + 60}
+        encoded_header, _, encoded_signature = create_jwt(
+            private_key, claims
+        ).split(".")
+        encoded_payload = base64url_encode(
+            json.dumps({**claims, "sub": "some-other-auth-id"}).encode()
+        )
+        token = f"{encoded_header}.{encoded_payload}.{encoded_signature}"
+
+        verifier = JWTVerifier(key_set)
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token)
+
+    def test_verify_rotated_key(self, private_key, key_set):
+        claims = {"sub": "some-auth-id", "exp": int(time.time()) + 60}
+        token = create_jwt(private_key, claims, kid="rotated")
+
+        verifier = JWTVerifier(key_set)
+        key_set.fetched_at -= key_set.min_refresh_interval
+        with mock.patch.object(
+            key_set,
+            "fetch_keys",
+            return_value={"rotated": private_key.public_key()},
+        ) as mock_fetch_keys:
+            assert verifier.verify(token) == claims
+            assert mock_fetch_keys.call_count == 1
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            ["some-auth-id"],
+            "some-auth-id",
+            {"sub": "some-auth-id"},
+            {"sub": "some-auth-id", "exp": "tomorrow"},
+            {"sub": "some-auth-id", "exp": True},
+            {"sub": "some-auth-id", "exp": int(time.time()) + 60, "nbf": "today"},
+        ],
+    )
+    def test_verify_invalid_claims(self, private_key, key_set, claims):
+        token = create_jwt(private_key, claims)
+
+        verifier = JWTVerifier(key_set)
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token)
+
+    @pytest.mark.parametrize("header", [["RS256"], "RS256", 1])
+    def test_verify_invalid_header(self, key_set, header):
+        token = ".".join([
+            base64url_encode(json.dumps(header).encode()),
+            base64url_encode(json.dumps({"sub": "some-auth-id"}).encode()),
+            base64url_encode(b"signature"),
+        ])
+
+        verifier = JWTVerifier(key_set)
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(token)
+
+    def test_verify_unsupported_algorithm(self, key_set):
+        token = ".".join([
+            base64url_encode(json.dumps({"alg": "HS256"}).encode()),
+            base64url_encode(json.dumps({"sub": "some-auth-id"}).encode()),
+            base64url_encode(b"signature"),
+        ])
+
+        verifier = JWTVerifier(key_set)
+        with pytest.raises(TokenVerificationUnavailable):
+            verifier.verify(token)
+
+
+class TestOAuth2Authentication:
+    def test_verify_access_token_is_cached(self, private_key, settings):
+        settings.FUSIONAUTH_REMOTE_JWT_VALIDATION = False
+
+        claims = {"sub": "some-auth-id", "exp": int(time.time()) + 60}
+        token = create_jwt(private_key, claims)
+
+        VERIFIED_TOKEN_CACHE.clear()
+        JWT_PUBLIC_KEY_SET.set_keys({"test": private_key.public_key()})
+
+        authentication = OAuth2Authentication()
+        with mock.patch(
+            "safers.auth.authentication.AUTH_CLIENT.validate_jwt"
+        ) as mock_validate_jwt:
+            assert authentication.verify_access_token(token) == claims
+            assert authentication.verify_access_token(token) == claims
+            assert mock_validate_jwt.call_count == 0
+        assert VERIFIED_TOKEN_CACHE.hits == 1
+        assert VERIFIED_TOKEN_CACHE.misses == 1
+
+    def test_verify_access_token_remote_fallback(self, settings):
+        settings.FUSIONAUTH_REMOTE_JWT_VALIDATION = True
+
+        claims = {"sub": "some-auth-id", "exp": int(time.time()) + 60}
+        token = ".".join([
+            base64url_encode(json.dumps({"alg": "HS256"}).encode()),
+            base64url_encode(json.dumps(claims).encode()),
+            base64url_encode(b"signature"),
+        ])
+
+        VERIFIED_TOKEN_CACHE.clear()
+
+        authentication = OAuth2Authentication()
+        with mock.patch(
+            "safers.auth.authentication.AUTH_CLIENT.validate_jwt"
+        ) as mock_validate_jwt:
+            mock_validate_jwt.return_value.was_successful.return_value = True
+            mock_validate_jwt.return_value.success_response = {"jwt": claims}
+            assert authentication.verify_access_token(token) == claims
+            assert mock_validate_jwt.call_count == 1
+
+        settings.FUSIONAUTH_REMOTE_JWT_VALIDATION = False
+        VERIFIED_TOKEN_CACHE.clear()
+        with pytest.raises(AuthenticationFailed):
+            authentication.verify_access_token(token)
+
+
+@pytest.mark.django_db
+class TestAuthenticatedUserCache:
+    def test_get_user_is_cached(self, django_assert_num_queries):
+        user = UserFactory(auth_id=uuid.uuid4())
+
+        AUTHENTICATED_USER_CACHE.clear()
+
+        authentication = OAuth2Authentication()
+        with django_assert_num_queries(1):
+            cached_user = authentication.get_user(str(user.auth_id))
+            assert cached_user == user
+            assert cached_user.default_aoi == user.default_aoi
+        with django_assert_num_queries(0):
+            cached_user = authentication.get_user(str(user.auth_id))
+            assert cached_user == user
+            assert cached_user.default_aoi == user.default_aoi
+
+        assert AUTHENTICATED_USER_CACHE.as_dict() == {
+            "size": 1, "hits": 1, "misses": 1
+        }
+
+    def test_user_cache_invalidation(self):
+        user = UserFactory(auth_id=uuid.uuid4())
+
+        AUTHENTICATED_USER_CACHE.clear()
+
+        authentication = OAuth2Authentication()
+        authentication.get_user(user.auth_id)
+        assert AUTHENTICATED_USER_CACHE.get(user.auth_id) is not None
+
+        user.accepted_terms = not user.accepted_terms
+        user.save()
+        assert AUTHENTICATED_USER_CACHE.get(user.auth_id) is None
+
+        authentication.get_user(user.auth_id)
+        assert AUTHENTICATED_USER_CACHE.get(user.auth_id) is not None
+
+        user.default_aoi.save()
+        assert AUTHENTICATED_USER_CACHE.get(user.auth_id) is None
+
+        user.is_active = False
+        user.save()
+        with pytest.raises(AuthenticationFailed):
+            authentication.get_user(user.auth_id)
@@ -0,0 +1,300 @@
+"""
+Local verification of the JWTs issued by FusionAuth; this avoids making a
+round-trip to FusionAuth (AUTH_CLIENT.validate_jwt) for every API request.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from safers.auth.clients import AUTH_CLIENT
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class TokenVerificationUnavailable(Exception):
+    """
+    raised when a token cannot be verified locally (as opposed to being
+    invalid); in that case it can still be validated remotely
+    """
+    pass
+
+
+def base64url_decode(value):
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    return base64.urlsafe_b64decode(value + b"=" * (-len(value) % 4))
+
+
+def get_token_expiry(token):
+    """
+    returns the "exp" claim of token w/out verifying it (or None if it has
+    none); only use this on tokens that have already been verified
+    """
+    try:
+        claims = json.loads(base64url_decode(token.split(".")[1]))
+        return float(claims["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+###############
+# public keys #
+###############
+
+
+class JWTPublicKeySet(object):
+    """
+    The set of public keys FusionAuth uses to sign JWTs (keyed by "kid").
+    Keys are cached for `timeout` seconds; if a token is signed w/ an unknown
+    key (ie: because the keys were rotated) then the set is refreshed, but not
+    more often than every `min_refresh_interval` seconds.
+    """
+    def __init__(self, timeout=3600, min_refresh_interval=60):
+        self.timeout = timeout
+        self.min_refresh_interval = min_refresh_interval
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.fetched_at = None
+
+    def fetch_keys(self):
+        from cryptography import x509
+        from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+        try:
+            response = AUTH_CLIENT.retrieve_jwt_public_keys()
+        except Exception as e:
+            raise TokenVerificationUnavailable(
+                f"unable to retrieve public keys: {e}"
+            ) from e
+        if not response.was_successful():
+            raise TokenVerificationUnavailable(
+                f"unable to retrieve public keys: {response.error_response}"
+            )
+
+        keys = {}
+        for kid, pem in response.success_response.get("publicKeys",
+                                                      {}).items():
+            try:
+                if "CERTIFICATE" in pem:
+                    key = x509.load_pem_x509_certificate(pem.encode()
+                                                        ).public_key()
+                else:
+                    key = load_pem_public_key(pem.encode())
+            except ValueError as e:
+                logger.warning(f"unable to load public key {kid}: {e}")
+                continue
+            keys[kid] = key
+        return keys
+
+    def refresh(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if self.fetched_at is not None:
+                age = now - self.fetched_at
+                if age < self.min_refresh_interval or (
+                    not force and age < self.timeout
+                ):
+                    return
+            try:
+                self.keys = self.fetch_keys()
+            finally:
+                # don't retry a failed fetch on every request
+                self.fetched_at = now
+
+    def set_keys(self, keys):
+        with self.lock:
+            self.keys = dict(keys)
+            self.fetched_at = time.monotonic()
+
+    def get_key(self, kid):
+        if self.fetched_at is None or time.monotonic(
+        ) - self.fetched_at > self.timeout:
+            self.refresh()
+        key = self.keys.get(kid)
+        if key is None:
+            # the keys may have been rotated
+            self.refresh(force=True)
+            key = self.keys.get(kid)
+        return key
+
+
+################
+# verification #
+################
+
+
+def _verify_signature(key, algorithm, signing_input, signature):
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+    hash_algorithm = {
+        "256": hashes.SHA256, "384": hashes.SHA384, "512": hashes.SHA512
+    }[algorithm[2:]]()
+
+    try:
+        if algorithm.startswith("RS") and isinstance(key, rsa.RSAPublicKey):
+            key.verify(
+                signature, signing_input, padding.PKCS1v15(), hash_algorithm
+            )
+        elif algorithm.startswith("ES") and isinstance(
+            key, ec.EllipticCurvePublicKey
+        ):
+            # JWS signatures are the raw concatenation of r & s
+            n = len(signature) // 2
+            key.verify(
+                encode_dss_signature(
+                    int.from_bytes(signature[:n], "big"),
+                    int.from_bytes(signature[n:], "big"),
+                ),
+                signing_input,
+                ec.ECDSA(hash_algorithm),
+            )
+        else:
+            raise InvalidTokenError(f"key does not support {algorithm}")
+    except InvalidSignature as e:
+        raise InvalidTokenError("invalid signature") from e
+
+
+def _is_numeric_date(value):
+    # RFC 7519 NumericDate (bool is an int subclass, but not a date)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class JWTVerifier(object):
+
+    SUPPORTED_ALGORITHMS = ["RS256", "RS384", "RS512", "ES256", "ES384", "ES512"]
+
+    def __init__(self, key_set, leeway=0):
+        self.key_set = key_set
+        self.leeway = leeway
+
+    def verify(self, token):
+        """
+        returns the verified claims of token or raises InvalidTokenError
+        (or TokenVerificationUnavailable)
+        """
+        try:
+            import cryptography  # noqa: F401
+        except ImportError as e:
+            raise TokenVerificationUnavailable(
+                "cryptography is not installed"
+            ) from e
+
+        try:
+            encoded_header, encoded_payload, encoded_signature = token.split(".")
+            header = json.loads(base64url_decode(encoded_header))
+            claims = json.loads(base64url_decode(encoded_payload))
+            signature = base64url_decode(encoded_signature)
+        except (TypeError, ValueError) as e:
+            raise InvalidTokenError("malformed token") from e
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidTokenError("malformed token")
+
+        algorithm = header.get("alg")
+        if algorithm not in self.SUPPORTED_ALGORITHMS:
+            # ie: HS256 tokens are signed w/ a secret that only FusionAuth has
+            raise TokenVerificationUnavailable(
+                f"unsupported algorithm: {algorithm}"
+            )
+
+        key = self.key_set.get_key(header.get("kid"))
+        if key is None:
+            raise TokenVerificationUnavailable("unknown signing key")
+
+        _verify_signature(
+            key,
+            algorithm,
+            f"{encoded_header}.{encoded_payload}".encode("ascii"),
+            signature,
+        )
+
+        now = time.time()
+        exp = claims.get("exp")
+        nbf = claims.get("nbf")
+        if not _is_numeric_date(exp) or (nbf is not None and not _is_numeric_date(nbf)):  # yapf: disable
+            raise InvalidTokenError("malformed token")
+        if now > exp + self.leeway:
+            raise InvalidTokenError("token has expired")
+        if nbf is not None and now < nbf - self.leeway:
+            raise InvalidTokenError("token is not yet valid")
+
+        return claims
+
+
+###############
+# token cache #
+###############
+
+
+class VerifiedTokenCache(object):
+    """
+    A bounded (LRU) cache of verified token claims keyed by the token's hash;
+    entries expire when the token does.
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.tokens = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        key = self.get_key(token)
+        with self.lock:
+            claims = self.tokens.get(key)
+            if claims is not None and time.time() > claims["exp"]:
+                del self.tokens[key]
+                claims = None
+            if claims is None:
+                self.misses += 1
+                return None
+            self.tokens.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def set(self, token, claims):
+        if self.max_size <= 0 or "exp" not in claims:
+            return
+        key = self.get_key(token)
+        with self.lock:
+            self.tokens[key] = claims
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > self.max_size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+JWT_PUBLIC_KEY_SET = JWTPublicKeySet(
+    timeout=settings.FUSIONAUTH_JWT_KEYS_TIMEOUT,
+)
+
+JWT_VERIFIER = JWTVerifier(
+    JWT_PUBLIC_KEY_SET,
+    leeway=settings.FUSIONAUTH_JWT_LEEWAY,
+)
+
+VERIFIED_TOKEN_CACHE = VerifiedTokenCache(
+    max_size=settings.FUSIONAUTH_JWT_CACHE_SIZE,
+)
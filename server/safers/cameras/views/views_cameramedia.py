@@ -16,6 +16,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_field, OpenApiExa
 
 from safers.core.decorators import swagger_fake
 from safers.core.filters import CaseInsensitiveChoiceFilter, CharInFilter, DefaultFilterSetMixin, MultiFieldOrderingFilter
+from safers.core.pagination import FavoriteKeysetPagination
 
 from safers.cameras.models import Camera, CameraMedia, CameraMediaType, CameraMediaFireClass, CameraMediaTag
 from safers.cameras.serializers import CameraMediaSerializer
@@ -30,7 +31,9 @@ class CameraMediaFilterSet(DefaultFilterSetMixin, filters.FilterSet):
 
     # TODO: MULTIPLE CHOICES ALLOWED IN SWAGGER
     order = MultiFieldOrderingFilter(
-        fields=(("timestamp", "date"), ), multi_fields=["-favorite"]
+        fields=(("timestamp", "date"), ),
+        multi_fields=["-favorite"],
+        default=["-date"],
     )
 
     type = CaseInsensitiveChoiceFilter(choices=CameraMediaType.choices)
@@ -121,6 +124,7 @@ class CameraMediaViewSet(
 
     filter_backends = (filters.DjangoFilterBackend, )
     filterset_class = CameraMediaFilterSet
+    pagination_class = FavoriteKeysetPagination
 
     lookup_field = "id"
     lookup_url_kwarg = "camera_media_id"
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+
+from asgiref.sync import async_to_sync
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from safers.users.tests.factories import UserFactory
+
+from safers.chatbot.views import views_base
+from safers.chatbot.views import AsyncActionListView
+
+MOCK_ACTIONS_DATA = {
+    "data": [{
+        "id": 1,
+        "displayName": "first.responder.test.1",
+        "organizationName": "Test Organization",
+        "activityName": "Surveillance",
+        "status": "Active",
+        "timestamp": "2022-05-04T13:19:15.004Z",
+        "longitude": 7.65952,
+        "latitude": 45.065549,
+    }]
+}
+
+
+@pytest.mark.django_db
+class TestAsyncActionListView:
+    def test_get(self, monkeypatch):
+
+        user = UserFactory()
+
+        proxy_requests = []
+
+        async def _mock_get(path, params=None, auth=None, **kwargs):
+            proxy_requests.append((path, params, auth.token))
+            return MOCK_ACTIONS_DATA
+
+        monkeypatch.setattr(
+            views_base.ASYNC_GATEWAY_CLIENT, "get", _mock_get
+        )
+
+        view = AsyncActionListView.as_view()
+        assert asyncio.iscoroutinefunction(view)
+
+        request = APIRequestFactory().get(
+            "/api/chatbot/people", {"default_bbox": False}
+        )
+        force_authenticate(request, user=user, token="token")
+        response = async_to_sync(view)(request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [action["id"] for action in response.data] == ["1"]
+
+        path, params, token = proxy_requests[0]
+        assert path.endswith(AsyncActionListView.GATEWAY_URL_LIST_PATH)
+        assert params["MaxResultCount"] == 1000
+        assert token == "token"
+
+    def test_get_unauthenticated(self):
+
+        view = AsyncActionListView.as_view()
+
+        request = APIRequestFactory().get("/api/chatbot/people")
+        response = async_to_sync(view)(request)
+
+        assert response.status_code in [
+            status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN
+        ]
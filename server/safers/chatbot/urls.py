@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.urls import include, path, re_path
 
 from rest_framework import routers
 
 from safers.chatbot.views import (
     ActionListView,
+    AsyncActionListView,
+    AsyncCommunicationListView,
+    AsyncMissionListView,
+    AsyncReportDetailView,
+    AsyncReportListView,
     action_activities_view,
     action_statuses_view,
     CommunicationListView,
@@ -14,12 +20,15 @@ from safers.chatbot.views import (
     report_categories_view,
 )
 
+# under ASGI the gateway-proxy views can be served asynchronously
+ASYNC_VIEWS = settings.SAFERS_ASYNC_PROXY_VIEWS
+
 api_router = routers.DefaultRouter()
 api_urlpatterns = [
     path("", include(api_router.urls)),
     path(
         "chatbot/people",
-        ActionListView.as_view(),
+        (AsyncActionListView if ASYNC_VIEWS else ActionListView).as_view(),
         name="actions-list",
     ),
     path(
@@ -34,12 +43,15 @@ api_urlpatterns = [
     ),
     path(
         "chatbot/communications",
-        CommunicationListView.as_view(),
+        (
+            AsyncCommunicationListView
+            if ASYNC_VIEWS else CommunicationListView
+        ).as_view(),
         name="communications-list",
     ),
     path(
         "chatbot/missions",
-        MissionListView.as_view(),
+        (AsyncMissionListView if ASYNC_VIEWS else MissionListView).as_view(),
         name="missions-list",
     ),
     path(
@@ -49,7 +61,7 @@ api_urlpatterns = [
     ),
     path(
         "chatbot/reports",
-        ReportListView.as_view(),
+        (AsyncReportListView if ASYNC_VIEWS else ReportListView).as_view(),
         name="reports-list",
     ),
     path(
@@ -59,7 +71,7 @@ api_urlpatterns = [
     ),
     path(
         "chatbot/reports/<slug:report_id>",
-        ReportDetailView.as_view(),
+        (AsyncReportDetailView if ASYNC_VIEWS else ReportDetailView).as_view(),
         name="reports-detail"
     ),
 ]
@@ -1,4 +1,4 @@
-from .views_actions import ActionListView, action_activities_view, action_statuses_view
-from .views_communications import CommunicationListView
-from .views_missions import MissionListView, mission_statuses_view
-from .views_reports import ReportListView, ReportDetailView, report_categories_view
+from .views_actions import ActionListView, AsyncActionListView, action_activities_view, action_statuses_view
+from .views_communications import AsyncCommunicationListView, CommunicationListView
+from .views_missions import AsyncMissionListView, MissionListView, mission_statuses_view
+from .views_reports import AsyncReportDetailView, AsyncReportListView, ReportListView, ReportDetailView, report_categories_view
@@ -14,7 +14,7 @@ from safers.core.clients import GATEWAY_CLIENT
 
 from safers.chatbot.models import Action, ActionActivityTypes, ActionStatusTypes
 from safers.chatbot.serializers import ActionSerializer, ActionViewSerializer
-from .views_base import ChatbotView, parse_none, parse_datetime
+from .views_base import AsyncChatbotViewMixin, ChatbotView, parse_none, parse_datetime
 
 
 class ActionView(ChatbotView):
@@ -25,7 +25,7 @@ class ActionView(ChatbotView):
 
 class ActionListView(ActionView):
 
-    GATEWAY_URL_PATH = "/api/services/app/Actions/GetActions"
+    GATEWAY_URL_LIST_PATH = "/api/services/app/Actions/GetActions"
 
     @extend_schema(
         responses={
@@ -37,10 +37,13 @@ class ActionListView(ActionView):
         proxy_data = self.get_proxy_list_data(
             request,
             proxy_url=urljoin(
-                settings.SAFERS_GATEWAY_URL, self.GATEWAY_URL_PATH
+                settings.SAFERS_GATEWAY_URL, self.GATEWAY_URL_LIST_PATH
             ),
         )
 
+        return self.get_list_response(proxy_data)
+
+    def get_list_response(self, proxy_data):
         actions = [
             Action(
                 action_id=data["id"],
@@ -61,6 +64,16 @@ class ActionListView(ActionView):
         return Response(data=model_serializer.data, status=status.HTTP_200_OK)
 
 
+class AsyncActionListView(AsyncChatbotViewMixin, ActionListView):
+    @extend_schema(
+        responses={
+            status.HTTP_200_OK: ActionSerializer(many=True),
+        }
+    )
+    async def get(self, request, *args, **kwargs):
+        return await super().get(request, *args, **kwargs)
+
+
 @extend_schema(
     request=None,
     responses={
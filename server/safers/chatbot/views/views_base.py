@@ -1,5 +1,7 @@
-import requests
 from datetime import datetime
+from urllib.parse import urljoin
+
+from asgiref.sync import sync_to_async
 
 from django.conf import settings
 from django.utils import timezone
@@ -9,7 +11,8 @@ from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 
 from safers.core.authentication import TokenAuthentication
-from safers.core.clients import REQUEST_TIMEOUT
+from safers.core.clients import ASYNC_GATEWAY_CLIENT, GATEWAY_CLIENT, REQUEST_TIMEOUT
+from safers.core.views import AsyncAPIViewMixin
 
 
 def parse_none(value):
@@ -48,6 +51,8 @@ class ChatbotView(views.APIView):
     view_serializer_class = None
     model_serializer_class = None
 
+    GATEWAY_URL_LIST_PATH = None
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         assert self.view_serializer_class is not None
@@ -73,7 +78,7 @@ class ChatbotView(views.APIView):
 
         return data
 
-    def get_proxy_list_data(self, request, proxy_url=None):
+    def get_proxy_list_params(self, request):
 
         view_serializer = self.view_serializer_class(
             data=request.query_params,
@@ -94,15 +99,64 @@ class ChatbotView(views.APIView):
             proxy_params["SouthWestBoundary.Latitude"] = min_y
             proxy_params["SouthWestBoundary.Longitude"] = min_x
 
+        return proxy_params
+
+    def get_proxy_list_data(self, request, proxy_url=None):
+
+        proxy_params = self.get_proxy_list_params(request)
+
         try:
-            response = requests.get(
+            # identical concurrent requests share a single upstream request
+            proxy_data = GATEWAY_CLIENT.get(
                 proxy_url,
                 auth=TokenAuthentication(self.request.auth),
                 params=proxy_params,
                 timeout=REQUEST_TIMEOUT,
             )  # yapf: disable
-            response.raise_for_status()
         except Exception as e:
             raise APIException(e)
 
-        return response.json()["data"]
+        return proxy_data["data"]
+
+    def get_list_response(self, proxy_data):
+        """
+        Converts the proxy_data returned by get_proxy_list_data into a
+        Response; every chatbot view must implement this, since it is shared
+        by the sync `get` of each view and by AsyncChatbotViewMixin.
+        """
+        msg = "The 'get_list_response' method must be implemented for a ChatbotView."
+        raise NotImplementedError(msg)
+
+
+class AsyncChatbotViewMixin(AsyncAPIViewMixin):
+    """
+    An async version of ChatbotView, for use under ASGI; the request to the
+    gateway does not block a thread.  Only the db access in
+    get_list_response is run in a thread.
+    """
+    async def aget_proxy_list_data(self, request, proxy_url=None):
+
+        proxy_params = await sync_to_async(self.get_proxy_list_params)(request)
+
+        try:
+            proxy_data = await ASYNC_GATEWAY_CLIENT.get(
+                proxy_url,
+                auth=TokenAuthentication(self.request.auth),
+                params=proxy_params,
+                timeout=REQUEST_TIMEOUT,
+            )  # yapf: disable
+        except Exception as e:
+            raise APIException(e)
+
+        return proxy_data["data"]
+
+    async def get(self, request, *args, **kwargs):
+
+        proxy_data = await self.aget_proxy_list_data(
+            request,
+            proxy_url=urljoin(
+                settings.SAFERS_GATEWAY_URL, self.GATEWAY_URL_LIST_PATH
+            ),
+        )
+
+        return await sync_to_async(self.get_list_response)(proxy_data)
@@ -1,7 +1,8 @@
 import json
-import requests
 from urllib.parse import urljoin
 
+from asgiref.sync import sync_to_async
+
 from django.conf import settings
 from django.contrib.gis import geos
 
@@ -13,13 +14,14 @@ from rest_framework.utils.encoders import JSONEncoder
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiTypes, OpenApiExample
 
 from safers.core.authentication import TokenAuthentication
+from safers.core.clients import requests_session
 
 from safers.users.models import Organization
 
 from safers.chatbot.models import Communication
 from safers.chatbot.serializers import CommunicationSerializer, CommunicationCreateSerializer, CommunicationViewSerializer
 
-from .views_base import ChatbotView, parse_datetime, parse_none
+from .views_base import AsyncChatbotViewMixin, ChatbotView, parse_datetime, parse_none
 
 
 class CommunicationView(ChatbotView):
@@ -48,6 +50,9 @@ class CommunicationListView(CommunicationView):
             ),
         )
 
+        return self.get_list_response(proxy_data)
+
+    def get_list_response(self, proxy_data):
         communications = [
             Communication(
                 communication_id=data["id"],
@@ -129,7 +134,7 @@ class CommunicationListView(CommunicationView):
         )
 
         try:
-            response = requests.post(
+            response = requests_session.post(
                 proxy_url,
                 auth=TokenAuthentication(request.auth),
                 headers={"Content-Type": "application/json"},
@@ -146,3 +151,16 @@ class CommunicationListView(CommunicationView):
         msg = f"successfully created {instance.name}."
 
         return Response({"msg": msg}, status=status.HTTP_200_OK)
+
+
+class AsyncCommunicationListView(AsyncChatbotViewMixin, CommunicationListView):
+    @extend_schema(
+        request=CommunicationViewSerializer,
+        responses={status.HTTP_200_OK: CommunicationSerializer(many=True)}
+    )
+    async def get(self, request, *args, **kwargs):
+        return await super().get(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        # (all handlers of an async view must be async)
+        return await sync_to_async(super().post)(request, *args, **kwargs)
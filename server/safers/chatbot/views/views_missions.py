@@ -1,9 +1,10 @@
 import json
 import logging
-import requests
 from collections import OrderedDict
 from urllib.parse import urljoin
 
+from asgiref.sync import sync_to_async
+
 from django.conf import settings
 from django.contrib.gis import geos
 
@@ -17,11 +18,12 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiTypes, OpenApiExample
 
 from safers.core.authentication import TokenAuthentication
+from safers.core.clients import requests_session
 
 from safers.chatbot.models import Mission, MissionStatusChoices
 from safers.chatbot.serializers import MissionSerializer, MissionCreateSerializer, MissionViewSerializer
 
-from .views_base import ChatbotView, parse_datetime, parse_none
+from .views_base import AsyncChatbotViewMixin, ChatbotView, parse_datetime, parse_none
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +54,9 @@ class MissionListView(MissionView):
             ),
         )
 
+        return self.get_list_response(proxy_data)
+
+    def get_list_response(self, proxy_data):
         missions = [
             Mission(
                 mission_id=data["id"],
@@ -128,7 +133,7 @@ class MissionListView(MissionView):
         }
 
         try:
-            response = requests.post(
+            response = requests_session.post(
                 urljoin(
                     settings.SAFERS_GATEWAY_URL,
                     self.GATEWAY_URL_CREATE_PATH,
@@ -153,6 +158,19 @@ class MissionListView(MissionView):
         return Response({"msg": msg}, status=status.HTTP_200_OK)
 
 
+class AsyncMissionListView(AsyncChatbotViewMixin, MissionListView):
+    @extend_schema(
+        request=MissionViewSerializer,
+        responses={status.HTTP_200_OK: MissionSerializer(many=True)}
+    )
+    async def get(self, request, *args, **kwargs):
+        return await super().get(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        # (all handlers of an async view must be async)
+        return await sync_to_async(super().post)(request, *args, **kwargs)
+
+
 @extend_schema(
     request=None,
     responses={
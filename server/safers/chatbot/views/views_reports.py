@@ -1,6 +1,7 @@
-import requests
 from urllib.parse import urljoin
 
+from asgiref.sync import sync_to_async
+
 from django.conf import settings
 from django.contrib.gis import geos
 
@@ -13,11 +14,13 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiTypes, OpenApiExample
 
 from safers.core.authentication import TokenAuthentication
+from safers.core.clients import ASYNC_GATEWAY_CLIENT, GATEWAY_CLIENT
+from safers.core.views import AsyncAPIViewMixin
 
 from safers.chatbot.models import Report, ReportCategory
 from safers.chatbot.serializers import ReportSerializer, ReportViewSerializer
 
-from .views_base import ChatbotView, parse_none, parse_datetime
+from .views_base import AsyncChatbotViewMixin, ChatbotView, parse_none, parse_datetime
 
 
 class ReportView(ChatbotView):
@@ -43,6 +46,9 @@ class ReportListView(ReportView):
             ),
         )
 
+        return self.get_list_response(proxy_data)
+
+    def get_list_response(self, proxy_data):
         report_categories = {
             # hitting the db once outside of the list comprehension below
             # instead of hitting it for every report in proxy_data
@@ -101,29 +107,41 @@ class ReportListView(ReportView):
         return Response(data=model_serializer.data, status=status.HTTP_200_OK)
 
 
+class AsyncReportListView(AsyncChatbotViewMixin, ReportListView):
+    @extend_schema(
+        request=ReportViewSerializer,
+        responses={status.HTTP_200_OK: ReportSerializer(many=True)}
+    )
+    async def get(self, request, *args, **kwargs):
+        return await super().get(request, *args, **kwargs)
+
+
 class ReportDetailView(ReportView):
 
     GATEWAY_URL_DETAIL_PATH = "/api/services/app/Reports/GetReportById"
 
+    def get_proxy_detail_params(self, report_id):
+        return {
+            "Id": report_id,
+            "IncludeArea": True,
+        }
+
     @extend_schema(responses={status.HTTP_200_OK: ReportSerializer})
     def get(self, request, *args, **kwargs):
 
-        proxy_params = {
-            "Id": kwargs["report_id"],
-            "IncludeArea": True,
-        }
         try:
-            response = requests.get(
-                urljoin(settings.SAFERS_GATEWAY_URL, self.GATEWAY_URL_DETAIL_PATH),
+            proxy_data = GATEWAY_CLIENT.get(
+                self.GATEWAY_URL_DETAIL_PATH,
                 auth=TokenAuthentication(request.auth),
-                params=proxy_params,
+                params=self.get_proxy_detail_params(kwargs["report_id"]),
                 timeout=4,
             )  # yapf: disable
-            response.raise_for_status()
-            proxy_data = response.json()
         except Exception as e:
             raise APIException(e)
 
+        return self.get_detail_response(proxy_data)
+
+    def get_detail_response(self, proxy_data):
         feature = proxy_data["feature"]
         geometry = feature.get("geometry", None)
         properties = feature.get("properties", {})
@@ -180,6 +198,23 @@ class ReportDetailView(ReportView):
         return Response(data=model_serializer.data, status=status.HTTP_200_OK)
 
 
+class AsyncReportDetailView(AsyncAPIViewMixin, ReportDetailView):
+    @extend_schema(responses={status.HTTP_200_OK: ReportSerializer})
+    async def get(self, request, *args, **kwargs):
+
+        try:
+            proxy_data = await ASYNC_GATEWAY_CLIENT.get(
+                self.GATEWAY_URL_DETAIL_PATH,
+                auth=TokenAuthentication(request.auth),
+                params=self.get_proxy_detail_params(kwargs["report_id"]),
+                timeout=4,
+            )  # yapf: disable
+        except Exception as e:
+            raise APIException(e)
+
+        return await sync_to_async(self.get_detail_response)(proxy_data)
+
+
 @extend_schema(
     request=None,
     responses={
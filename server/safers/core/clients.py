@@ -1,17 +1,253 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import threading
+import time
+import types
 import requests
-from urllib.parse import urljoin, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlencode, urlparse
+from urllib3.util.retry import Retry
 
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 REQUEST_TIMEOUT = (
     4, 60
 )  # specifying both connect timeout and read timeout (as per https://requests.readthedocs.io/en/latest/user/advanced/#timeouts)
 
-requests_session = requests.Session()
-
 # TODO: CAN PreparedRequests HELP SPEED THINGS UP ?
 # TODO: (as per https://requests.readthedocs.io/en/latest/user/advanced/#prepared-requests)
 
+###########
+# metrics #
+###########
+
+
+class LatencyHistograms(object):
+    """
+    Per-endpoint histograms of request latencies; `buckets` are the upper
+    bounds (in seconds) of each bucket, the last bucket is unbounded.
+    """
+
+    DEFAULT_BUCKETS = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+    )
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def observe(self, endpoint, seconds, error=False):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            histogram = self.histograms.get(endpoint)
+            if histogram is None:
+                histogram = self.histograms[endpoint] = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "count": 0,
+                    "errors": 0,
+                    "sum": 0.0,
+                }
+            histogram["counts"][index] += 1
+            histogram["count"] += 1
+            histogram["errors"] += int(error)
+            histogram["sum"] += seconds
+
+    def as_dict(self):
+        bucket_labels = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+        with self.lock:
+            return {
+                endpoint: {
+                    "buckets": dict(zip(bucket_labels, histogram["counts"])),
+                    "count": histogram["count"],
+                    "errors": histogram["errors"],
+                    "sum": histogram["sum"],
+                }
+                for endpoint, histogram in self.histograms.items()
+            }
+
+
+GATEWAY_LATENCY_HISTOGRAMS = LatencyHistograms()
+
+#############
+# transport #
+#############
+
+
+class InstrumentedSession(requests.Session):
+    """
+    A requests.Session which records the latency of every request (until the
+    response headers are received) by method & endpoint (url w/out query).
+    """
+    def __init__(self, histograms=GATEWAY_LATENCY_HISTOGRAMS):
+        super().__init__()
+        self.histograms = histograms
+
+    def request(self, method, url, *args, **kwargs):
+        parsed_url = urlparse(url)
+        endpoint = f"{method.upper()} {parsed_url.netloc}{parsed_url.path}"
+        error = True
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            error = not response.ok
+            return response
+        finally:
+            self.histograms.observe(
+                endpoint, time.perf_counter() - start, error=error
+            )
+
+
+def create_requests_session(
+    pool_size=10, max_retries=0, backoff_factor=0, pool_connections=10
+):
+    """
+    returns a session w/ a (keep-alive) connection pool of `pool_size`
+    connections per host (for up to `pool_connections` hosts); idempotent
+    requests which fail to connect or which return a gateway error are
+    retried up to `max_retries` times w/ exponential backoff
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session = InstrumentedSession()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+requests_session = create_requests_session(
+    pool_size=settings.SAFERS_GATEWAY_POOL_SIZE,
+    max_retries=settings.SAFERS_GATEWAY_MAX_RETRIES,
+    backoff_factor=settings.SAFERS_GATEWAY_RETRY_BACKOFF,
+)
+
+#################
+# single-flight #
+#################
+
+
+class _SingleFlightCall(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent identical calls: while a call for a given key is in
+    flight, any other callers w/ the same key wait for it to finish and share
+    its result (or exception) rather than making their own call.  Usage is:
+    >>> single_flight = SingleFlight()
+    >>> result = single_flight.do(key, fn, *args, **kwargs)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requested = 0
+            self.executed = 0
+
+    @property
+    def collapsed(self):
+        return self.requested - self.executed
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "requested": self.requested,
+                "executed": self.executed,
+                "collapsed": self.requested - self.executed,
+                "in_flight": len(self.calls),
+            }
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            self.requested += 1
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.calls[key] = _SingleFlightCall()
+                self.executed += 1
+
+        if not is_leader:
+            call.event.wait()
+        else:
+            try:
+                call.result = fn(*args, **kwargs)
+            except Exception as e:
+                call.exception = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.event.set()
+
+        if call.exception is not None:
+            raise call.exception
+        return call.result
+
+
+GATEWAY_SINGLE_FLIGHT = SingleFlight()
+
+
+def get_auth_scope(auth):
+    """
+    returns a hashable value identifying the credentials used by auth; any
+    requests made w/ the same auth scope can share a response
+    """
+    if auth is None:
+        return ""
+    token = getattr(auth, "token", None)
+    if token is None:
+        # unknown credentials; don't share responses
+        return None
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_request_key(method, url, params=None, auth=None):
+    """
+    returns the key used to coalesce a request, or None if the request
+    should not be coalesced
+    """
+    auth_scope = get_auth_scope(auth)
+    if auth_scope is None:
+        return None
+    if params:
+        # normalize the params so that their order doesn't matter
+        params = sorted(
+            params.items() if isinstance(params, dict) else params,
+            key=lambda param: param[0],
+        )
+    url = requests.Request(method, url, params=params).prepare().url
+    return (method, url, auth_scope)
+
 
 class GatewayClient(object):
 
@@ -25,6 +261,35 @@ class GatewayClient(object):
         "accept": "application/json",
     }
 
+    def get(self, path, params=None, auth=None, timeout=REQUEST_TIMEOUT):
+        """
+        GETs path from the gateway and returns the (decoded) JSON response;
+        concurrent identical requests (same url, params & auth scope) share a
+        single upstream request
+        """
+        url = urljoin(settings.SAFERS_GATEWAY_URL, path)
+
+        def _get():
+            response = requests_session.request(
+                method="GET",
+                headers=self.headers,
+                url=url,
+                params=params,
+                auth=auth,
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            return response
+
+        key = get_request_key("GET", url, params=params, auth=auth)
+        if key is None:
+            response = _get()
+        else:
+            response = GATEWAY_SINGLE_FLIGHT.do(key, _get)
+
+        # every caller decodes its own copy of the shared response
+        return response.json()
+
     def get_profile(self, params=None, auth=None, timeout=REQUEST_TIMEOUT):
         url = urljoin(
             settings.SAFERS_GATEWAY_URL, f"{self.PROFILE_PATH}/GetProfile"
@@ -56,85 +321,293 @@ class GatewayClient(object):
         return response.json()
 
     def get_organizations(
-        self, params=None, auth=None, timeout=REQUEST_TIMEOUT
-    ) -> dict:
+        self,
+        params=None,
+        auth=None,
+        timeout=REQUEST_TIMEOUT,
+        max_depth=None,
+        max_workers=None,
+    ) -> list:
+        """
+        Crawls the organization hierarchy breadth-first; each level of the
+        tree is fetched concurrently (one request per parent organization).
+        Organizations are de-duplicated by id and the crawl stops after
+        max_depth levels.
+        """
         url = urljoin(
             settings.SAFERS_GATEWAY_URL,
             f"{self.PROFILE_PATH}/GetOrganizations"
         )
 
+        if max_depth is None:
+            max_depth = settings.SAFERS_GATEWAY_ORGANIZATIONS_MAX_DEPTH
+        if max_workers is None:
+            max_workers = settings.SAFERS_GATEWAY_MAX_WORKERS
+
         default_params = {"MaxResultCount": 1000}
         if params:
             default_params.update(params)
 
-        response = requests_session.request(
-            method="GET",
-            headers=self.headers,
-            url=url,
-            params=default_params,
-            auth=auth,
-            timeout=timeout,
-        )
-        response.raise_for_status()
+        def _get_organizations(level_params):
+            response = requests_session.request(
+                method="GET",
+                headers=self.headers,
+                url=url,
+                params=level_params,
+                auth=auth,
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            return response.json()["data"]
 
-        # follow all parent organizations...
-        organizations_data = response.json()["data"]
-        for organization in organizations_data:
-            if organization["hasChildren"]:
-                organizations_data += self.get_organizations(
-                    params=dict(
-                        parentId=organization["id"],
-                        **default_params,
-                    ),
-                    auth=auth,
-                    timeout=timeout,
-                )
+        organizations_data = []
+        seen_ids = set()
+
+        def _add_organizations(level_organizations_data):
+            parent_ids = []
+            for organization in level_organizations_data:
+                if organization["id"] in seen_ids:
+                    continue
+                seen_ids.add(organization["id"])
+                organizations_data.append(organization)
+                if organization["hasChildren"]:
+                    parent_ids.append(organization["id"])
+            return parent_ids
+
+        parent_ids = _add_organizations(_get_organizations(default_params))
+
+        depth = 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while parent_ids and depth < max_depth:
+                next_parent_ids = []
+                for level_organizations_data in executor.map(
+                    _get_organizations,
+                    [
+                        dict(default_params, parentId=parent_id)
+                        for parent_id in parent_ids
+                    ],
+                ):
+                    next_parent_ids += _add_organizations(
+                        level_organizations_data
+                    )
+                parent_ids = next_parent_ids
+                depth += 1
 
         return organizations_data
 
     def get_teams(
         self, params=None, auth=None, timeout=REQUEST_TIMEOUT
     ) -> dict:
-        url = urljoin(
-            settings.SAFERS_GATEWAY_URL, f"{self.TEAMS_PATH}/GetTeams"
-        )
-
         default_params = {"MaxResultCount": 1000}
         if params:
             default_params.update(params)
 
-        response = requests_session.request(
-            method="GET",
-            headers=self.headers,
-            url=url,
+        return self.get(
+            f"{self.TEAMS_PATH}/GetTeams",
             params=default_params,
             auth=auth,
             timeout=timeout,
         )
-        response.raise_for_status()
-        return response.json()
 
     def get_layers(
         self, params=None, auth=None, timeout=REQUEST_TIMEOUT
     ) -> dict:
-        url = urljoin(
-            settings.SAFERS_GATEWAY_URL, f"{self.LAYERS_PATH}/GetLayers"
+        default_params = {}
+        if params:
+            default_params.update(params)
+
+        return self.get(
+            f"{self.LAYERS_PATH}/GetLayers",
+            params=default_params,
+            auth=auth,
+            timeout=timeout,
+        )
+
+
+GATEWAY_CLIENT = GatewayClient()
+
+
+################
+# async client #
+################
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    An asyncio version of SingleFlight; concurrent callers (on the same event
+    loop) w/ the same key await a single call of the coroutine function.  The
+    call runs in its own task, which every caller (including the one that
+    started it) awaits through a shield; cancelling any one caller therefore
+    only cancels that caller, and the rest still get the call's result (or
+    exception).
+    """
+    async def do(self, key, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        key = (id(loop), key)
+
+        with self.lock:
+            self.requested += 1
+            task = self.calls.get(key)
+            if task is None:
+                task = self.calls[key] = loop.create_task(fn(*args, **kwargs))
+                task.add_done_callback(partial(self.call_done, key))
+                self.executed += 1
+
+        return await asyncio.shield(task)
+
+    def call_done(self, key, task):
+        with self.lock:
+            if self.calls.get(key) is task:
+                del self.calls[key]
+        if not task.cancelled():
+            # mark any exception as retrieved in case there are no callers left
+            task.exception()
+
+
+GATEWAY_ASYNC_SINGLE_FLIGHT = AsyncSingleFlight()
+
+
+class GatewayError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class AsyncGatewayClient(object):
+    """
+    A non-blocking version of GatewayClient for use in async views; requests
+    are made w/ tornado's AsyncHTTPClient, which multiplexes up to
+    `max_clients` concurrent requests on the event loop w/out using threads.
+    Requests are coalesced (via AsyncSingleFlight), retried (on
+    RETRY_STATUS_CODES, w/ the same backoff) and instrumented (via the same
+    latency histograms) as in GatewayClient.
+    """
+
+    headers = GatewayClient.headers
+
+    RETRY_STATUS_CODES = (502, 503, 504, 599)  # tornado uses 599 for errors
+
+    def __init__(
+        self,
+        max_clients=100,
+        max_retries=0,
+        backoff_factor=0,
+        histograms=GATEWAY_LATENCY_HISTOGRAMS,
+    ):
+        self.max_clients = max_clients
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.histograms = histograms
+
+    def get_http_client(self):
+        from tornado.httpclient import AsyncHTTPClient
+
+        # (AsyncHTTPClient instances are shared per event loop)
+        return AsyncHTTPClient(max_clients=self.max_clients)
+
+    @staticmethod
+    def get_auth_headers(auth):
+        """
+        applies a requests AuthBase (ie: TokenAuthentication) to a dummy
+        request and returns the resulting headers
+        """
+        request = types.SimpleNamespace(headers={})
+        if auth is not None:
+            auth(request)
+        return request.headers
+
+    @staticmethod
+    def get_timeouts(timeout):
+        if isinstance(timeout, (tuple, list)):
+            connect_timeout, read_timeout = timeout
+            return connect_timeout, connect_timeout + read_timeout
+        return timeout, timeout
+
+    async def fetch(self, url, headers=None, timeout=REQUEST_TIMEOUT):
+        from tornado.httpclient import HTTPRequest
+
+        connect_timeout, request_timeout = self.get_timeouts(timeout)
+        request = HTTPRequest(
+            url,
+            method="GET",
+            headers=headers,
+            connect_timeout=connect_timeout,
+            request_timeout=request_timeout,
         )
 
+        parsed_url = urlparse(url)
+        endpoint = f"GET {parsed_url.netloc}{parsed_url.path}"
+
+        http_client = self.get_http_client()
+        for retry in range(self.max_retries + 1):
+            if retry:
+                await asyncio.sleep(self.backoff_factor * (2**(retry - 1)))
+            start = time.perf_counter()
+            response = await http_client.fetch(request, raise_error=False)
+            self.histograms.observe(
+                endpoint,
+                time.perf_counter() - start,
+                error=response.code >= 400,
+            )
+            if response.code not in self.RETRY_STATUS_CODES:
+                break
+
+        if response.code >= 400:
+            raise GatewayError(
+                f"{response.code} Error: {response.reason} for url: {url}",
+                code=response.code,
+            )
+        return response.body
+
+    async def get(self, path, params=None, auth=None, timeout=REQUEST_TIMEOUT):
+        """
+        GETs path from the gateway and returns the (decoded) JSON response
+        """
+        url = urljoin(settings.SAFERS_GATEWAY_URL, path)
+        key = get_request_key("GET", url, params=params, auth=auth)
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        headers = dict(self.headers, **self.get_auth_headers(auth))
+
+        if key is None:
+            body = await self.fetch(url, headers=headers, timeout=timeout)
+        else:
+            body = await GATEWAY_ASYNC_SINGLE_FLIGHT.do(
+                key, self.fetch, url, headers=headers, timeout=timeout
+            )
+
+        # every caller decodes its own copy of the shared response
+        return json.loads(body)
+
+    async def get_teams(self, params=None, auth=None, timeout=REQUEST_TIMEOUT):
+        default_params = {"MaxResultCount": 1000}
+        if params:
+            default_params.update(params)
+
+        return await self.get(
+            f"{GatewayClient.TEAMS_PATH}/GetTeams",
+            params=default_params,
+            auth=auth,
+            timeout=timeout,
+        )
+
+    async def get_layers(
+        self, params=None, auth=None, timeout=REQUEST_TIMEOUT
+    ):
         default_params = {}
         if params:
             default_params.update(params)
 
-        response = requests_session.request(
-            method="GET",
-            headers=self.headers,
-            url=url,
+        return await self.get(
+            f"{GatewayClient.LAYERS_PATH}/GetLayers",
             params=default_params,
             auth=auth,
             timeout=timeout,
         )
-        response.raise_for_status()
-        return response.json()
 
 
-GATEWAY_CLIENT = GatewayClient()
\ No newline at end of file
+ASYNC_GATEWAY_CLIENT = AsyncGatewayClient(
+    max_clients=settings.SAFERS_GATEWAY_ASYNC_MAX_CLIENTS,
+    max_retries=settings.SAFERS_GATEWAY_MAX_RETRIES,
+    backoff_factor=settings.SAFERS_GATEWAY_RETRY_BACKOFF,
+)
@@ -41,18 +41,21 @@ class CaseInsensitiveChoiceFilter(filters.ChoiceFilter):
 class MultiFieldOrderingFilter(filters.OrderingFilter):
     """
     An ordering filter that allows multiple "implicit" fields to be used along w/ the specified filter value
-    (so that a pre-ordered qs doesn't get overwritten)
+    (so that a pre-ordered qs doesn't get overwritten); "default" is the filter value to use if none is specified
     """
     def __init__(self, *args, **kwargs):
         multi_fields = kwargs.pop("multi_fields", [])
         primary = kwargs.pop("primary", False)
+        default = kwargs.pop("default", [])
         assert isinstance(multi_fields, list)
+        assert isinstance(default, list)
         super().__init__(*args, **kwargs)
         self.multi_fields = multi_fields
         self.primary = primary
+        self.default = default
 
     def filter(self, qs, value):
-        value = value or []
+        value = value or self.default
         multi_value = value + self.multi_fields if self.primary else self.multi_fields + value
         return super().filter(qs, multi_value)
 
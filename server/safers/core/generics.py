@@ -2,7 +2,14 @@
 Concrete generic views that do everything the standard DRF views do except for
 patch / partial_update
 """
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
 from rest_framework import generics, mixins
+from rest_framework.settings import api_settings
+
+from safers.core.renderers import GeoJSONStreamRenderer
 
 
 class PatchlessUpdateModelMixin(object):
@@ -16,6 +23,51 @@ class PatchlessUpdateModelMixin(object):
         serializer.save()
 
 
+class GeoJSONStreamListModelMixin(object):
+    """
+    adds a "geojson-stream" format to a list view; rather than serializing the
+    entire queryset in memory, objects are read from a server-side cursor and
+    serialized & sent one chunk at a time
+    """
+
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        GeoJSONStreamRenderer
+    ]
+
+    geojson_stream_geometry_field = "geometry_collection"
+    geojson_stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        if not isinstance(renderer, GeoJSONStreamRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return StreamingHttpResponse(
+            renderer.iter_features(self.iter_features(queryset, renderer)),
+            content_type=renderer.media_type,
+        )
+
+    def iter_features(self, queryset, renderer):
+        # the context is shared by all chunks
+        serializer_class = self.get_serializer_class()
+        serializer_context = self.get_serializer_context()
+
+        objs = queryset.iterator(chunk_size=self.geojson_stream_chunk_size)
+        while True:
+            objs_chunk = list(islice(objs, self.geojson_stream_chunk_size))
+            if not objs_chunk:
+                break
+            serializer = serializer_class(
+                objs_chunk, many=True, context=serializer_context
+            )
+            for obj, data in zip(objs_chunk, serializer.data):
+                yield renderer.render_feature(
+                    data, getattr(obj, self.geojson_stream_geometry_field)
+                )
+
+
 class PatchlessUpdateAPIView(
     PatchlessUpdateModelMixin,
     generics.GenericAPIView,
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.2 on 2026-10-17 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_saferssettings_display_menu_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saferssettings',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -1,13 +1,27 @@
+import copy
 import hashlib
+import threading
+import time
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 
 
 class SingletonMixin(models.Model):
+    """
+    A model w/ only one instance.  That instance is cached per-process; the
+    cached copy is refreshed when the singleton's version (a counter in the
+    shared cache which is incremented whenever it is saved) changes.  The
+    version is checked at most every SINGLETON_CACHE_CHECK_INTERVAL seconds.
+    """
     class Meta:
         abstract = True
 
+    _singleton_lock = threading.Lock()
+    _singleton_instances = {}
+
     def clean(self):
         if not self.id and self.__class__.objects.count() > 0:
             raise ValidationError("Only one instance of a Singleton is allowed")
@@ -17,10 +31,74 @@ class SingletonMixin(models.Model):
             # updating the existing instance
             # or creating the one-and-only instance
             super().save(*args, **kwargs)
+            self.__class__.clear_singleton_instance()
+            transaction.on_commit(self.__class__.increment_singleton_version)
+
+    @classmethod
+    def get_singleton_version_key(cls):
+        return f"singleton-version:{cls._meta.label_lower}"
+
+    @classmethod
+    def get_singleton_version(cls):
+        key = cls.get_singleton_version_key()
+        version = cache.get(key)
+        if version is None:
+            # a missing (ie: evicted) version must not match any cached one
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def increment_singleton_version(cls):
+        key = cls.get_singleton_version_key()
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    @classmethod
+    def clear_singleton_instance(cls):
+        with cls._singleton_lock:
+            cls._singleton_instances.pop(cls._meta.label_lower, None)
+
+    @classmethod
+    def load_or_create(cls):
+        """
+        returns a copy of the (cached) singleton and whether it was created
+        """
+        label = cls._meta.label_lower
+        now = time.monotonic()
+
+        # the cache is bypassed inside transactions, which may not yet be
+        # consistent w/ the shared version
+        use_cache = not transaction.get_connection().in_atomic_block
+
+        if use_cache:
+            with cls._singleton_lock:
+                cached = cls._singleton_instances.get(label)
+            if cached is not None:
+                version, checked_at, obj = cached
+                check_interval = getattr(
+                    settings, "SINGLETON_CACHE_CHECK_INTERVAL", 0
+                )
+                if now - checked_at < check_interval:
+                    return copy.copy(obj), False
+                if cls.get_singleton_version() == version:
+                    with cls._singleton_lock:
+                        cls._singleton_instances[label] = (version, now, obj)
+                    return copy.copy(obj), False
+
+        version = cls.get_singleton_version() if use_cache else None
+        obj, created = cls.objects.get_or_create(pk=1)
+        if use_cache:
+            with cls._singleton_lock:
+                cls._singleton_instances[label] = (version, now, obj)
+
+        return copy.copy(obj), created
 
     @classmethod
     def load(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
+        obj, _ = cls.load_or_create()
         return obj
 
 
@@ -1,4 +1,4 @@
-from .models_countries import Country
+from .models_countries import Country, COUNTRY_INDEX
 from .models_documents import Document, DocumentAgreement
 from .models_settings import SafersSettings
 from .models_sites import SiteProfile
@@ -1,9 +1,222 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.contrib.gis.db import models as gis_models
 
+logger = logging.getLogger(__name__)
+
+
+class CountryIndex(object):
+    """
+    A process-wide spatial index (an STRtree of prepared geometries) of all
+    Countries; this allows points to be matched to countries w/out a round
+    trip to PostGIS.  The index is built lazily (in a background thread,
+    unless SAFERS_COUNTRY_INDEX_BUILD_IN_BACKGROUND is False) the first time
+    it is used; until it is ready lookups fall back to the db.  Saving or
+    deleting a Country increments a version in the shared cache (see
+    `safers.core.signals`), which is checked at most every `check_interval`
+    seconds, so that every process rebuilds its index.
+    """
+
+    version_key = "country-index-version"
+
+    def __init__(self, srid=4326, check_interval=5):
+        self.srid = srid
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.tree = None
+        self.countries = None
+        self.version = None
+        self.version_checked_at = None
+        # incremented whenever the index is cleared; any build in progress
+        # at the time is then stale
+        self.generation = 0
+        self.is_building = False
+
+    @property
+    def is_ready(self):
+        return self.tree is not None
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # a missing (ie: evicted) version must not match any cached one
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def check_version(self):
+        """
+        clears the index if it has been invalidated by any process
+        """
+        now = time.monotonic()
+        with self.lock:
+            if self.tree is None or now - self.version_checked_at < self.check_interval:  # yapf: disable
+                return
+            version = self.version
+
+        if self.get_version() != version:
+            self.clear()
+        else:
+            with self.lock:
+                self.version_checked_at = now
+
+    def invalidate(self):
+        """
+        invalidates the index of every process
+        """
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.tree = None
+            self.countries = None
+            self.version = None
+            self.version_checked_at = None
+            self.generation += 1
+
+    def build(self):
+        import shapely
+
+        with self.lock:
+            generation = self.generation
+        version = self.get_version()
+
+        # countries are stored in pk order so that the lowest index of
+        # any match corresponds to the result of an unordered .first();
+        # the (large) geometries are only kept in the tree itself
+        countries = list(Country.objects.order_by("pk"))
+        country_geometries = shapely.from_wkb([
+            bytes(country.geometry.transform(self.srid, clone=True).wkb)
+            if country.geometry.srid != self.srid else
+            bytes(country.geometry.wkb) for country in countries
+        ])
+        for country in countries:
+            # defers the field
+            country.__dict__.pop("geometry", None)
+        shapely.prepare(country_geometries)
+        tree = shapely.STRtree(country_geometries)
+
+        with self.lock:
+            if generation == self.generation:
+                self.tree = tree
+                self.countries = countries
+                self.version = version
+                self.version_checked_at = time.monotonic()
+
+    def schedule_build(self):
+        """
+        builds the index in a background thread, or straightaway if
+        SAFERS_COUNTRY_INDEX_BUILD_IN_BACKGROUND is False (a background
+        thread uses its own db connection, which cannot see uncommitted
+        Countries - as in tests)
+        """
+        try:
+            import shapely
+        except ImportError:
+            return
+
+        if not settings.SAFERS_COUNTRY_INDEX_BUILD_IN_BACKGROUND:
+            self.build()
+            return
+
+        with self.lock:
+            if self.is_building:
+                return
+            self.is_building = True
+
+        def _build():
+            from django.db import close_old_connections
+            try:
+                self.build()
+            except Exception as e:
+                logger.error(f"unable to build country index: {e}")
+            finally:
+                close_old_connections()
+                with self.lock:
+                    self.is_building = False
+
+        threading.Thread(target=_build, daemon=True).start()
+
+    def query(self, points):
+        """
+        returns a list of Countries (or None) for each of points
+        or None if the index is not yet ready
+        """
+        self.check_version()
+        with self.lock:
+            tree = self.tree
+            countries = self.countries
+
+        if tree is None:
+            self.schedule_build()
+            with self.lock:
+                tree = self.tree
+                countries = self.countries
+            if tree is None:
+                return None
+
+        import shapely
+
+        indices = [
+            i for i, point in enumerate(points)
+            if point is not None and not point.empty
+        ]
+        coords = [
+            (point.transform(self.srid, clone=True)
+             if point.srid and point.srid != self.srid else point).coords
+            for point in (points[i] for i in indices)
+        ]
+
+        point_countries = [None] * len(points)
+        if coords:
+            point_indices, country_indices = tree.query(
+                shapely.points(coords), predicate="intersects"
+            )
+            for point_index, country_index in sorted(
+                zip(point_indices.tolist(), country_indices.tolist()),
+                reverse=True,
+            ):
+                # reverse sort means the lowest country index is written last
+                point_countries[indices[point_index]] = countries[country_index]
+
+        return point_countries
+
+
+COUNTRY_INDEX = CountryIndex()
+
 
 class CountryManager(models.Manager):
-    pass
+    def country_for_point(self, point):
+        return self.countries_for_points([point])[0]
+
+    def countries_for_points(self, points):
+        """
+        returns the first Country intersecting each of points (or None);
+        uses COUNTRY_INDEX if it is ready (and working), and the db otherwise
+        """
+        points = list(points)
+
+        try:
+            countries = COUNTRY_INDEX.query(points)
+        except Exception as e:
+            logger.error(f"unable to query country index: {e}")
+            countries = None
+        if countries is None:
+            countries = [
+                self.get_queryset().filter(geometry__intersects=point).first()
+                if point is not None else None for point in points
+            ]
+
+        return countries
 
 
 class Country(gis_models.Model):
@@ -11,6 +11,8 @@ class SafersSettings(SingletonMixin, models.Model):
         verbose_name = "Safers Settings"
         verbose_name_plural = "Safers Settings"
 
+    modified = models.DateTimeField(auto_now=True)
+
     display_dashboard_notifications = models.BooleanField(
         default=True,
         help_text=_("Display the top panel of the general dashboard."),
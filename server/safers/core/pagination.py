@@ -0,0 +1,264 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict, namedtuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple("Cursor", ["position", "reverse"])
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder truncates datetimes & times to milliseconds; the
+    position of a cursor must keep their full (microsecond) precision or
+    else rows w/ microseconds would be skipped or repeated across pages
+    """
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class FavoriteKeysetPagination(BasePagination):
+    """
+    Opt-in keyset (aka "seek") pagination for querysets that are ordered
+    favorites-first (as per `MultiFieldOrderingFilter`); results are
+    paginated by the key (favorite, <keyset_field>, id).  Unlike offset-
+    based pagination (or DRF's CursorPagination, which only seeks on the
+    first ordering field) each page is a single indexed range query, so
+    fetching page N is no more expensive than fetching page 1, and cursors
+    remain stable as new objects are added.
+
+    Pagination is only applied if the request includes either a page_size
+    or a cursor; otherwise the entire (unpaginated) list is returned.
+    usage is:
+      <domain>/api/alerts/?page_size=100
+      <domain>/api/alerts/?page_size=100&cursor=<next>
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = _("The pagination cursor value.")
+    page_size_query_param = "page_size"
+    page_size_query_description = _("Number of results to return per page.")
+    default_page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = _("Invalid cursor")
+
+    favorite_field = "favorite"
+    keyset_field = "timestamp"
+    id_field = "id"
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param)
+        if page_size is None:
+            if self.cursor_query_param in request.query_params:
+                return self.default_page_size
+            return None
+        try:
+            page_size = int(page_size)
+            if page_size <= 0:
+                raise ValueError()
+        except ValueError:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    def get_keys(self, queryset):
+        """
+        returns a list of (field_name, descending) pairs to paginate by;
+        the direction of keyset_field is taken from the queryset's ordering
+        (as set by the "order" filter, whose default is most-recent-first
+        for both paginated and unpaginated lists)
+        """
+        descending = True
+        for ordering in queryset.query.order_by:
+            if isinstance(ordering, str
+                         ) and ordering.lstrip("-") == self.keyset_field:
+                descending = ordering.startswith("-")
+                break
+
+        keys = []
+        if self.favorite_field in queryset.query.annotations:
+            keys.append((self.favorite_field, True))
+        keys.append((self.keyset_field, descending))
+        keys.append((self.id_field, descending))
+        return keys
+
+    def get_ordering(self, keys, reverse):
+        # nulls are always last when going forwards
+        # (and so always first when going backwards)
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        return [
+            F(field_name).desc(**nulls)
+            if descending != reverse else F(field_name).asc(**nulls)
+            for field_name, descending in keys
+        ]
+
+    def get_keyset_filter(self, keys, position, reverse):
+        """
+        returns a Q object matching everything after position (in the
+        ordering specified by keys & reverse)
+        """
+        def _equals(field_name, value):
+            if value is None:
+                return Q(**{f"{field_name}__isnull": True})
+            return Q(**{field_name: value})
+
+        def _after(field_name, descending, value):
+            if value is None:
+                if reverse:
+                    return Q(**{f"{field_name}__isnull": False})
+                return Q(pk__in=[])
+            lookup = "lt" if descending != reverse else "gt"
+            q = Q(**{f"{field_name}__{lookup}": value})
+            if not reverse:
+                q |= Q(**{f"{field_name}__isnull": True})
+            return q
+
+        keyset_filter = Q(pk__in=[])
+        equals_filter = Q()
+        for (field_name, descending), value in zip(keys, position):
+            keyset_filter |= equals_filter & _after(
+                field_name, descending, value
+            )
+            equals_filter &= _equals(field_name, value)
+
+        return keyset_filter
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if self.page_size is None:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.keys = self.get_keys(queryset)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor.reverse if self.cursor else False
+
+        queryset = queryset.order_by(*self.get_ordering(self.keys, reverse))
+        if self.cursor:
+            queryset = queryset.filter(
+                self.get_keyset_filter(
+                    self.keys, self.cursor.position, reverse
+                )
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return self.page
+
+    def get_position(self, obj):
+        return [getattr(obj, field_name) for field_name, _ in self.keys]
+
+    def encode_cursor(self, cursor):
+        querystring = urlsafe_b64encode(
+            json.dumps({
+                "p": cursor.position, "r": cursor.reverse
+            },
+                       cls=CursorJSONEncoder).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, querystring
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            decoded = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = decoded["p"], bool(decoded["r"])
+            assert isinstance(position, list)
+            assert len(position) == len(self.keys)
+        except (AssertionError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(position=position, reverse=reverse)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # an empty page reached by going backwards; resume from the cursor
+            return self.encode_cursor(Cursor(self.cursor.position, False))
+        return self.encode_cursor(
+            Cursor(position=self.get_position(self.page[-1]), reverse=False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # an empty page reached by going forwards; resume from the cursor
+            return self.encode_cursor(Cursor(self.cursor.position, True))
+        return self.encode_cursor(
+            Cursor(position=self.get_position(self.page[0]), reverse=True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(self.cursor_query_description),
+                "schema": {
+                    "type": "string",
+                },
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(self.page_size_query_description),
+                "schema": {
+                    "type": "integer",
+                },
+            },
+        ]
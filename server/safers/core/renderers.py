@@ -0,0 +1,62 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class GeoJSONStreamRenderer(BaseRenderer):
+    """
+    Renders serialized objects as a GeoJSON FeatureCollection, where each
+    object's serialized data (less its "geometry") are the feature's
+    properties.  List views that use `GeoJSONStreamListModelMixin` do not
+    call `render` at all; instead they stream the features one chunk at a
+    time (see `iter_features`); other views are rendered as normal.
+    usage is:
+      <domain>/api/alerts/?format=geojson-stream
+    """
+
+    media_type = "application/geo+json"
+    format = "geojson-stream"
+    charset = None
+
+    encoder_class = JSONEncoder
+
+    def encode(self, data):
+        return json.dumps(
+            data,
+            cls=self.encoder_class,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+
+    def render_feature(self, data, geometry):
+        """
+        returns a single Feature as a string; geometry is a GEOSGeometry
+        (whose GeoJSON is written as-is rather than re-encoded)
+        """
+        properties = {k: v for k, v in data.items() if k != "geometry"}
+        return "".join([
+            '{"type":"Feature","id":',
+            self.encode(properties.get("id")),
+            ',"geometry":',
+            geometry.json if geometry is not None else "null",
+            ',"properties":',
+            self.encode(properties),
+            "}",
+        ])
+
+    def iter_features(self, features):
+        """
+        yields a FeatureCollection of features (an iterable of strings)
+        as a sequence of encoded chunks
+        """
+        yield b'{"type":"FeatureCollection","features":['
+        for i, feature in enumerate(features):
+            yield (feature if i == 0 else "," + feature).encode("utf-8")
+        yield b"]}"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return self.encode(data).encode("utf-8")
@@ -1,2 +1,3 @@
 from .serializers_settings import SafersSettingsSerializer
-from .serializers_utils import ContextVariableDefault, SwaggerCurrentUserDefault
\ No newline at end of file
+from .serializers_utils import ContextVariableDefault, SwaggerCurrentUserDefault
+from .serializers_snapshot import SnapshotViewSerializer
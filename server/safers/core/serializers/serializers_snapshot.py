@@ -0,0 +1,77 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers, ISO_8601
+
+SnapshotDateTimeFormats = [ISO_8601, "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d"]
+
+
+class SnapshotViewSerializer(serializers.Serializer):
+    """
+    Note that this isn't a ModelSerializer; it's just
+    used for query_param validation in SnapshotView
+    """
+
+    SECTIONS = [
+        # sections fetched from the gateway
+        "reports",
+        "missions",
+        "communications",
+        "actions",
+        "tweets",
+        # sections fetched from the local db
+        "alerts",
+        "events",
+        "notifications",
+    ]
+
+    sections = serializers.MultipleChoiceField(
+        choices=SECTIONS,
+        default=SECTIONS,
+        required=False,
+    )
+
+    bbox = serializers.CharField(required=False)
+
+    start = serializers.DateTimeField(
+        input_formats=SnapshotDateTimeFormats, required=False
+    )
+    end = serializers.DateTimeField(
+        input_formats=SnapshotDateTimeFormats, required=False
+    )
+
+    default_date = serializers.BooleanField(
+        default=False,
+        required=False,
+        help_text=_(
+            "If default_date is True and no start/end is provided the default start (3 days prior to now) and end (now) will be used; "
+            "If default_date is False and no start/end is provided then no date filter will be applied"
+        )
+    )
+    default_bbox = serializers.BooleanField(
+        default=True,
+        required=False,
+        help_text=_(
+            "If default_bbox is True and no bbox is provided the user's default_aoi bbox will be used; "
+            "If default_bbox is False and no bbox is provided then no bbox filter will be applied"
+        )
+    )
+
+    def validate_bbox(self, value):
+        try:
+            bbox = list(map(float, value.split(",")))
+            assert len(bbox) == 4, "bbox must contain 4 values"
+        except Exception as e:
+            raise serializers.ValidationError(e)
+        return bbox
+
+    def validate(self, data):
+
+        validated_data = super().validate(data)
+
+        # check timestamps...
+        start = validated_data.get("start")
+        end = validated_data.get("end")
+        if start and end and start >= end:
+            raise serializers.ValidationError("end must occur after start")
+
+        return validated_data
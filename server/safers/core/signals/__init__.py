@@ -1,2 +1,3 @@
+from .signals_countries import *
 from .signals_sites import *
 from .signals_utils import *
\ No newline at end of file
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+
+from safers.core.models import Country, COUNTRY_INDEX
+
+
+def country_changed_handler(sender, *args, **kwargs):
+    """
+    If a Country has changed, then the spatial index must be rebuilt.
+    """
+    COUNTRY_INDEX.invalidate()
+
+
+post_save.connect(
+    country_changed_handler,
+    sender=Country,
+    dispatch_uid="safers_post_save_country_handler",
+)
+
+post_delete.connect(
+    country_changed_handler,
+    sender=Country,
+    dispatch_uid="safers_post_delete_country_handler",
+)
@@ -1,3 +1,5 @@
+import threading
+
 from django.dispatch import Signal, receiver
 
 # generic signal that geometries send to parents when their geometry updates
@@ -6,6 +8,100 @@ from django.dispatch import Signal, receiver
 geometry_updated = Signal()#providing_args=["geometry", "parent"])
 
 
+class GeometryRecalculationCounters(object):
+    """
+    Keeps track of how many parent recalculations were requested (ie: how many
+    times geometry_updated was sent) vs how many were actually performed.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requested = 0
+            self.recalculated = 0
+
+    def increment(self, requested=0, recalculated=0):
+        with self.lock:
+            self.requested += requested
+            self.recalculated += recalculated
+
+    @property
+    def coalesced(self):
+        return self.requested - self.recalculated
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "requested": self.requested,
+                "recalculated": self.recalculated,
+                "coalesced": self.requested - self.recalculated,
+            }
+
+
+GEOMETRY_RECALCULATION_COUNTERS = GeometryRecalculationCounters()
+
+_geometry_recalculation_state = threading.local()
+
+
+def recalculate_parent_geometries(parents):
+    for parent in parents:
+        parent.recalculate_geometries(force_save=True)
+        GEOMETRY_RECALCULATION_COUNTERS.increment(recalculated=1)
+
+
+class GeometryRecalculationScope(object):
+    """
+    Context manager which collects the parents of any geometries updated inside
+    it and recalculates each parent exactly once when the outermost scope
+    exits (inside the caller's transaction, so that the rest of that
+    transaction sees the recalculated geometries and a failed recalculation
+    rolls it back).  Nested scopes are merged into the outermost one.  Usage is:
+    >>> with GeometryRecalculationScope():
+    >>>     for geometry in geometries:
+    >>>         geometry.save()
+    """
+    def __init__(self):
+        self.parents = {}
+
+    @staticmethod
+    def get_scopes():
+        if not hasattr(_geometry_recalculation_state, "scopes"):
+            _geometry_recalculation_state.scopes = []
+        return _geometry_recalculation_state.scopes
+
+    @classmethod
+    def get_current_scope(cls):
+        scopes = cls.get_scopes()
+        if scopes:
+            return scopes[-1]
+
+    def add(self, parent):
+        # the most recent instance of a parent is the one that gets recalculated
+        self.parents[(parent._meta.label, parent.pk)] = parent
+        GEOMETRY_RECALCULATION_COUNTERS.increment(requested=1)
+
+    def __enter__(self):
+        self.get_scopes().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        scopes = self.get_scopes()
+        scopes.pop()
+
+        if exc_type is not None:
+            # the transaction is going to be rolled back anyway
+            return False
+
+        if scopes:
+            scopes[-1].parents.update(self.parents)
+        else:
+            recalculate_parent_geometries(self.parents.values())
+
+        return False
+
+
 @receiver(geometry_updated)
 def geometry_updated_handler(sender, *args, **kwargs):
     """
@@ -14,4 +110,10 @@ def geometry_updated_handler(sender, *args, **kwargs):
     """
     geometery = kwargs["geometry"]
     parent = kwargs["parent"]
-    parent.recalculate_geometries(force_save=True)
+
+    scope = GeometryRecalculationScope.get_current_scope()
+    if scope is not None:
+        scope.add(parent)
+    else:
+        GEOMETRY_RECALCULATION_COUNTERS.increment(requested=1)
+        recalculate_parent_geometries([parent])
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+# Load test comparing the throughput of the gateway-proxy views under WSGI
+# (sync views) & ASGI (async views; SAFERS_ASYNC_PROXY_VIEWS=True).  Start
+# both deployments, ie:
+# $ gunicorn --bind :8000 --workers 1 config.wsgi
+# $ SAFERS_ASYNC_PROXY_VIEWS=True gunicorn --bind :8001 --workers 1 -k uvicorn.workers.UvicornWorker config.asgi
+# and then run (from the "server" directory):
+# $ python -m safers.core.tests.benchmark_proxies --token <token> \
+#     --url http://localhost:8000/api/chatbot/reports \
+#     --url http://localhost:8001/api/chatbot/reports
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def load_test(url, token=None, n_requests=1000, concurrency=100):
+    import asyncio
+    import time
+
+    from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+
+    http_client = AsyncHTTPClient(force_instance=True, max_clients=concurrency)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    latencies = []
+    errors = 0
+    remaining = iter(range(n_requests))
+
+    async def _worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await http_client.fetch(
+                HTTPRequest(url, headers=headers, request_timeout=120),
+                raise_error=False,
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    http_client.close()
+
+    return {
+        "url": url,
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed": elapsed,
+        "requests_per_second": n_requests / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def run_benchmark(urls, token=None, n_requests=1000, concurrency=100):
+    import asyncio
+
+    for url in urls:
+        results = asyncio.run(
+            load_test(
+                url,
+                token=token,
+                n_requests=n_requests,
+                concurrency=concurrency,
+            )
+        )
+        print(f"{results['url']}:")
+        print(f"  {results['requests']} requests ({results['errors']} errors) w/ concurrency {results['concurrency']} in {results['elapsed']:.2f}s")  # yapf: disable
+        print(f"  {results['requests_per_second']:.1f} requests/sec")
+        print(f"  latency p50: {results['p50'] * 1000:.0f}ms, p95: {results['p95'] * 1000:.0f}ms, p99: {results['p99'] * 1000:.0f}ms")  # yapf: disable
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", action="append", required=True)
+    parser.add_argument("--token")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    run_benchmark(
+        args.url,
+        token=args.token,
+        n_requests=args.requests,
+        concurrency=args.concurrency,
+    )
@@ -0,0 +1,286 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from safers.core import clients
+from safers.core.authentication import TokenAuthentication
+from safers.core.clients import (
+    GATEWAY_CLIENT,
+    AsyncSingleFlight,
+    LatencyHistograms,
+    SingleFlight,
+    create_requests_session,
+    get_request_key,
+)
+
+
+class MockResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"data": self.data}
+
+
+class MockAdapter(BaseAdapter):
+    def __init__(self, status_code=200):
+        super().__init__()
+        self.status_code = status_code
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class TestTransport:
+    def test_latency_histograms(self):
+
+        histograms = LatencyHistograms(buckets=[0.1, 1])
+        histograms.observe("GET /a", 0.05)
+        histograms.observe("GET /a", 0.5)
+        histograms.observe("GET /a", 5, error=True)
+        histograms.observe("GET /b", 0.1)
+
+        assert histograms.as_dict() == {
+            "GET /a": {
+                "buckets": {"0.1": 1, "1": 1, "+Inf": 1},
+                "count": 3,
+                "errors": 1,
+                "sum": 5.55,
+            },
+            "GET /b": {
+                "buckets": {"0.1": 1, "1": 0, "+Inf": 0},
+                "count": 1,
+                "errors": 0,
+                "sum": 0.1,
+            },
+        }
+
+    def test_create_requests_session(self):
+
+        session = create_requests_session(
+            pool_size=4, max_retries=3, backoff_factor=0.5
+        )
+        adapter = session.get_adapter("https://gateway/")
+
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 3
+        assert adapter.max_retries.backoff_factor == 0.5
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_session_is_instrumented(self):
+
+        session = create_requests_session()
+        session.histograms = LatencyHistograms()
+        session.mount("https://gateway/", MockAdapter(status_code=200))
+        session.mount("https://gateway/errors", MockAdapter(status_code=500))
+
+        session.get("https://gateway/api/path", params={"a": 1})
+        session.get("https://gateway/api/path", params={"a": 2})
+        session.get("https://gateway/errors/path")
+
+        histograms = session.histograms.as_dict()
+        assert histograms["GET gateway/api/path"]["count"] == 2
+        assert histograms["GET gateway/api/path"]["errors"] == 0
+        assert histograms["GET gateway/errors/path"]["errors"] == 1
+
+
+class TestSingleFlight:
+    def test_collapses_concurrent_calls(self):
+
+        n_callers = 8
+        single_flight = SingleFlight()
+        barrier = threading.Barrier(n_callers)
+        started = threading.Event()
+        release = threading.Event()
+        n_calls = 0
+
+        def _fn():
+            nonlocal n_calls
+            n_calls += 1
+            started.set()
+            release.wait(timeout=5)
+            return {"data": []}
+
+        def _call():
+            barrier.wait(timeout=5)
+            return single_flight.do("key", _fn)
+
+        with ThreadPoolExecutor(max_workers=n_callers) as executor:
+            futures = [executor.submit(_call) for _ in range(n_callers)]
+            started.wait(timeout=5)
+            # give the other callers a chance to join the in-flight call
+            while single_flight.as_dict()["requested"] < n_callers:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert n_calls == 1
+        assert all(result == {"data": []} for result in results)
+        assert single_flight.as_dict() == {
+            "requested": n_callers,
+            "executed": 1,
+            "collapsed": n_callers - 1,
+            "in_flight": 0,
+        }
+
+    def test_shares_exceptions(self):
+
+        single_flight = SingleFlight()
+
+        def _fn():
+            raise ValueError("error")
+
+        with pytest.raises(ValueError):
+            single_flight.do("key", _fn)
+
+        # a failed call is not remembered
+        assert single_flight.do("key", lambda: 1) == 1
+
+    def test_async_collapses_concurrent_calls(self):
+
+        n_callers = 8
+        single_flight = AsyncSingleFlight()
+        n_calls = 0
+
+        async def _fn():
+            nonlocal n_calls
+            n_calls += 1
+            await asyncio.sleep(0.01)
+            return {"data": []}
+
+        async def _call_all():
+            return await asyncio.gather(
+                *[single_flight.do("key", _fn) for _ in range(n_callers)]
+            )
+
+        results = asyncio.run(_call_all())
+
+        assert n_calls == 1
+        assert all(result == {"data": []} for result in results)
+        assert single_flight.as_dict()["collapsed"] == n_callers - 1
+        assert single_flight.as_dict()["in_flight"] == 0
+
+    def test_async_cancel_leader(self):
+
+        single_flight = AsyncSingleFlight()
+        n_calls = 0
+
+        async def _fn():
+            nonlocal n_calls
+            n_calls += 1
+            await asyncio.sleep(0.05)
+            return {"data": []}
+
+        async def _cancel_leader():
+            leader = asyncio.ensure_future(single_flight.do("key", _fn))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(single_flight.do("key", _fn))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return leader, await waiter
+
+        leader, result = asyncio.run(_cancel_leader())
+
+        # only the leader is cancelled; the waiter still gets the result
+        assert leader.cancelled()
+        assert result == {"data": []}
+        assert n_calls == 1
+        assert single_flight.as_dict()["in_flight"] == 0
+
+    def test_request_key(self):
+
+        url = "https://gateway/api/services/app/Layers/GetLayers"
+        auth_1 = TokenAuthentication("token_1")
+        auth_2 = TokenAuthentication("token_2")
+
+        assert get_request_key(
+            "GET", url, params={"a": 1, "b": 2}, auth=auth_1
+        ) == get_request_key(
+            "GET", url, params={"b": 2, "a": 1}, auth=TokenAuthentication("token_1")
+        )
+        assert get_request_key(
+            "GET", url, params={"a": 1}, auth=auth_1
+        ) != get_request_key("GET", url, params={"a": 1}, auth=auth_2)
+        assert get_request_key(
+            "GET", url, params={"a": 1}, auth=auth_1
+        ) != get_request_key("GET", url, params={"a": 2}, auth=auth_1)
+
+
+def organization_data(id, parent_id=None, has_children=False):
+    return {
+        "id": id,
+        "name": f"organization_{id}",
+        "parentId": parent_id,
+        "hasChildren": has_children,
+    }
+
+
+# 1 & 2 are top-level; 3 & 4 are children of 1; 5 is a child of 3
+# (2 claims to have children but returns some already seen organizations)
+MOCK_ORGANIZATIONS_TREE = {
+    None: [
+        organization_data(1, has_children=True),
+        organization_data(2, has_children=True),
+    ],
+    1: [
+        organization_data(3, parent_id=1, has_children=True),
+        organization_data(4, parent_id=1),
+    ],
+    2: [
+        organization_data(3, parent_id=1, has_children=True),
+        organization_data(4, parent_id=1),
+    ],
+    3: [organization_data(5, parent_id=3)],
+}
+
+
+@pytest.fixture
+def mock_organizations_request(monkeypatch):
+    requested_parent_ids = []
+    lock = threading.Lock()
+
+    def _mock_request(*args, params=None, **kwargs):
+        parent_id = params.get("parentId")
+        with lock:
+            requested_parent_ids.append(parent_id)
+        return MockResponse(MOCK_ORGANIZATIONS_TREE.get(parent_id, []))
+
+    monkeypatch.setattr(clients.requests_session, "request", _mock_request)
+    return requested_parent_ids
+
+
+class TestGatewayClient:
+    def test_get_organizations(self, mock_organizations_request):
+
+        organizations_data = GATEWAY_CLIENT.get_organizations(max_workers=2)
+
+        assert [organization["id"] for organization in organizations_data
+               ] == [1, 2, 3, 4, 5]
+
+        # one request per parent organization
+        assert sorted(
+            mock_organizations_request, key=lambda x: x or 0
+        ) == [None, 1, 2, 3]
+
+    def test_get_organizations_max_depth(self, mock_organizations_request):
+
+        organizations_data = GATEWAY_CLIENT.get_organizations(max_depth=2)
+
+        assert [organization["id"] for organization in organizations_data
+               ] == [1, 2, 3, 4]
+        assert 3 not in mock_organizations_request
@@ -0,0 +1,103 @@
+import pytest
+
+from django.contrib.gis import geos
+
+from safers.core.models import Country, COUNTRY_INDEX
+from safers.core.models.models_countries import CountryIndex
+
+
+@pytest.fixture
+def countries():
+    return [
+        Country.objects.create(
+            sovereign_name=name,
+            sovereign_code=code,
+            admin_name=name,
+            admin_code=code,
+            geometry=geos.Polygon.from_bbox(bbox),
+        ) for name, code, bbox in [
+            ("Westland", "WST", (0, 0, 10, 10)),
+            ("Eastland", "EST", (10, 0, 20, 10)),
+        ]
+    ]
+
+
+@pytest.mark.django_db
+class TestCountryIndex:
+
+    POINTS = [
+        geos.Point(5, 5),
+        geos.Point(15, 5),
+        geos.Point(10, 5),  # on the border
+        geos.Point(50, 50),  # in no country
+        None,
+    ]
+
+    def test_countries_for_points_cold(self, countries, monkeypatch):
+        monkeypatch.setattr(COUNTRY_INDEX, "schedule_build", lambda: None)
+        COUNTRY_INDEX.invalidate()
+
+        assert not COUNTRY_INDEX.is_ready
+        assert Country.objects.countries_for_points(self.POINTS) == [
+            countries[0],
+            countries[1],
+            countries[0],
+            None,
+            None,
+        ]
+
+    def test_countries_for_points(self, countries):
+        pytest.importorskip("shapely")
+
+        COUNTRY_INDEX.invalidate()
+        COUNTRY_INDEX.build()
+
+        assert COUNTRY_INDEX.is_ready
+        assert Country.objects.countries_for_points(self.POINTS) == [
+            countries[0],
+            countries[1],
+            countries[0],
+            None,
+            None,
+        ]
+        assert Country.objects.country_for_point(self.POINTS[1]) == countries[1]
+
+    def test_countries_for_points_index_error(self, countries, monkeypatch):
+        def _query(points):
+            raise ValueError("broken index")
+
+        monkeypatch.setattr(COUNTRY_INDEX, "query", _query)
+
+        # falls back to the db
+        assert Country.objects.countries_for_points(self.POINTS) == [
+            countries[0],
+            countries[1],
+            countries[0],
+            None,
+            None,
+        ]
+
+    def test_invalidate_on_save(self, countries):
+        pytest.importorskip("shapely")
+
+        COUNTRY_INDEX.build()
+        assert COUNTRY_INDEX.is_ready
+
+        country = countries[0]
+        country.geometry = geos.Polygon.from_bbox((0, 0, 5, 5))
+        country.save()
+        assert not COUNTRY_INDEX.is_ready
+
+    def test_invalidate_other_process(self, countries):
+        pytest.importorskip("shapely")
+
+        country_index = CountryIndex(check_interval=0)
+        country_index.build()
+        assert country_index.is_ready
+
+        # another process saves a Country...
+        CountryIndex().invalidate()
+
+        # and this process notices on its next lookup
+        country_index.check_version()
+        assert not country_index.is_ready
@@ -0,0 +1,73 @@
+import pytest
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from safers.core.models import SafersSettings
+from safers.core.tests.factories import safers_settings
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSafersSettingsCache:
+    def test_load_is_cached(self, settings, django_assert_num_queries):
+        settings.SINGLETON_CACHE_CHECK_INTERVAL = 60
+
+        SafersSettings.clear_singleton_instance()
+        safers_settings = SafersSettings.load()
+
+        with django_assert_num_queries(0):
+            assert SafersSettings.load() == safers_settings
+
+        safers_settings.polling_frequency += 1
+        safers_settings.save()
+
+        # the local copy is cleared on save...
+        assert SafersSettings.load(
+        ).polling_frequency == safers_settings.polling_frequency
+        # ...and is never shared
+        assert SafersSettings.load() is not SafersSettings.load()
+
+    def test_load_checks_version(self, settings):
+        settings.SINGLETON_CACHE_CHECK_INTERVAL = 0
+
+        SafersSettings.clear_singleton_instance()
+        safers_settings = SafersSettings.load()
+
+        # simulate another process updating the settings
+        SafersSettings.objects.filter(pk=safers_settings.pk).update(
+            polling_frequency=safers_settings.polling_frequency + 1
+        )
+        assert SafersSettings.load(
+        ).polling_frequency == safers_settings.polling_frequency
+        SafersSettings.increment_singleton_version()
+        assert SafersSettings.load(
+        ).polling_frequency == safers_settings.polling_frequency + 1
+
+
+@pytest.mark.django_db
+class TestSafersSettingsView:
+    def test_conditional_requests(self, safers_settings):
+        client = APIClient()
+        url = reverse("settings")
+
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response["ETag"]
+        last_modified = response["Last-Modified"]
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        safers_settings.polling_frequency += 1
+        safers_settings.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert response.data["polling_frequency"
+                            ] == safers_settings.polling_frequency
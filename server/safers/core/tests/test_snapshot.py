@@ -0,0 +1,130 @@
+import pytest
+import time
+
+from django.urls import resolve, reverse
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from safers.users.tests.factories import UserFactory
+
+from safers.core.views import views_snapshot
+from safers.core.views.views_snapshot import SnapshotView
+
+MOCK_GATEWAY_DATA = {
+    SnapshotView.GATEWAY_SECTIONS["actions"].path: {
+        "data": [{
+            "id": 1,
+            "displayName": "first.responder.test.1",
+            "organizationName": "Test Organization",
+            "activityName": "Surveillance",
+            "status": "Active",
+            "timestamp": "2022-05-04T13:19:15.004Z",
+            "longitude": 7.65952,
+            "latitude": 45.065549,
+        }]
+    },
+    SnapshotView.GATEWAY_SECTIONS["missions"].path: {
+        "data": []
+    },
+}
+
+MOCK_GATEWAY_DELAY = 0.2
+
+
+@pytest.mark.django_db
+class TestSnapshotView:
+    @pytest.fixture
+    def mock_gateway(self, monkeypatch):
+        proxy_requests = []
+
+        def _mock_get(path, params=None, auth=None, **kwargs):
+            proxy_requests.append((path, params, auth.token))
+            time.sleep(MOCK_GATEWAY_DELAY)
+            if path not in MOCK_GATEWAY_DATA:
+                raise Exception("gateway error")
+            return MOCK_GATEWAY_DATA[path]
+
+        monkeypatch.setattr(views_snapshot.GATEWAY_CLIENT, "get", _mock_get)
+        return proxy_requests
+
+    def get_response(self, user, params):
+        view = SnapshotView.as_view()
+        request = APIRequestFactory().get(reverse("snapshot"), params)
+        force_authenticate(request, user=user, token="token")
+        return view(request)
+
+    def test_url(self):
+        assert resolve(reverse("snapshot")).func.view_class == SnapshotView
+
+    def test_get(self, mock_gateway):
+
+        user = UserFactory()
+
+        response = self.get_response(
+            user,
+            {
+                "bbox": "1,2,3,4",
+                "start": "2022-05-01",
+                "end": "2022-05-05",
+                "sections": ["actions", "missions", "tweets", "alerts"],
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        sections = response.data["sections"]
+        assert list(sections) == ["missions", "actions", "tweets", "alerts"]
+
+        assert sections["actions"]["status"] == "ok"
+        assert [action["id"] for action in sections["actions"]["data"]] == ["1"]
+        assert sections["missions"]["status"] == "ok"
+        assert sections["missions"]["data"] == []
+        assert sections["alerts"]["status"] == "ok"
+
+        # a failing section doesn't fail the request
+        assert sections["tweets"]["status"] == "error"
+        assert sections["tweets"]["error"] == "gateway error"
+        assert "data" not in sections["tweets"]
+
+        # every gateway request uses the same window...
+        assert len(mock_gateway) == 3
+        for path, params, token in mock_gateway:
+            assert token == "token"
+        _, actions_params, _ = next(
+            proxy_request for proxy_request in mock_gateway
+            if proxy_request[0] == SnapshotView.GATEWAY_SECTIONS["actions"].path
+        )
+        assert actions_params["NorthEastBoundary.Latitude"] == 4
+        assert actions_params["SouthWestBoundary.Longitude"] == 1
+
+        # ...and they are made concurrently
+        assert response.data["elapsed_ms"] < 3 * MOCK_GATEWAY_DELAY * 1000
+
+        assert "actions;dur=" in response.headers["Server-Timing"]
+
+    def test_get_default_bbox(self, mock_gateway):
+
+        user = UserFactory()
+
+        response = self.get_response(user, {"sections": ["missions"]})
+        assert response.status_code == status.HTTP_200_OK
+
+        assert response.data["bbox"] == list(user.default_aoi.geometry.extent)
+
+    def test_get_invalid_params(self, mock_gateway):
+
+        user = UserFactory()
+
+        response = self.get_response(user, {"bbox": "1,2,3"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert mock_gateway == []
+
+    def test_get_unauthenticated(self):
+
+        view = SnapshotView.as_view()
+        request = APIRequestFactory().get(reverse("snapshot"))
+        response = view(request)
+
+        assert response.status_code in [
+            status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN
+        ]
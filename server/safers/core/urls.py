@@ -6,6 +6,9 @@ from .views import (
     settings_view,
     DocumentView,
 )
+# (not exported by .views; it depends on the views of other apps which in
+# turn depend on .views)
+from .views.views_snapshot import SnapshotView
 
 api_router = routers.DefaultRouter()
 api_urlpatterns = [
@@ -17,6 +20,7 @@ api_urlpatterns = [
         DocumentView.as_view(),
         name="documents"
     ),
+    path("snapshot", SnapshotView.as_view(), name="snapshot"),
 ]
 
 urlpatterns = []
@@ -1,7 +1,7 @@
 from .utils_settings import DynamicSetting
 from .utils_backup import backup_filename_template
 from .utils_enums import CaseInsensitiveTextChoices, SpaceInsensitiveTextChoices
-from .utils_geometry import cap_area_to_geojson
+from .utils_geometry import aggregate_geometries, cap_area_to_geojson
 from .utils_iter import chunk
 from .utils_profiling import PathMatcher, RegexPathMatcher, is_profiling_enabled
 from .utils_urls import DateTimeConverter
@@ -72,3 +72,95 @@ def cap_area_to_geojson(cap_area):
         "type": "FeatureCollection",
         "features": features,
     }
+
+
+AGGREGATE_GEOMETRIES_SQL = """
+    WITH child_geometries AS (
+        SELECT
+            ST_ForceCollection(ST_Collect({child_geometry})) AS geometry_collection,
+            ST_Centroid(ST_Collect({child_center})) AS center,
+            ST_Envelope(ST_Collect({child_bounding_box})) AS bounding_box
+        FROM {child_table}
+        WHERE {child_fk} = %(parent_pk)s
+    ),
+    parent_values AS (
+        SELECT
+            child_geometries.geometry_collection,
+            child_geometries.center,
+            child_geometries.bounding_box,
+            country.value AS country
+        FROM child_geometries
+        LEFT JOIN LATERAL (
+            SELECT {country_table}.{country_value} AS value
+            FROM {country_table}
+            WHERE ST_Intersects({country_table}.{country_geometry}, child_geometries.center)
+            ORDER BY {country_table}.{country_pk}
+            LIMIT 1
+        ) country ON TRUE
+    )
+    SELECT
+        ST_AsEWKB(parent_values.geometry_collection),
+        ST_AsEWKB(parent_values.center),
+        ST_AsEWKB(parent_values.bounding_box),
+        parent_values.country
+    FROM parent_values
+"""
+
+
+def aggregate_geometries(related_manager, country_field="country"):
+    """
+    Computes the geometry_collection, center, bounding_box & country of a
+    parent (ie: an Alert) from its child geometries (ie: alert.geometries) in
+    a single query; the child geometries are collected by PostGIS rather than
+    being loaded into Python.  Returns a dict of parent attributes to set.
+    """
+    from django.db import connections, router
+    from safers.core.models import Country
+
+    parent = related_manager.instance
+    child_model = related_manager.model
+
+    parent_country_field = parent._meta.get_field(country_field)
+    if parent_country_field.is_relation:
+        country_value_field = Country._meta.pk
+    else:
+        country_value_field = Country._meta.get_field("admin_name")
+
+    connection = connections[router.db_for_write(type(parent), instance=parent)]
+    qn = connection.ops.quote_name
+
+    def column(model, field_name):
+        return qn(model._meta.get_field(field_name).column)
+
+    sql = AGGREGATE_GEOMETRIES_SQL.format(
+        child_table=qn(child_model._meta.db_table),
+        child_fk=qn(related_manager.field.column),
+        child_geometry=column(child_model, "geometry"),
+        child_center=column(child_model, "center"),
+        child_bounding_box=column(child_model, "bounding_box"),
+        country_table=qn(Country._meta.db_table),
+        country_pk=qn(Country._meta.pk.column),
+        country_value=qn(country_value_field.column),
+        country_geometry=column(Country, "geometry"),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"parent_pk": parent.pk})
+        geometry_collection, center, bounding_box, country = cursor.fetchone()
+
+    if geometry_collection is None:
+        # no child geometries; ST_Collect returns NULL, but a parent w/o any
+        # geometries has always had an empty (rather than a NULL) collection
+        return {
+            "geometry_collection": geos.GeometryCollection(),
+            "center": None,
+            "bounding_box": None,
+            parent_country_field.attname: country,
+        }
+
+    return {
+        "geometry_collection": geos.GEOSGeometry(geometry_collection),
+        "center": geos.GEOSGeometry(center),
+        "bounding_box": geos.GEOSGeometry(bounding_box),
+        parent_country_field.attname: country,
+    }
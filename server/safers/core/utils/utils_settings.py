@@ -28,7 +28,7 @@ class DynamicSetting(object):
         try:
             model = apps.get_model(app_label=app_name, model_name=model_name)
             # model is a SingletonMixin, so pk will always equal 1
-            instance, created = model.objects.get_or_create(pk=1)
+            instance, created = model.load_or_create()
             attr = getattr(instance, attr_name)
             if created and attr != self.default_value:
                 attr = self.default_value
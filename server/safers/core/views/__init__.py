@@ -1,3 +1,4 @@
 from .views_settings import settings_view
 from .views_documents import DocumentView
 from .views_base import CannotDeleteViewSet
+from .views_async import AsyncAPIViewMixin
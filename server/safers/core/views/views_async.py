@@ -0,0 +1,46 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+
+class AsyncAPIViewMixin:
+    """
+    Allows the handlers of a DRF APIView to be coroutines (which DRF does not
+    support natively).  Authentication, permissions & throttling (which may
+    hit the db) are run in a thread; the handler itself runs on the event
+    loop so that it can await I/O (ie: proxy requests to the gateway) w/out
+    holding a thread.  Handlers must wrap any (sync) db access in
+    `sync_to_async`.  Usage is:
+    >>> class MyAsyncView(AsyncAPIViewMixin, MyView):
+    >>>     async def get(self, request, *args, **kwargs):
+    >>>         ...
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers  # deprecate?
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                # (OPTIONS is handled synchronously)
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
@@ -1,3 +1,11 @@
+import hashlib
+import json
+from calendar import timegm
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
@@ -19,10 +27,26 @@ from safers.core.serializers import SafersSettingsSerializer
 @silk_profile(name="View Settings")
 def settings_view(request):
     """
-    Returns some information required by the client for initial configuration
+    Returns some information required by the client for initial configuration;
+    supports conditional requests (If-None-Match / If-Modified-Since) so that
+    polling clients receive a 304 if nothing has changed.
     """
 
     settings = SafersSettings.load()
     serializer = SafersSettingsSerializer(settings)
 
-    return Response(serializer.data)
+    etag = quote_etag(
+        hashlib.md5(
+            json.dumps(serializer.data, sort_keys=True,
+                       cls=DjangoJSONEncoder).encode()
+        ).hexdigest()
+    )
+    last_modified = timegm(settings.modified.utctimetuple())
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    ) or Response(serializer.data)
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+
+    return response
@@ -0,0 +1,347 @@
+import copy
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.http import QueryDict
+from django.utils import timezone
+
+from rest_framework import status, views
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
+
+from safers.core.authentication import TokenAuthentication
+from safers.core.clients import GATEWAY_CLIENT, REQUEST_TIMEOUT
+from safers.core.serializers import SnapshotViewSerializer
+
+from safers.alerts.views import AlertViewSet
+from safers.chatbot.views import ActionListView, CommunicationListView, MissionListView, ReportListView
+from safers.events.views import EventViewSet
+from safers.notifications.views import NotificationViewSet
+from safers.social.views import TweetView
+
+logger = logging.getLogger(__name__)
+
+# describes how to fetch a section from the gateway using an existing view;
+# the (decoded) response is passed to the view's response_method (after
+# extracting data_key, if any) to convert it into the same data the view
+# itself would return
+GatewaySection = namedtuple(
+    "GatewaySection",
+    ["view_class", "path", "params_method", "response_method", "data_key"],
+)
+
+###########
+# swagger #
+###########
+
+_snapshot_view_response = OpenApiResponse(
+    OpenApiTypes.OBJECT,
+    examples=[
+        OpenApiExample(
+            "valid response",
+            {
+                "bbox": [1.0, 2.0, 3.0, 4.0],
+                "start": "2023-01-01T00:00:00Z",
+                "end": "2023-01-04T00:00:00Z",
+                "elapsed_ms": 812.4,
+                "sections": {
+                    "reports": {
+                        "status": "ok",
+                        "elapsed_ms": 803.1,
+                        "data": ["<report>"],
+                    },
+                    "tweets": {
+                        "status": "error",
+                        "elapsed_ms": 60000.2,
+                        "error": "<error message>",
+                    },
+                    "alerts": {
+                        "status": "ok",
+                        "elapsed_ms": 41.7,
+                        "data": ["<alert>"],
+                    },
+                },
+            },
+        )
+    ],
+)
+
+#########
+# views #
+#########
+
+
+class SnapshotView(views.APIView):
+    """
+    Returns the gateway collections (reports, missions, communications,
+    actions & tweets) and the local collections (alerts, events &
+    notifications) for a single bbox & time window in one response.  The
+    gateway requests are made concurrently (over a pool of at most
+    SAFERS_GATEWAY_MAX_WORKERS threads) while the local db is queried, so the
+    response takes about as long as the slowest gateway request.  Every
+    section reports its own status & duration; a failing section does not
+    fail the whole request.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    GATEWAY_SECTIONS = {
+        "reports":
+            GatewaySection(
+                ReportListView,
+                ReportListView.GATEWAY_URL_LIST_PATH,
+                "get_proxy_list_params",
+                "get_list_response",
+                "data",
+            ),
+        "missions":
+            GatewaySection(
+                MissionListView,
+                MissionListView.GATEWAY_URL_LIST_PATH,
+                "get_proxy_list_params",
+                "get_list_response",
+                "data",
+            ),
+        "communications":
+            GatewaySection(
+                CommunicationListView,
+                CommunicationListView.GATEWAY_URL_LIST_PATH,
+                "get_proxy_list_params",
+                "get_list_response",
+                "data",
+            ),
+        "actions":
+            GatewaySection(
+                ActionListView,
+                ActionListView.GATEWAY_URL_LIST_PATH,
+                "get_proxy_list_params",
+                "get_list_response",
+                "data",
+            ),
+        "tweets":
+            GatewaySection(
+                TweetView,
+                TweetView.GATEWAY_URL_PATH,
+                "get_proxy_params",
+                "get_tweets_response",
+                None,
+            ),
+    }
+
+    # name: viewset_class
+    LOCAL_SECTIONS = {
+        "alerts": AlertViewSet,
+        "events": EventViewSet,
+        "notifications": NotificationViewSet,
+    }
+
+    def get_window(self, validated_data):
+        """
+        resolves the bbox & time window shared by every section
+        """
+        bbox = validated_data.get("bbox")
+        if bbox is None and validated_data["default_bbox"]:
+            bbox = list(self.request.user.default_aoi.geometry.extent)
+
+        start = validated_data.get("start")
+        end = validated_data.get("end")
+        if validated_data["default_date"]:
+            if start is None:
+                start = timezone.now() - settings.SAFERS_DEFAULT_TIMERANGE
+            if end is None:
+                end = timezone.now()
+
+        return bbox, start, end
+
+    def get_section_query_params(self, bbox, start, end, local=False):
+        """
+        returns the query_params to pass to a section's view; the local views
+        filter by date (using "start_date" & "end_date") whereas the gateway
+        views filter by datetime (using "start" & "end")
+        """
+        query_params = QueryDict(mutable=True)
+        query_params["default_bbox"] = "false"
+        query_params["default_date"] = "false"
+        if bbox is not None:
+            query_params["bbox"] = ",".join(map(str, bbox))
+        if local:
+            if start is not None:
+                query_params["start_date"] = start.date().isoformat()
+            if end is not None:
+                query_params["end_date"] = end.date().isoformat()
+        else:
+            if start is not None:
+                query_params["start"] = start.isoformat()
+            if end is not None:
+                query_params["end"] = end.isoformat()
+        return query_params
+
+    def get_section_view(self, view_class, query_params, **initkwargs):
+        """
+        returns an instance of view_class bound to a copy of the current
+        request w/ the specified query_params; the (already authenticated)
+        user & token are reused rather than re-authenticated
+        """
+        http_request = copy.copy(self.request._request)
+        http_request.GET = query_params
+
+        section_request = Request(http_request)
+        section_request.user = self.request.user
+        section_request.auth = self.request.auth
+
+        view = view_class(**initkwargs)
+        view.args = ()
+        view.kwargs = {}
+        view.request = section_request
+        view.format_kwarg = None
+        view.headers = {}
+        view.check_permissions(section_request)
+        return view
+
+    def get_local_section_data(self, viewset_class, query_params):
+        view = self.get_section_view(
+            viewset_class, query_params, action="list"
+        )
+        queryset = view.filter_queryset(view.get_queryset())
+        serializer = view.get_serializer(queryset, many=True)
+        return serializer.data
+
+    @staticmethod
+    def get_error_message(exception):
+        return str(getattr(exception, "detail", exception))
+
+    @extend_schema(
+        request=SnapshotViewSerializer,
+        responses={status.HTTP_200_OK: _snapshot_view_response},
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Returns a snapshot of the current situation in a single bbox & time window
+        """
+        request_start = time.perf_counter()
+
+        view_serializer = SnapshotViewSerializer(
+            data=request.query_params, context={"request": request}
+        )
+        view_serializer.is_valid(raise_exception=True)
+        sections = [
+            section for section in SnapshotViewSerializer.SECTIONS
+            if section in view_serializer.validated_data["sections"]
+        ]
+        bbox, start, end = self.get_window(view_serializer.validated_data)
+
+        results = {}
+        auth = TokenAuthentication(request.auth)
+
+        def _record(section, section_start, data=None, exception=None):
+            result = {
+                "status": "ok" if exception is None else "error",
+                "elapsed_ms":
+                    round((time.perf_counter() - section_start) * 1000, 1),
+            }
+            if exception is None:
+                result["data"] = data
+            else:
+                logger.warning(f"snapshot section {section} failed: {exception}")
+                result["error"] = self.get_error_message(exception)
+            results[section] = result
+
+        def _fetch(path, params):
+            # (runs in a worker thread; no db access allowed here)
+            return GATEWAY_CLIENT.get(
+                path, params=params, auth=auth, timeout=REQUEST_TIMEOUT
+            )
+
+        gateway_sections = [
+            section for section in sections
+            if section in self.GATEWAY_SECTIONS
+        ]
+        local_sections = [
+            section for section in sections if section in self.LOCAL_SECTIONS
+        ]
+
+        gateway_query_params = self.get_section_query_params(bbox, start, end)
+        local_query_params = self.get_section_query_params(
+            bbox, start, end, local=True
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=max(
+                1,
+                min(settings.SAFERS_GATEWAY_MAX_WORKERS, len(gateway_sections))
+            )
+        ) as executor:
+
+            # 1. start all of the gateway requests...
+            futures = {}
+            for section in gateway_sections:
+                gateway_section = self.GATEWAY_SECTIONS[section]
+                section_start = time.perf_counter()
+                try:
+                    view = self.get_section_view(
+                        gateway_section.view_class, gateway_query_params
+                    )
+                    params = getattr(view, gateway_section.params_method
+                                    )(view.request)
+                except Exception as e:
+                    _record(section, section_start, exception=e)
+                    continue
+                futures[section] = (
+                    view,
+                    section_start,
+                    executor.submit(_fetch, gateway_section.path, params),
+                )
+
+            # 2. query the local db while they are in flight...
+            for section in local_sections:
+                section_start = time.perf_counter()
+                try:
+                    data = self.get_local_section_data(
+                        self.LOCAL_SECTIONS[section], local_query_params
+                    )
+                except Exception as e:
+                    _record(section, section_start, exception=e)
+                else:
+                    _record(section, section_start, data=data)
+
+            # 3. then convert the gateway responses...
+            for section, (view, section_start, future) in futures.items():
+                gateway_section = self.GATEWAY_SECTIONS[section]
+                try:
+                    proxy_data = future.result()
+                    if gateway_section.data_key is not None:
+                        proxy_data = proxy_data[gateway_section.data_key]
+                    # (this may hit the db so it runs in this thread)
+                    response = getattr(view, gateway_section.response_method
+                                      )(proxy_data)
+                except Exception as e:
+                    _record(section, section_start, exception=e)
+                else:
+                    _record(section, section_start, data=response.data)
+
+        response = Response(
+            {
+                "bbox": bbox,
+                "start": start,
+                "end": end,
+                "elapsed_ms":
+                    round((time.perf_counter() - request_start) * 1000, 1),
+                "sections": {
+                    section: results[section]
+                    for section in sections
+                    if section in results
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+        response.headers["Server-Timing"] = ", ".join(
+            f"{section};dur={result['elapsed_ms']}"
+            for section, result in response.data["sections"].items()
+        )
+        return response
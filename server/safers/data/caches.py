@@ -0,0 +1,486 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from safers.auth.tokens import get_token_expiry
+from safers.core.clients import ASYNC_GATEWAY_CLIENT, GATEWAY_CLIENT
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayLayersCache(object):
+    """
+    A per-process, stale-while-revalidate cache of the layer catalog returned
+    by GATEWAY_CLIENT.get_layers; entries are keyed by the (normalized) params
+    and the user's organization.  Entries younger than `timeout` seconds are
+    returned as-is; entries younger than `timeout + max_stale` seconds are
+    returned as-is while they are refreshed in the background (by a pool of
+    `refresh_workers` threads, w/ at most one refresh per entry at a time);
+    anything older is refreshed before being returned.  A background refresh
+    reuses the token of the request that found the stale entry after that
+    request has finished, so it is skipped (and the stale entry served) if
+    that token expires within `min_token_lifetime` seconds.
+
+    The catalog changes when new products arrive; the RMQ consumer (which
+    runs in a separate process) signals this by incrementing a version in the
+    shared cache (see `invalidate_layers_cache`).  That version is checked at
+    most every `check_interval` seconds and entries from an older version are
+    never returned.
+
+    The returned data is shared between requests and must not be modified.
+    """
+
+    version_key = "gateway-layers-version"
+
+    def __init__(
+        self,
+        timeout=60,
+        max_stale=600,
+        check_interval=5,
+        refresh_workers=2,
+        min_token_lifetime=30,
+    ):
+        self.timeout = timeout
+        self.max_stale = max_stale
+        self.check_interval = check_interval
+        self.min_token_lifetime = min_token_lifetime
+        self.lock = threading.Lock()
+        self.layers = {}
+        self.refreshing = set()
+        self.refresh_executor = ThreadPoolExecutor(
+            max_workers=refresh_workers,
+            thread_name_prefix="layers-refresh",
+        )
+        self.version = None
+        self.version_checked_at = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(params=None, organization=None):
+        return (
+            organization,
+            tuple(
+                sorted((str(k), str(v)) for k, v in (params or {}).items())
+            ),
+        )
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # a missing (ie: evicted) version must not match any cached one
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def check_version(self):
+        """
+        discards all entries if the shared version has changed
+        """
+        now = time.monotonic()
+        with self.lock:
+            checked_at = self.version_checked_at
+            if checked_at is not None and now - checked_at < self.check_interval:
+                return self.version
+        version = self.get_version()
+        with self.lock:
+            if version != self.version:
+                self.layers.clear()
+                self.version = version
+            self.version_checked_at = now
+        return version
+
+    def store(self, key, version, layers_data):
+        with self.lock:
+            if version == self.version:
+                self.layers[key] = (layers_data, time.monotonic())
+
+    def fetch(self, key, version, params=None, auth=None):
+        layers_data = GATEWAY_CLIENT.get_layers(params=params, auth=auth)
+        self.store(key, version, layers_data)
+        return layers_data
+
+    def can_refresh_in_background(self, auth):
+        expires_at = get_token_expiry(getattr(auth, "token", None))
+        return expires_at is not None and expires_at - time.time() > self.min_token_lifetime  # yapf: disable
+
+    def refresh_in_background(self, key, version, params=None, auth=None):
+        if not self.can_refresh_in_background(auth):
+            return
+
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def _refresh():
+            try:
+                self.fetch(key, version, params=params, auth=auth)
+            except Exception as e:
+                logger.error(f"unable to refresh layers: {e}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        try:
+            self.refresh_executor.submit(_refresh)
+        except RuntimeError:
+            # (the executor has been shut down; ie: the interpreter is exiting)
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def lookup(self, key, version, params=None, auth=None):
+        """
+        returns the cached layers_data for key (or None if it must be
+        fetched); stale entries are refreshed in the background
+        """
+        with self.lock:
+            layers_data, fetched_at = self.layers.get(key, (None, None))
+
+        if layers_data is not None:
+            age = time.monotonic() - fetched_at
+            if age < self.timeout:
+                with self.lock:
+                    self.hits += 1
+                return layers_data
+            if age < self.timeout + self.max_stale:
+                with self.lock:
+                    self.stale_hits += 1
+                self.refresh_in_background(
+                    key, version, params=params, auth=auth
+                )
+                return layers_data
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def get_layers(self, params=None, auth=None, organization=None):
+        if self.timeout <= 0:
+            return GATEWAY_CLIENT.get_layers(params=params, auth=auth)
+
+        version = self.check_version()
+        key = self.get_key(params=params, organization=organization)
+        layers_data = self.lookup(key, version, params=params, auth=auth)
+        if layers_data is None:
+            layers_data = self.fetch(key, version, params=params, auth=auth)
+        return layers_data
+
+    async def aget_layers(self, params=None, auth=None, organization=None):
+        """
+        an async version of get_layers
+        """
+        if self.timeout <= 0:
+            return await ASYNC_GATEWAY_CLIENT.get_layers(
+                params=params, auth=auth
+            )
+
+        version = await sync_to_async(self.check_version)()
+        key = self.get_key(params=params, organization=organization)
+        layers_data = self.lookup(key, version, params=params, auth=auth)
+        if layers_data is None:
+            layers_data = await ASYNC_GATEWAY_CLIENT.get_layers(
+                params=params, auth=auth
+            )
+            self.store(key, version, layers_data)
+        return layers_data
+
+    def invalidate(self):
+        """
+        invalidates the entries of every process
+        """
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.layers.clear()
+            self.version = None
+            self.version_checked_at = None
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "size": len(self.layers),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+
+GATEWAY_LAYERS_CACHE = GatewayLayersCache(
+    timeout=settings.SAFERS_GATEWAY_LAYERS_CACHE_TIMEOUT,
+    max_stale=settings.SAFERS_GATEWAY_LAYERS_CACHE_MAX_STALE,
+)
+
+
+def invalidate_layers_cache(message_body, **kwargs):
+    """
+    RMQ handler for messages announcing new (or updated) layers
+    """
+    GATEWAY_LAYERS_CACHE.invalidate()
+
+
+class MetadataCache(object):
+    """
+    A two-tier cache of the metadata returned by the gateway's
+    Layers/GetMetadata keyed by metadata_id and the user's organization (it
+    is fetched w/ the user's token and may describe private layers, so it is
+    never shared across organizations): a bounded, per-process (LRU) cache in
+    front of the DataLayerMetadata table (which is shared by every process
+    and survives restarts).  Metadata records don't change, so
+    entries only expire after `timeout` seconds in order to eventually drop
+    the metadata of deleted layers (a `timeout` of 0 disables caching).
+    Misses are fetched from the gateway concurrently.
+
+    The returned data is shared between requests and must not be modified.
+    """
+
+    GATEWAY_URL_PATH = "/api/services/app/Layers/GetMetadata"
+
+    def __init__(self, max_size=1024, timeout=7 * 24 * 60 * 60):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.metadata = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def lookup(self, metadata_id, organization=None):
+        """
+        returns the metadata for metadata_id from the per-process tier
+        """
+        key = (organization, metadata_id)
+        with self.lock:
+            metadata, expires_at = self.metadata.get(key, (None, None))
+            if metadata is not None and time.monotonic() > expires_at:
+                del self.metadata[key]
+                metadata = None
+            if metadata is not None:
+                self.metadata.move_to_end(key)
+                self.hits += 1
+        return metadata
+
+    def store(self, metadata_id, metadata, timeout, organization=None):
+        if self.max_size <= 0 or timeout <= 0:
+            return
+        key = (organization, metadata_id)
+        with self.lock:
+            self.metadata[key] = (metadata, time.monotonic() + timeout)
+            self.metadata.move_to_end(key)
+            while len(self.metadata) > self.max_size:
+                self.metadata.popitem(last=False)
+
+    def lookup_db(self, metadata_ids, organization=None):
+        """
+        returns a dict of the metadata for metadata_ids from the db tier (and
+        copies it into the per-process tier for the rest of its lifetime)
+        """
+        from safers.data.models import DataLayerMetadata
+
+        now = timezone.now()
+        metadata = {}
+        for metadata_id, data, created in DataLayerMetadata.objects.fresh(
+            self.timeout
+        ).filter(
+            organization=organization or "",
+            metadata_id__in=metadata_ids,
+        ).values_list(
+            "metadata_id", "metadata", "created"
+        ):
+            metadata[metadata_id] = data
+            self.store(
+                metadata_id,
+                data,
+                self.timeout - (now - created).total_seconds(),
+                organization=organization,
+            )
+        with self.lock:
+            self.db_hits += len(metadata)
+        return metadata
+
+    def store_db(self, metadata, organization=None):
+        """
+        stores a dict of metadata in the db tier (and drops expired metadata)
+        """
+        from safers.data.models import DataLayerMetadata
+
+        DataLayerMetadata.objects.stale(self.timeout).delete()
+        DataLayerMetadata.objects.bulk_create(
+            [
+                DataLayerMetadata(
+                    organization=organization or "",
+                    metadata_id=metadata_id,
+                    metadata=data,
+                ) for metadata_id, data in metadata.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["organization", "metadata_id"],
+            update_fields=["metadata", "created"],
+        )
+
+    def fetch(self, metadata_id, auth=None):
+        return GATEWAY_CLIENT.get(
+            self.GATEWAY_URL_PATH,
+            auth=auth,
+            params={"MetadataId": metadata_id},
+        )
+
+    def fetch_many(self, metadata_ids, auth=None, max_workers=None):
+        """
+        fetches metadata_ids from the gateway concurrently; returns a dict of
+        metadata and a dict of the exceptions raised for the failed ids
+        """
+        if max_workers is None:
+            max_workers = settings.SAFERS_GATEWAY_MAX_WORKERS
+
+        metadata = {}
+        errors = {}
+        if len(metadata_ids) == 1:
+            metadata_id = metadata_ids[0]
+            try:
+                metadata[metadata_id] = self.fetch(metadata_id, auth=auth)
+            except Exception as e:
+                errors[metadata_id] = e
+            return metadata, errors
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(metadata_ids))
+        ) as executor:
+            futures = {
+                metadata_id: executor.submit(self.fetch, metadata_id, auth=auth)
+                for metadata_id in metadata_ids
+            }
+        for metadata_id, future in futures.items():
+            try:
+                metadata[metadata_id] = future.result()
+            except Exception as e:
+                errors[metadata_id] = e
+        return metadata, errors
+
+    def get_many(self, metadata_ids, auth=None, organization=None):
+        """
+        returns a dict of the metadata for metadata_ids (in order) and a dict
+        of the exceptions raised for any ids that could not be fetched
+        """
+        metadata_ids = list(dict.fromkeys(map(str, metadata_ids)))
+        if self.timeout <= 0:
+            return self.fetch_many(metadata_ids, auth=auth)
+
+        metadata = {}
+        for metadata_id in metadata_ids:
+            data = self.lookup(metadata_id, organization=organization)
+            if data is not None:
+                metadata[metadata_id] = data
+
+        missing_ids = [x for x in metadata_ids if x not in metadata]
+        if missing_ids:
+            metadata.update(
+                self.lookup_db(missing_ids, organization=organization)
+            )
+            missing_ids = [x for x in missing_ids if x not in metadata]
+
+        errors = {}
+        if missing_ids:
+            with self.lock:
+                self.misses += len(missing_ids)
+            fetched_metadata, errors = self.fetch_many(missing_ids, auth=auth)
+            if fetched_metadata:
+                self.store_db(fetched_metadata, organization=organization)
+                for metadata_id, data in fetched_metadata.items():
+                    self.store(
+                        metadata_id,
+                        data,
+                        self.timeout,
+                        organization=organization,
+                    )
+            metadata.update(fetched_metadata)
+
+        return {
+            metadata_id: metadata[metadata_id]
+            for metadata_id in metadata_ids if metadata_id in metadata
+        }, errors
+
+    def get(self, metadata_id, auth=None, organization=None):
+        metadata_id = str(metadata_id)
+        metadata, errors = self.get_many(
+            [metadata_id], auth=auth, organization=organization
+        )
+        if metadata_id in errors:
+            raise errors[metadata_id]
+        return metadata[metadata_id]
+
+    async def aget(self, metadata_id, auth=None, organization=None):
+        """
+        an async version of get
+        """
+        metadata_id = str(metadata_id)
+        if self.timeout <= 0:
+            return await ASYNC_GATEWAY_CLIENT.get(
+                self.GATEWAY_URL_PATH,
+                auth=auth,
+                params={"MetadataId": metadata_id},
+            )
+
+        metadata = self.lookup(metadata_id, organization=organization)
+        if metadata is None:
+            db_metadata = await sync_to_async(self.lookup_db)(
+                [metadata_id], organization=organization
+            )
+            metadata = db_metadata.get(metadata_id)
+        if metadata is None:
+            with self.lock:
+                self.misses += 1
+            metadata = await ASYNC_GATEWAY_CLIENT.get(
+                self.GATEWAY_URL_PATH,
+                auth=auth,
+                params={"MetadataId": metadata_id},
+            )
+            await sync_to_async(self.store_db)(
+                {metadata_id: metadata}, organization=organization
+            )
+            self.store(
+                metadata_id, metadata, self.timeout, organization=organization
+            )
+        return metadata
+
+    def clear(self):
+        """
+        clears the per-process tier (the db tier is left as-is)
+        """
+        with self.lock:
+            self.metadata.clear()
+            self.hits = 0
+            self.db_hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "size": len(self.metadata),
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+            }
+
+
+METADATA_CACHE = MetadataCache(
+    max_size=settings.SAFERS_METADATA_CACHE_SIZE,
+    timeout=settings.SAFERS_METADATA_CACHE_TIMEOUT,
+)
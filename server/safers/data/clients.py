@@ -0,0 +1,328 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from django.conf import settings
+
+from safers.core.clients import REQUEST_TIMEOUT, create_requests_session
+from safers.core.utils import chunk
+
+from safers.data.layers import GEOSERVER_WMS_URL_PATH, GEOSERVER_WMTS_URL_PATH, MAX_GEOSERVER_TIMES, WMS_CRS, get_tile_query_params
+
+geoserver_session = create_requests_session(
+    pool_size=settings.SAFERS_GATEWAY_POOL_SIZE,
+    max_retries=settings.SAFERS_GATEWAY_MAX_RETRIES,
+    backoff_factor=settings.SAFERS_GATEWAY_RETRY_BACKOFF,
+)
+
+
+class GeoServerClient(object):
+    """
+    A client for the GeoServer (WMS & WMTS) requests that the dashboard used
+    to leave to the browser; requests share a pooled (keep-alive) session.
+    """
+    def get_wms(
+        self, params, geoserver_url=None, stream=False, timeout=REQUEST_TIMEOUT
+    ):
+        url = urljoin(
+            geoserver_url or settings.SAFERS_GEOSERVER_URL,
+            GEOSERVER_WMS_URL_PATH,
+        )
+        response = geoserver_session.request(
+            method="GET",
+            url=url,
+            params=params,
+            stream=stream,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response
+
+    def get_timeseries_response(
+        self, name, bbox, times, geoserver_url=None, timeout=REQUEST_TIMEOUT
+    ):
+        """
+        returns the (streamed) response of GetTimeSeries for a single chunk of
+        times; the caller must close it
+        """
+        params = {
+            "service": "WMS",
+            "version": "1.1.0",
+            "request": "GetTimeSeries",
+            "srs": WMS_CRS,
+            "format": "text/csv",
+            "styles": "raw",
+            "time": ",".join(times),
+            "layers": name,
+            "query_layers": name,
+            "width": 1,
+            "height": 1,
+            "x": 1,
+            "y": 1,
+            "bbox": bbox,
+        }
+        return self.get_wms(
+            params, geoserver_url=geoserver_url, stream=True, timeout=timeout
+        )
+
+    @staticmethod
+    def iter_response_lines(response):
+        return (
+            line for line in response.iter_lines(decode_unicode=True) if line
+        )
+
+    def get_timeseries_lines(
+        self, name, bbox, times, geoserver_url=None, timeout=REQUEST_TIMEOUT
+    ):
+        """
+        returns the (decoded) lines of the CSV returned by GetTimeSeries for
+        a single chunk of times
+        """
+        with self.get_timeseries_response(
+            name, bbox, times, geoserver_url=geoserver_url, timeout=timeout
+        ) as response:
+            return list(self.iter_response_lines(response))
+
+    def get_timeseries(
+        self,
+        name,
+        bbox,
+        times,
+        geoserver_url=None,
+        timeout=REQUEST_TIMEOUT,
+        max_workers=None,
+    ):
+        """
+        requests GetTimeSeries for every chunk of MAX_GEOSERVER_TIMES times
+        concurrently and returns an iterator over the lines of a single merged
+        CSV: the comment & header lines of the first chunk followed by the rows
+        of every chunk in time order.  Any request errors are raised here,
+        before anything is returned; the chunks' bodies are then streamed and
+        merged lazily (rows start w/ an ISO 8601 timestamp so they can be
+        compared as strings) as the iterator is consumed.
+        """
+        if max_workers is None:
+            max_workers = settings.SAFERS_GATEWAY_MAX_WORKERS
+
+        times_chunks = list(chunk(list(times), MAX_GEOSERVER_TIMES))
+        if not times_chunks:
+            return iter([])
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(times_chunks))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self.get_timeseries_response,
+                    name,
+                    bbox,
+                    times_chunk,
+                    geoserver_url=geoserver_url,
+                    timeout=timeout,
+                ) for times_chunk in times_chunks
+            ]
+
+        responses = []
+        try:
+            for future in futures:
+                responses.append(future.result())
+        except Exception:
+            for future in futures:
+                if future.done() and not future.exception():
+                    future.result().close()
+            raise
+
+        return self.merge_timeseries(responses)
+
+    def merge_timeseries(self, responses):
+        """
+        yields the merged lines of several GetTimeSeries responses (and closes
+        them); rows that exactly duplicate the previous row are dropped
+        """
+        try:
+            chunks_rows = []
+            for i, response in enumerate(responses):
+                lines = self.iter_response_lines(response)
+                for line in lines:
+                    if i == 0:
+                        yield line
+                    if not line.startswith("#"):
+                        # comments are followed by a single line of column names
+                        break
+                chunks_rows.append(lines)
+
+            previous_row = None
+            for row in heapq.merge(
+                *chunks_rows, key=lambda row: row.split(",", 1)[0]
+            ):
+                if row != previous_row:
+                    yield row
+                previous_row = row
+        finally:
+            for response in responses:
+                response.close()
+
+    def get_feature_info_features(
+        self, names, bbox, geoserver_url=None, timeout=REQUEST_TIMEOUT
+    ):
+        """
+        returns the features returned by a single (multi-layer)
+        GetFeatureInfo request
+        """
+        params = {
+            "service": "WMS",
+            "version": "1.1.0",
+            "request": "GetFeatureInfo",
+            "srs": WMS_CRS,
+            "info_format": "application/json",
+            "layers": ",".join(names),
+            "query_layers": ",".join(names),
+            "feature_count": len(names),
+            "width": 1,
+            "height": 1,
+            "x": 1,
+            "y": 1,
+            "bbox": bbox,
+        }
+        response = self.get_wms(
+            params, geoserver_url=geoserver_url, timeout=timeout
+        )
+        if "json" not in response.headers.get("Content-Type", ""):
+            # (errors are reported as an OGC ServiceException w/ a 200 status)
+            raise ValueError(
+                f"unexpected GetFeatureInfo response: {response.text[:256]}"
+            )
+        return response.json().get("features") or []
+
+    @staticmethod
+    def split_features(names, features):
+        """
+        splits the features of a multi-layer GetFeatureInfo response by layer;
+        vector features are identified by their ids ("<layer>.<fid>"), but
+        raster features have no ids and can only be attributed by position if
+        none of the features has an id and every layer returned exactly one
+        feature.  Returns None if the features cannot be attributed.
+        """
+        if len(names) == 1:
+            return {names[0]: features}
+
+        feature_ids = [str(feature.get("id") or "") for feature in features]
+
+        if not any(feature_ids):
+            if len(features) == len(names):
+                return {
+                    name: [feature] for name, feature in zip(names, features)
+                }
+            return None
+
+        # (a mix of vector & raster features cannot be attributed by position,
+        # since a layer that returned no features would shift the rest)
+        local_names = {name.split(":", 1)[-1]: name for name in names}
+        layer_features = {name: [] for name in names}
+        for feature, feature_id in zip(features, feature_ids):
+            name = local_names.get(feature_id.rsplit(".", 1)[0])
+            if name is None:
+                return None
+            layer_features[name].append(feature)
+        return layer_features
+
+    def get_feature_info(
+        self,
+        names,
+        bbox,
+        geoserver_urls=None,
+        timeout=REQUEST_TIMEOUT,
+        max_workers=None,
+    ):
+        """
+        returns a dict of the GetFeatureInfo FeatureCollection of every layer
+        and a dict of the exceptions raised for any layers that could not be
+        queried.  Layers on the same GeoServer (as per geoserver_urls) are
+        queried w/ a single multi-layer request and different GeoServers are
+        queried concurrently; if a multi-layer request fails or its features
+        cannot be attributed then its layers are queried separately (again
+        concurrently).
+        """
+        if max_workers is None:
+            max_workers = settings.SAFERS_GATEWAY_MAX_WORKERS
+
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}, {}
+
+        geoserver_urls = geoserver_urls or {}
+        tasks = {}
+        for name in names:
+            geoserver_url = geoserver_urls.get(
+                name, settings.SAFERS_GEOSERVER_URL
+            )
+            tasks.setdefault(geoserver_url, []).append(name)
+        tasks = list(tasks.items())
+
+        def _get_features(task):
+            geoserver_url, task_names = task
+            try:
+                features = self.get_feature_info_features(
+                    task_names,
+                    bbox,
+                    geoserver_url=geoserver_url,
+                    timeout=timeout,
+                )
+            except Exception as e:
+                return None, e
+            return self.split_features(task_names, features), None
+
+        layer_features = {}
+        errors = {}
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(names))
+        ) as executor:
+            while tasks:
+                retry_tasks = []
+                for (geoserver_url, task_names), (task_features, error) in zip(
+                    tasks, executor.map(_get_features, tasks)
+                ):
+                    if task_features is not None:
+                        layer_features.update(task_features)
+                    elif len(task_names) > 1:
+                        retry_tasks += [
+                            (geoserver_url, [name]) for name in task_names
+                        ]
+                    else:
+                        errors[task_names[0]] = error
+                tasks = retry_tasks
+
+        return {
+            name: {
+                "type": "FeatureCollection",
+                "features": layer_features[name],
+            }
+            for name in names if name in layer_features
+        }, errors
+
+    def get_tile(
+        self, name, time, z, x, y, geoserver_url=None, timeout=REQUEST_TIMEOUT
+    ):
+        """
+        returns the content of a (png) WMTS tile
+        """
+        url = urljoin(
+            geoserver_url or settings.SAFERS_GEOSERVER_URLS[0],
+            GEOSERVER_WMTS_URL_PATH,
+        )
+        response = geoserver_session.request(
+            method="GET",
+            url=url,
+            params=get_tile_query_params(name, time, z, x, y),
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        if not response.headers.get("Content-Type", "").startswith("image/"):
+            # (errors are reported as an OGC ServiceException w/ a 200 status)
+            raise ValueError(
+                f"unexpected GetTile response: {response.text[:256]}"
+            )
+        return response.content
+
+
+GEOSERVER_CLIENT = GeoServerClient()
@@ -0,0 +1,575 @@
+"""
+Builds the layer trees returned by OperationalLayerView & MapRequestViewSet
+from the layer catalog returned by the gateway (GATEWAY_CLIENT.get_layers).
+The GeoServer URL templates only depend on settings, so they are built once
+per process; the DataType lookups are cached per process as well.
+"""
+
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import quote_plus, urlencode, urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+
+from safers.core.utils import chunk
+
+from safers.data.models import DataType
+
+DATETIME_INPUT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+DATETIME_OUTPUT_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+# matches the (valid) timestamps that strptime/strftime would reformat to
+# themselves + ".000Z"; anything else (non-zero-padded fields, leap days,
+# leap seconds, etc.) is left to strptime
+DATETIME_INPUT_PATTERN = (
+    r"[1-9]\d{3}-"
+    r"(?:(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])|(?:0[13-9]|1[0-2])-(?:29|30)|(?:0[13578]|1[02])-31)"
+    r"T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\dZ"
+)
+DATETIME_INPUT_REGEX = re.compile(DATETIME_INPUT_PATTERN)
+DATETIME_INPUT_LIST_REGEX = re.compile(f"(?:{DATETIME_INPUT_PATTERN}\n)*")
+
+GEOSERVER_WMS_URL_PATH = "/geoserver/ermes/wms"
+GEOSERVER_WMTS_URL_PATH = "/geoserver/gwc/service/wmts"
+METADATA_URL_PATH = "/api/data/layers/metadata"
+TILE_PROXY_URL_PATH = "/api/data/layers/tiles"
+
+WMS_CRS = "EPSG:4326"
+WMTS_CRS = "EPSG:900913"
+
+MAX_GEOSERVER_TIMES = 100  # the maximum timestamps that can be passed to GetTimeSeries at once
+
+#################
+# url templates #
+#################
+
+
+def get_tile_query_params(name, time, z, x, y):
+    """
+    returns the query params of a WMTS GetTile request
+    """
+    return {
+        "time": time,
+        "layer": name,
+        "service": "WMTS",
+        "request": "GetTile",
+        "version": "1.0.0",
+        "transparent": True,
+        "tilematrixset": WMTS_CRS,
+        "tilematrix": f"{WMTS_CRS}:{z}",
+        "tilecol": x,
+        "tilerow": y,
+        "format": "image/png",
+    }
+
+
+class LayerUrlTemplates(object):
+    """
+    The GeoServer URL templates for a layer; "{name}" & "{time}" are filled
+    in by the server, "{{x}}", "{{y}}", "{{z}}" & "{{bbox}}" are left for the
+    client to fill in.  If tile_proxy_url is provided then tiles are
+    requested from the (caching) tile proxy rather than from GeoServer.
+    """
+    def __init__(self, geoserver_url, geoserver_urls, tile_proxy_url=None):
+
+        if tile_proxy_url:
+            self.layer_urls = [
+                tile_proxy_url + "/{name}/{time}/{{z}}/{{x}}/{{y}}.png"
+            ]
+        else:
+            geoserver_layer_query_params = urlencode(
+                get_tile_query_params(
+                    "{name}", "{time}", "{{z}}", "{{x}}", "{{y}}"
+                ),
+                safe="{}",
+            )
+            self.layer_urls = [
+                f"{urljoin(geoserver_api_url, GEOSERVER_WMTS_URL_PATH)}?{geoserver_layer_query_params}"
+                for geoserver_api_url in geoserver_urls
+            ]
+
+        geoserver_legend_query_params = urlencode(
+            {
+                "layer": "{name}",
+                "service": "WMS",
+                "request": "GetLegendGraphic",
+                "srs": WMS_CRS,
+                "width": 512,
+                "height": 256,
+                "format": "image/png",
+                "LEGEND_OPTIONS": "fontsize:80;dpi=72"
+            },
+            safe="{}",
+        )
+        self.legend_url = f"{urljoin(geoserver_url, GEOSERVER_WMS_URL_PATH)}?{geoserver_legend_query_params}"
+
+        geoserver_pixel_query_params = urlencode(
+            {
+                "service": "WMS",
+                "version": "1.1.0",
+                "request": "GetFeatureInfo",
+                "srs": WMS_CRS,
+                "info_format": "application/json",
+                "layers": "{name}",
+                "query_layers": "{name}",
+                "width": 1,
+                "height": 1,
+                "x": 1,
+                "y": 1,
+                "bbox": "{{bbox}}",
+            },
+            safe="{}",
+        )
+        self.pixel_url = f"{urljoin(geoserver_url, GEOSERVER_WMS_URL_PATH)}?{geoserver_pixel_query_params}"
+
+        geoserver_timeseries_query_params = urlencode(
+            # this seems unintuitive, but the GetTimeseries Geoserver API uses the bbox (not x & y)
+            # to determine the region to inspect - therefore I set height & width & x & y to constants
+            # and the frontend injects a pixel-sized bbox into the query
+            {
+                "service": "WMS",
+                "version": "1.1.0",
+                "request": "GetTimeSeries",
+                "srs": WMS_CRS,
+                "format": "text/csv",
+                "styles": "raw",
+                "time": "{time}",
+                "layers": "{name}",
+                "query_layers": "{name}",
+                "width": 1,
+                "height": 1,
+                "x": 1,
+                "y": 1,
+                "bbox": "{{bbox}}",
+            },
+            safe="{}",
+        )
+        self.timeseries_url = f"{urljoin(geoserver_url, GEOSERVER_WMS_URL_PATH)}?{geoserver_timeseries_query_params}"
+
+
+@functools.lru_cache(maxsize=32)
+def _get_url_templates(geoserver_url, geoserver_urls, tile_proxy_url):
+    return LayerUrlTemplates(
+        geoserver_url, geoserver_urls, tile_proxy_url=tile_proxy_url
+    )
+
+
+def get_url_templates(tile_proxy_url=None):
+    """
+    returns the (memoized) LayerUrlTemplates for the current settings
+    """
+    return _get_url_templates(
+        settings.SAFERS_GEOSERVER_URL,
+        tuple(settings.SAFERS_GEOSERVER_URLS),
+        tile_proxy_url,
+    )
+
+
+def get_metadata_url_template(request):
+    return f"{request.build_absolute_uri(METADATA_URL_PATH)}/{{metadata_id}}?metadata_format={{metadata_format}}"
+
+
+def get_tile_proxy_url(request):
+    """
+    returns the url of the tile proxy (or None if tiles are served straight
+    from GeoServer)
+    """
+    if settings.SAFERS_TILE_PROXY:
+        return request.build_absolute_uri(TILE_PROXY_URL_PATH)
+    return None
+
+
+##############
+# data types #
+##############
+
+
+class DataTypeLookups(object):
+    """
+    A per-process cache of the DataType attributes used to annotate the
+    layer tree, keyed by datatype_id (or subgroup or group).  DataTypes are
+    only changed by admins; saving or deleting one increments a version in
+    the shared cache (see `safers.data.signals`), which is checked at most
+    every `check_interval` seconds.
+    """
+
+    version_key = "data-type-lookups-version"
+
+    FIELDS = ["info", "source", "domain", "feature_string", "opacity"]
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.lookups = None
+        self.version = None
+        self.version_checked_at = None
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # a missing (ie: evicted) version must not match any cached one
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    @classmethod
+    def build(cls, data_types):
+        lookups = {field: {"None": None} for field in cls.FIELDS}
+        for data_type in data_types:
+            data_type_key = (
+                data_type.datatype_id or data_type.subgroup or data_type.group
+            ).upper()
+            lookups["info"][data_type_key] = data_type.info or data_type.description  # yapf: disable
+            lookups["source"][data_type_key] = data_type.source
+            lookups["domain"][data_type_key] = data_type.domain
+            lookups["feature_string"][data_type_key] = data_type.feature_string
+            lookups["opacity"][data_type_key] = data_type.opacity
+        return lookups
+
+    def get(self):
+        """
+        returns a dict of lookups (one per field) for operational DataTypes
+        """
+        now = time.monotonic()
+        with self.lock:
+            lookups = self.lookups
+            checked_at = self.version_checked_at
+            if lookups is not None and now - checked_at < self.check_interval:
+                return lookups
+
+        version = self.get_version()
+        if lookups is None or version != self.version:
+            lookups = self.build(
+                DataType.objects.operational().only(
+                    "datatype_id", "group", "subgroup", "description", *self.FIELDS
+                )
+            )
+        with self.lock:
+            self.lookups = lookups
+            self.version = version
+            self.version_checked_at = now
+        return lookups
+
+    def invalidate(self):
+        """
+        invalidates the lookups of every process
+        """
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.lookups = None
+            self.version = None
+            self.version_checked_at = None
+
+
+DATA_TYPE_LOOKUPS = DataTypeLookups()
+
+###############
+# layer trees #
+###############
+
+
+def format_timestamp(timestamp):
+    return datetime.strptime(timestamp, DATETIME_INPUT_FORMAT
+                            ).strftime(DATETIME_OUTPUT_FORMAT)
+
+
+def format_timestamps(timestamps):
+    """
+    reformats a list of timestamps from DATETIME_INPUT_FORMAT to
+    DATETIME_OUTPUT_FORMAT; valid timestamps can just be sliced, which is
+    much faster than parsing them.  The whole list is validated w/ a single
+    regex match; if that fails then each timestamp is validated separately
+    and only the irregular ones are parsed.
+    """
+    try:
+        is_regular = DATETIME_INPUT_LIST_REGEX.fullmatch(
+            "\n".join(timestamps) + "\n"
+        ) is not None
+    except TypeError:
+        is_regular = False
+
+    if is_regular:
+        return [timestamp[:-1] + ".000Z" for timestamp in timestamps]
+
+    return [
+        timestamp[:-1] + ".000Z" if isinstance(timestamp, str)
+        and DATETIME_INPUT_REGEX.fullmatch(timestamp) else
+        format_timestamp(timestamp) for timestamp in timestamps
+    ]
+
+
+def get_detail_urls(detail, metadata_url, url_templates=None, compact=False):
+    """
+    returns the urls for a single layer detail; if compact is True the WMTS
+    & GetTimeSeries urls are returned as templates (w/ a "{time}"
+    placeholder) along w/ the timestamps rather than expanded for every
+    timestamp
+    """
+    if url_templates is None:
+        url_templates = get_url_templates()
+
+    name = quote_plus(detail["name"])
+    timestamps = detail.get("timestamps") or []
+
+    detail_urls = {
+        "info_url": metadata_url.format(
+            metadata_id=detail.get("metadata_Id"),
+            metadata_format="text",
+        ),
+        "metadata_url": metadata_url.format(
+            metadata_id=detail.get("metadata_Id"),
+            metadata_format="json",
+        ),
+        "legend_url": url_templates.legend_url.format(name=name),
+        "pixel_url": url_templates.pixel_url.format(name=name),
+    }
+
+    if compact:
+        # the client expands the templates for each timestamp
+        detail_urls.update({
+            "timestamps": format_timestamps(timestamps),
+            "timeseries_url_template": url_templates.timeseries_url.format(
+                name=name, time="{time}"
+            ) if len(timestamps) > 1 else None,
+            "url_templates": [
+                url.format(name=name, time="{time}")
+                for url in url_templates.layer_urls
+            ],
+        })  # yapf: disable
+    else:
+        # the name is substituted once per url rather than once per timestamp
+        layer_urls = [
+            url.replace("{name}", name) for url in url_templates.layer_urls
+        ]
+        detail_urls.update({
+            "timeseries_urls": [
+                url_templates.timeseries_url.format(
+                    name=name,
+                    time=quote_plus(",".join(timestamps_chunk)),
+                )
+                for timestamps_chunk in chunk(timestamps, MAX_GEOSERVER_TIMES)
+            ] if len(timestamps) > 1 else None,
+            "urls": OrderedDict(
+                [
+                    (
+                        timestamp,
+                        [
+                            url.format(time=quote_plus(timestamp))
+                            for url in layer_urls
+                        ]
+                    )
+                    for timestamp in format_timestamps(timestamps)
+                ]
+            ),
+        })  # yapf: disable
+
+    return detail_urls
+
+
+def iter_layers(layers_data):
+    """
+    yields (group, sub_group, layer) for every layer in layers_data
+    """
+    for group in layers_data.get("layerGroups") or []:
+        for sub_group in group.get("subGroups") or []:
+            for layer in sub_group.get("layers") or []:
+                yield group, sub_group, layer
+
+
+def build_layer_tree(
+    layers_data, metadata_url, n_layers=1, compact=False, tile_proxy_url=None
+):
+    """
+    returns the hierarchy (group > sub_group > layer > detail) of operational
+    layers; only the n_layers most recent details of each layer are included
+    """
+    url_templates = get_url_templates(tile_proxy_url=tile_proxy_url)
+    data_type_lookups = DATA_TYPE_LOOKUPS.get()
+    data_type_info = data_type_lookups["info"]
+    data_type_sources = data_type_lookups["source"]
+    data_type_domains = data_type_lookups["domain"]
+    data_type_feature_strings = data_type_lookups["feature_string"]
+    data_type_opacity = data_type_lookups["opacity"]
+
+    data = [
+      {
+        "id": f"{i}",
+        "text": group["group"],
+        "domain": data_type_domains.get(group["group"].upper()),
+        "source": data_type_sources.get(group["group"].upper()),
+        "info": data_type_info.get(group["group"].upper()),
+        "info_url": None,
+        "children": [
+          {
+            "id": f"{i}.{j}",
+            "text": sub_group["subGroup"],
+            "domain": data_type_domains.get(sub_group["subGroup"].upper()),
+            "source": data_type_sources.get(sub_group["subGroup"].upper()),
+            "info": data_type_info.get(sub_group["subGroup"].upper()),
+            "info_url": None,
+            "children": [
+              {
+                "id": f"{i}.{j}.{k}",
+                "text": layer["name"],
+                "units": layer.get("unitOfMeasure"),
+                "domain": data_type_domains.get(str(layer.get("dataTypeId"))),
+                "source": data_type_sources.get(str(layer.get("dataTypeId"))),
+                "info": data_type_info.get(str(layer.get("dataTypeId"))),
+                "info_url": None,
+                "children": [
+                  {
+                    "datatype_id": str(layer.get("dataTypeId")),
+                    "id": f"{i}.{j}.{k}.{l}",
+                    "title": layer["name"],
+                    "text": next(iter(detail.get("timestamps") or []), None),
+                    "units": layer.get("unitOfMeasure"),
+                    "opacity": data_type_opacity.get(str(layer.get("dataTypeId"))),
+                    "feature_string": data_type_feature_strings.get(str(layer.get("dataTypeId"))),
+                    "info": None,
+                    **get_detail_urls(
+                      detail,
+                      metadata_url,
+                      url_templates=url_templates,
+                      compact=compact,
+                    ),
+                  }
+                  for l, detail in enumerate(
+                    sorted(layer.get("details"), key=lambda x: x.get("created_At"), reverse=True) or [],
+                    start=1
+                  )
+                  if l <= n_layers
+                ]
+              }
+              for k, layer in enumerate(sub_group.get("layers") or [], start=1)
+            ]
+          }
+          for j, sub_group in enumerate(group.get("subGroups") or [], start=1)
+        ]
+      } for i, group in enumerate(layers_data.get("layerGroups") or [], start=1)
+    ]  # yapf: disable
+
+    return data
+
+
+def index_layer_details(
+    layers_data, request_codes, metadata_url, tile_proxy_url=None
+):
+    """
+    returns a dict of dicts of the details of on-demand layers keyed by
+    request_code (ie: mapRequestCode) and then by data_type_id; details w/
+    request_codes not in request_codes are ignored
+    """
+    url_templates = get_url_templates(tile_proxy_url=tile_proxy_url)
+
+    layer_details = {}
+    for _, _, layer in iter_layers(layers_data):
+        for detail in layer.get("details") or []:
+            request_code = detail.get("mapRequestCode")
+            if request_code in request_codes:
+                layer_details.setdefault(request_code, {})[
+                    str(layer["dataTypeId"])
+                ] = {
+                    "units": layer.get("unitOfMeasure"),
+                    **get_detail_urls(
+                        detail, metadata_url, url_templates=url_templates
+                    ),
+                }
+    return layer_details
+
+
+def get_layer_timestamps(layers_data, name):
+    """
+    returns the timestamps of the layer detail called name (or None if
+    there is no such detail in layers_data)
+    """
+    for _, _, layer in iter_layers(layers_data):
+        for detail in layer.get("details") or []:
+            if detail.get("name") == name:
+                return detail.get("timestamps") or []
+    return None
+
+
+def index_layers_by_name(layers_data, names):
+    """
+    returns a dict of (layer, detail) keyed by detail name for the layer
+    details in layers_data called one of names
+    """
+    names = set(names)
+    layers = {}
+    for _, _, layer in iter_layers(layers_data):
+        for detail in layer.get("details") or []:
+            if detail.get("name") in names:
+                layers.setdefault(detail["name"], (layer, detail))
+    return layers
+
+
+###################
+# feature strings #
+###################
+
+FEATURE_STRING_PLACEHOLDER_REGEX = re.compile(r"{{\s*(.+?)\s*}}")
+FEATURE_PATH_STEP_REGEX = re.compile(
+    r"\.([^.\[\]]+)|\[(\d+)\]|\[['\"]([^'\"]+)['\"]\]"
+)
+
+
+def get_feature_path_value(data, path):
+    """
+    returns the value at (a simple subset of) a JSONPath in data, ie:
+    "$.features[0].properties.GRAY_INDEX"; raises LookupError if there is no
+    such value
+    """
+    position = 1  # (skipping the leading "$")
+    while position < len(path):
+        step = FEATURE_PATH_STEP_REGEX.match(path, position)
+        if step is None:
+            raise LookupError(f"invalid path: {path}")
+        key, index, quoted_key = step.groups()
+        try:
+            if index is not None:
+                data = data[int(index)]
+            else:
+                data = data[key or quoted_key]
+        except (IndexError, KeyError, TypeError) as e:
+            raise LookupError(path) from e
+        position = step.end()
+    return data
+
+
+def format_feature_string(feature_string, feature_collection):
+    """
+    renders a DataType.feature_string for the GetFeatureInfo response of a
+    single layer; placeholders are either JSONPaths into the response (ie:
+    "{{$.features[0].properties.GRAY_INDEX}}") or properties of its first
+    feature (ie: "{{t2m}}").  Returns None if there is nothing to render
+    (ie: the point is outside the layer) or a placeholder cannot be found.
+    """
+    features = feature_collection.get("features") or []
+    if not features or not feature_string:
+        return None
+
+    properties = features[0].get("properties") or {}
+
+    def _replace(match):
+        placeholder = match.group(1)
+        if placeholder.startswith("$"):
+            value = get_feature_path_value(feature_collection, placeholder)
+        else:
+            value = properties[placeholder]
+        return str(value)
+
+    try:
+        return FEATURE_STRING_PLACEHOLDER_REGEX.sub(_replace, feature_string)
+    except LookupError:
+        return None
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0037_datatype_opacity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataLayerMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('organization', models.CharField(blank=True, default='', max_length=128)),
+                ('metadata_id', models.CharField(max_length=255)),
+                ('metadata', models.JSONField()),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'DataLayer Metadata',
+                'verbose_name_plural': 'DataLayer Metadata',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='datalayermetadata',
+            constraint=models.UniqueConstraint(fields=('organization', 'metadata_id'), name='unique_organization_metadata_id'),
+        ),
+    ]
@@ -1,3 +1,4 @@
 from .models_datalayers import DataLayer
 from .models_datatypes import DataType
 from .models_maprequests import MapRequest
+from .models_metadata import DataLayerMetadata
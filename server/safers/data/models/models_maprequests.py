@@ -333,16 +333,19 @@ class MapRequest(gis_models.Model):
         }
         try:
 
+            messages = []
             for data_type in self.data_types.all():
 
                 routing_key = f"request.{data_type.datatype_id}.{RMQ_USER}.{self.request_id}"
                 message_body["datatype_id"] = data_type.datatype_id
 
-                rmq.publish(
+                messages.append((
                     json.dumps(message_body, cls=JSONEncoder),
                     routing_key,
                     self.request_id,
-                )
+                ))
+
+            rmq.publish_batch(messages)
 
         except Exception as e:
             msg = f"unable to publish message: {e}"
@@ -361,16 +364,19 @@ class MapRequest(gis_models.Model):
 
         try:
 
+            messages = []
             for data_type in self.data_types.all():
                 routing_key = f"delete.{data_type.datatype_id}.{RMQ_USER}.{self.request_id}"
 
                 message_body["datatype_id"] = data_type.datatype_id
 
-                rmq.publish(
+                messages.append((
                     json.dumps(message_body, cls=JSONEncoder),
                     routing_key,
                     self.request_id,
-                )
+                ))
+
+            rmq.publish_batch(messages)
 
         except Exception as e:
             msg = f"unable to publish message: {e}"
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+class DataLayerMetadataQuerySet(models.QuerySet):
+    def fresh(self, max_age):
+        """
+        metadata cached less than max_age seconds ago
+        """
+        return self.filter(
+            created__gte=timezone.now() - timedelta(seconds=max_age)
+        )
+
+    def stale(self, max_age):
+        return self.exclude(
+            created__gte=timezone.now() - timedelta(seconds=max_age)
+        )
+
+
+class DataLayerMetadata(models.Model):
+    """
+    A copy of the metadata of a data layer as returned by the gateway; since
+    metadata records don't change this is the persistent second tier of
+    METADATA_CACHE (the first tier being per-process); metadata is stored per
+    organization because it is fetched w/ the token of one of its users
+    """
+    class Meta:
+        verbose_name = "DataLayer Metadata"
+        verbose_name_plural = "DataLayer Metadata"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "metadata_id"],
+                name="unique_organization_metadata_id",
+            )
+        ]
+
+    organization = models.CharField(max_length=128, blank=True, default="")
+    metadata_id = models.CharField(max_length=255)
+    metadata = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = DataLayerMetadataQuerySet.as_manager()
+
+    def __str__(self):
+        return str(self.metadata_id)
@@ -1,2 +1,2 @@
 from .serializers_maprequest import MapRequestSerializer
-from .serializers_views import LayerViewSerializer
\ No newline at end of file
+from .serializers_views import FeatureInfoViewSerializer, LayerViewSerializer, TimeSeriesViewSerializer
\ No newline at end of file
@@ -10,6 +10,9 @@ from safers.core.serializers import ContextVariableDefault
 class LayerViewSerializer(serializers.Serializer):
     OrderType = models.TextChoices("OrderType", "date -date")
 
+    # fields that are used by the views rather than passed onto the proxy
+    ViewFields = ["compact"]
+
     order = serializers.ChoiceField(choices=OrderType.choices, required=False)
 
     # REMOVED TIMESTAMP/BBOX FILTERING AS PER https://astrosat.atlassian.net/browse/SAFB-255
@@ -49,6 +52,24 @@ class LayerViewSerializer(serializers.Serializer):
         ),
     )
 
+    compact = serializers.BooleanField(
+        default=False,
+        required=False,
+        help_text=_(
+            "If compact is True then each layer provides its list of timestamps along w/ URL templates (containing a '{time}' placeholder) "
+            "rather than a fully-expanded URL for every timestamp; the client must substitute the (URL-encoded) timestamps itself.  "
+            "Only used by operational layers."
+        ),
+    )
+
+    @property
+    def proxy_params(self):
+        return {
+            k: v
+            for k, v in self.validated_data.items()
+            if k not in self.ViewFields
+        }
+
     def validate_n_layers(self, value):
         if value <= 0:
             raise serializers.ValidationError(
@@ -64,4 +85,123 @@ class LayerViewSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 "If you provide map_request_codes, then include_map_requests must be true."
             )
-        return validated_data
\ No newline at end of file
+        return validated_data
+
+
+class TimeSeriesViewSerializer(serializers.Serializer):
+    """
+    Note that this isn't a ModelSerializer; it's just
+    used for query_param validation in LayerTimeSeriesView
+    """
+
+    layer = serializers.CharField(
+        help_text=_("The name of the layer (ie: the GeoServer layer name).")
+    )
+
+    bbox = serializers.CharField(
+        help_text=_(
+            "The (pixel-sized) bbox to inspect as 'min_x,min_y,max_x,max_y'."
+        )
+    )
+
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    map_request_code = serializers.CharField(
+        required=False,
+        help_text=_("The mapRequestCode of an on-demand layer."),
+    )
+
+    def validate_bbox(self, value):
+        try:
+            bbox = list(map(float, value.split(",")))
+            assert len(bbox) == 4, "bbox must contain 4 values"
+        except Exception as e:
+            raise serializers.ValidationError(e)
+        # normalized so that equivalent bboxes share a cache key
+        return ",".join(map(str, bbox))
+
+    def validate(self, data):
+        validated_data = super().validate(data)
+        start = validated_data.get("start")
+        end = validated_data.get("end")
+        if start and end and start > end:
+            raise serializers.ValidationError("end must occur after start")
+        return validated_data
+
+
+class FeatureInfoViewSerializer(serializers.Serializer):
+    """
+    Note that this isn't a ModelSerializer; it's just
+    used for query_param validation in LayerFeatureInfoView
+    """
+
+    MAX_LAYERS = 50
+
+    point = serializers.CharField(
+        help_text=_("The point to inspect as 'x,y' (ie: 'lon,lat').")
+    )
+
+    resolution = serializers.FloatField(
+        default=0.0001,
+        required=False,
+        min_value=0,
+        help_text=_(
+            "The size (in degrees) of the pixel to inspect around point."
+        ),
+    )
+
+    layers = serializers.ListField(
+        child=serializers.CharField(),
+        help_text=_(
+            "The names of the layers to inspect (either repeated or comma-separated)."
+        ),
+    )
+
+    map_request_code = serializers.CharField(
+        required=False,
+        help_text=_("The mapRequestCode of on-demand layers."),
+    )
+
+    def validate_point(self, value):
+        try:
+            point = list(map(float, value.split(",")))
+            assert len(point) == 2, "point must contain 2 values"
+        except Exception as e:
+            raise serializers.ValidationError(e)
+        return point
+
+    def validate_resolution(self, value):
+        if value <= 0:
+            raise serializers.ValidationError(
+                "resolution must be greater than 0."
+            )
+        return value
+
+    def validate_layers(self, value):
+        layers = list(
+            dict.fromkeys(
+                layer.strip()
+                for layers in value
+                for layer in layers.split(",")
+                if layer.strip()
+            )
+        )
+        if not layers:
+            raise serializers.ValidationError("layers must not be empty.")
+        if len(layers) > self.MAX_LAYERS:
+            raise serializers.ValidationError(
+                f"no more than {self.MAX_LAYERS} layers can be inspected at once."
+            )
+        return layers
+
+    @property
+    def bbox(self):
+        """
+        the (pixel-sized) bbox centered on point
+        """
+        x, y = self.validated_data["point"]
+        offset = self.validated_data["resolution"] / 2
+        return ",".join(
+            map(str, [x - offset, y - offset, x + offset, y + offset])
+        )
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from safers.data.layers import DATA_TYPE_LOOKUPS
+from safers.data.models import DataType
+
+
+def data_type_changed_handler(sender, *args, **kwargs):
+    """
+    If a DataType has been saved/deleted then the cached lookups used to build layer trees are out-of-date
+    """
+    transaction.on_commit(DATA_TYPE_LOOKUPS.invalidate)
+
+
+post_save.connect(
+    data_type_changed_handler,
+    sender=DataType,
+    dispatch_uid="data_type_saved_handler",
+)
+
+post_delete.connect(
+    data_type_changed_handler,
+    sender=DataType,
+    dispatch_uid="data_type_deleted_handler",
+)
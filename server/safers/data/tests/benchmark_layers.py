@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+
+# Benchmark of building the layer trees of OperationalLayerView (default &
+# compact responses) and MapRequestViewSet.list for a realistic layer catalog,
+# w/ & w/out the per-process memoization in safers.data.layers (run from the
+# "server" directory):
+# $ python -m safers.data.tests.benchmark_layers
+
+
+def generate_layers_data(
+    n_groups=5,
+    n_sub_groups=3,
+    n_layers=4,
+    n_details=3,
+    n_timestamps=240,
+    map_request_codes=None,
+):
+    """
+    returns data shaped like the response of GATEWAY_CLIENT.get_layers;
+    the default values are roughly those of a (hourly, 10 day) forecast catalog
+    """
+    import uuid
+    from datetime import datetime, timedelta
+
+    start = datetime(2022, 4, 5)
+
+    return {
+        "layerGroups": [
+            {
+                "group": f"Group {i}",
+                "groupKey": f"group {i}",
+                "subGroups": [
+                    {
+                        "subGroup": f"Sub Group {j}",
+                        "subGroupKey": f"sub group {j}",
+                        "layers": [
+                            {
+                                "dataTypeId": 33000 + 100 * i + 10 * j + k,
+                                "name": f"Layer {i}.{j}.{k}",
+                                "unitOfMeasure": "°C",
+                                "details": [
+                                    {
+                                        "name": f"ermes:{33000 + 100 * i + 10 * j + k}_layer_{uuid.uuid4()}",
+                                        "metadata_Id": str(uuid.uuid4()),
+                                        "created_At": (start + timedelta(days=l)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                        "mapRequestCode": map_request_codes[(i + j + k + l) % len(map_request_codes)] if map_request_codes else None,
+                                        "timestamps": [
+                                            (start + timedelta(days=l, hours=t)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                                            for t in range(n_timestamps)
+                                        ],
+                                    }
+                                    for l in range(n_details)
+                                ]
+                            }
+                            for k in range(n_layers)
+                        ]
+                    }
+                    for j in range(n_sub_groups)
+                ]
+            }
+            for i in range(n_groups)
+        ]
+    }  # yapf: disable
+
+
+def clear_memoization():
+    from safers.data.layers import DATA_TYPE_LOOKUPS, _get_url_templates
+
+    _get_url_templates.cache_clear()
+    DATA_TYPE_LOOKUPS.clear()
+
+
+def time_it(fn, n_iterations, cold=False):
+    import time
+
+    elapsed = 0
+    for _ in range(n_iterations):
+        if cold:
+            clear_memoization()
+        start = time.perf_counter()
+        fn()
+        elapsed += time.perf_counter() - start
+    return elapsed / n_iterations
+
+
+def run_benchmark(n_iterations=10, n_map_requests=20):
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from safers.data.layers import get_metadata_url_template, index_layer_details
+    from safers.data.views import OperationalLayerView
+
+    request = Request(APIRequestFactory().get("/api/data/layers"))
+
+    # operational layers...
+
+    layers_data = generate_layers_data()
+    n_timestamps = sum(
+        len(detail["timestamps"])
+        for group in layers_data["layerGroups"]
+        for sub_group in group["subGroups"]
+        for layer in sub_group["layers"]
+        for detail in layer["details"][:1]
+    )  # yapf: disable
+
+    view = OperationalLayerView()
+    view.request = request
+    view.format_kwarg = None
+
+    print(f"OperationalLayerView: building layer tree from {n_timestamps} timestamps")  # yapf: disable
+    for compact in [False, True]:
+        validated_data = {"n_layers": 1, "compact": compact}
+
+        def _build():
+            return view.get_layers_response(layers_data, validated_data).data
+
+        cold_time = time_it(_build, n_iterations, cold=True)
+        warm_time = time_it(_build, n_iterations)
+
+        data = _build()
+        render_time = time_it(lambda: JSONRenderer().render(data), n_iterations)
+        size = len(JSONRenderer().render(data))
+
+        print(f"  compact={compact}:")
+        print(f"    build (cold):     {cold_time * 1000:.1f}ms")
+        print(f"    build (memoized): {warm_time * 1000:.1f}ms")
+        print(f"    render:           {render_time * 1000:.1f}ms")
+        print(f"    size:             {size / 1024:.1f}KB")
+
+    # on-demand layers...
+
+    request_ids = {f"{i}" for i in range(n_map_requests)}
+    layers_data = generate_layers_data(
+        n_timestamps=72, map_request_codes=sorted(request_ids)
+    )
+
+    def _index():
+        return index_layer_details(
+            layers_data, request_ids, get_metadata_url_template(request)
+        )
+
+    cold_time = time_it(_index, n_iterations, cold=True)
+    warm_time = time_it(_index, n_iterations)
+
+    print(f"MapRequestViewSet: indexing layer details for {n_map_requests} map requests")  # yapf: disable
+    print(f"    index (cold):     {cold_time * 1000:.1f}ms")
+    print(f"    index (memoized): {warm_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    import os
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    run_benchmark()
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+
+# Benchmark comparing fetching the GetTimeSeries chunks of a layer one by one
+# (as the browser used to) w/ GEOSERVER_CLIENT.get_timeseries (which fetches
+# them concurrently and merges them) against a local FakeGeoServer (run from
+# the "server" directory):
+# $ python -m safers.data.tests.benchmark_timeseries
+
+
+def run_benchmark(n_timestamps=1000, latency=0.1, n_iterations=5):
+    import time
+    from datetime import datetime, timedelta
+
+    from django.test import override_settings
+
+    from safers.core.utils import chunk
+    from safers.data.clients import GEOSERVER_CLIENT
+    from safers.data.layers import MAX_GEOSERVER_TIMES
+    from safers.data.tests.fake_geoserver import FakeGeoServer
+
+    layer = "ermes:33101_t2m_33001_b7aa380a-20fc-41d2-bfbc-a6ca73310f4d"
+    bbox = "1.0,2.0,1.1,2.1"
+    times = [
+        (datetime(2022, 4, 5) + timedelta(hours=i)
+        ).strftime("%Y-%m-%dT%H:%M:%SZ") for i in range(n_timestamps)
+    ]
+
+    def _sequential():
+        return [
+            GEOSERVER_CLIENT.get_timeseries_lines(layer, bbox, times_chunk)
+            for times_chunk in chunk(times, MAX_GEOSERVER_TIMES)
+        ]
+
+    def _concurrent():
+        return list(GEOSERVER_CLIENT.get_timeseries(layer, bbox, times))
+
+    with FakeGeoServer(latency=latency) as geoserver:
+        with override_settings(SAFERS_GEOSERVER_URL=geoserver.url):
+            results = {}
+            for name, fn in [("sequential", _sequential), ("concurrent", _concurrent)]:  # yapf: disable
+                start = time.perf_counter()
+                for _ in range(n_iterations):
+                    fn()
+                results[name] = (time.perf_counter() - start) / n_iterations
+
+    n_chunks = len(list(chunk(times, MAX_GEOSERVER_TIMES)))
+    print(f"{n_timestamps} timestamps in {n_chunks} chunks w/ {latency * 1000:.0f}ms latency per request")  # yapf: disable
+    for name, elapsed in results.items():
+        print(f"{name:<12} {elapsed * 1000:.1f}ms")
+    print(f"speedup:     {results['sequential'] / results['concurrent']:.1f}x")
+
+
+if __name__ == "__main__":
+    import os
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    run_benchmark()
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+# Micro-benchmark comparing format_timestamps w/ the original per-timestamp
+# strptime/strftime over every timestamp in a GetLayers payload.  A captured
+# payload (ie: the JSON response of GATEWAY_CLIENT.get_layers) can be passed
+# as an argument; otherwise a realistic one is generated (run from the
+# "server" directory):
+# $ python -m safers.data.tests.benchmark_timestamps [<payload.json>]
+
+
+def legacy_format_timestamps(timestamps):
+    """
+    the way that the layer views used to reformat timestamps
+    """
+    from datetime import datetime
+    from safers.data.layers import DATETIME_INPUT_FORMAT, DATETIME_OUTPUT_FORMAT
+
+    return [
+        datetime.strptime(timestamp, DATETIME_INPUT_FORMAT
+                         ).strftime(DATETIME_OUTPUT_FORMAT)
+        for timestamp in timestamps
+    ]
+
+
+def run_benchmark(layers_data, n_iterations=10):
+    import timeit
+
+    from safers.data.layers import format_timestamps, iter_layers
+
+    timestamps_lists = [
+        detail.get("timestamps") or []
+        for _, _, layer in iter_layers(layers_data)
+        for detail in layer.get("details") or []
+    ]  # yapf: disable
+    n_timestamps = sum(map(len, timestamps_lists))
+
+    for timestamps in timestamps_lists:
+        assert format_timestamps(timestamps
+                                ) == legacy_format_timestamps(timestamps)
+
+    legacy_time = timeit.timeit(
+        lambda: [
+            legacy_format_timestamps(timestamps)
+            for timestamps in timestamps_lists
+        ],
+        number=n_iterations
+    ) / n_iterations
+    fast_time = timeit.timeit(
+        lambda:
+        [format_timestamps(timestamps) for timestamps in timestamps_lists],
+        number=n_iterations
+    ) / n_iterations
+
+    print(f"reformatted {n_timestamps} timestamps in {len(timestamps_lists)} layer details")  # yapf: disable
+    print(f"legacy strptime:   {legacy_time * 1000:.2f}ms ({legacy_time / n_timestamps * 1e6:.3f}µs per timestamp)")  # yapf: disable
+    print(f"format_timestamps: {fast_time * 1000:.2f}ms ({fast_time / n_timestamps * 1e6:.3f}µs per timestamp)")  # yapf: disable
+    print(f"speedup:           {legacy_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    import sys
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as fp:
+            layers_data = json.load(fp)
+    else:
+        from safers.data.tests.benchmark_layers import generate_layers_data
+        layers_data = generate_layers_data()
+
+    run_benchmark(layers_data)
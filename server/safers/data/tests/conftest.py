@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 
 from rest_framework.test import APIClient
 
+from safers.data.caches import GATEWAY_LAYERS_CACHE
 from safers.data.models.models_maprequests import get_next_request_id
 
 from safers.rmq import RMQ
@@ -65,6 +66,42 @@ def api_client():
     return _api_client
 
 
+@pytest.fixture
+def mock_get_layers(monkeypatch):
+    """
+    returns a function which replaces the (cached) layer catalog w/
+    `layers_data`, or w/ a catalog of a single layer built from `details`
+    (and any other layer attributes); that function returns the list of
+    params the catalog is requested w/
+    """
+    def _mock_get_layers(layers_data=None, details=None, **layer):
+        proxy_requests = []
+        if layers_data is None:
+            layers_data = {
+                "layerGroups": [{
+                    "group": "group",
+                    "subGroups": [{
+                        "subGroup": "sub_group",
+                        "layers": [{
+                            "dataTypeId": 33101,
+                            "name": "layer",
+                            **layer,
+                            "details": details or [],
+                        }],
+                    }],
+                }]
+            }  # yapf: disable
+
+        def _get_layers(params=None, auth=None, organization=None):
+            proxy_requests.append(params)
+            return layers_data
+
+        monkeypatch.setattr(GATEWAY_LAYERS_CACHE, "get_layers", _get_layers)
+        return proxy_requests
+
+    return _mock_get_layers
+
+
 @pytest.fixture
 def mock_method():
     """
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from safers.data.layers import GEOSERVER_WMS_URL_PATH, GEOSERVER_WMTS_URL_PATH, MAX_GEOSERVER_TIMES, WMTS_CRS
+
+
+class FakeGeoServer(object):
+    """
+    A local (threaded) HTTP server that stands in for GeoServer in tests &
+    benchmarks; it answers each request after `latency` seconds w/
+    deterministic values and records the (parsed) query params of every
+    request it receives.  Usage is:
+    >>> with FakeGeoServer(latency=0.05) as geoserver:
+    ...     GEOSERVER_CLIENT.get_timeseries(layer, bbox, times, geoserver_url=geoserver.url)
+    """
+    def __init__(self, latency=0, max_times=MAX_GEOSERVER_TIMES):
+        self.latency = latency
+        self.max_times = max_times
+        self.lock = threading.Lock()
+        self.requests = []
+        self.handlers = {
+            (GEOSERVER_WMS_URL_PATH, "GetTimeSeries"): self.get_timeseries,
+            (GEOSERVER_WMS_URL_PATH, "GetFeatureInfo"): self.get_feature_info,
+            (GEOSERVER_WMTS_URL_PATH, "GetTile"): self.get_tile,
+        }
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/"
+
+    @staticmethod
+    def get_value(layer, time):
+        return sum(map(ord, f"{layer}{time}")) % 1000 / 10
+
+    def get_timeseries(self, params):
+        layer = params["layers"]
+        times = params["time"].split(",")
+        if len(times) > self.max_times:
+            return 400, "text/plain", b"too many times"
+        lines = [
+            "# Latitude: 40.0",
+            "# Longitude: -3.5",
+            f"Time (UTC),{layer}",
+        ] + [
+            f"{time.replace('Z', '.000Z')},{self.get_value(layer, time)}"
+            for time in sorted(times)
+        ]
+        return 200, "text/csv", "\n".join(lines).encode() + b"\n"
+
+    def get_feature_info(self, params):
+        """
+        returns one (raster) feature per layer, except for layers called
+        "*outside*" (which return none, as if the point were outside them)
+        and "*unknown*" (which fail the whole request, as GeoServer does)
+        """
+        features = []
+        for layer in params["query_layers"].split(","):
+            if "unknown" in layer:
+                return 200, "application/vnd.ogc.se_xml", (
+                    f"<ServiceExceptionReport><ServiceException>Could not find layer {layer}</ServiceException></ServiceExceptionReport>"
+                ).encode()
+            if "outside" not in layer:
+                features.append({
+                    "type": "Feature",
+                    "id": "",
+                    "geometry": None,
+                    "properties": {
+                        "GRAY_INDEX": self.get_value(layer, params["bbox"])
+                    },
+                })
+        body = json.dumps({"type": "FeatureCollection", "features": features})
+        return 200, "application/json", body.encode()
+
+    @staticmethod
+    def get_tile_content(layer, time, z, x, y):
+        return b"\x89PNG\r\n\x1a\n" + f"{layer}/{time}/{z}/{x}/{y}".encode()
+
+    def get_tile(self, params):
+        z = params["tilematrix"].replace(f"{WMTS_CRS}:", "")
+        content = self.get_tile_content(
+            params["layer"],
+            params["time"],
+            z,
+            params["tilecol"],
+            params["tilerow"],
+        )
+        return 200, "image/png", content
+
+    def handle(self, path, params):
+        with self.lock:
+            self.requests.append(params)
+        if self.latency:
+            time.sleep(self.latency)
+        handler = self.handlers.get((path, params.get("request")))
+        if handler is None:
+            return 404, "text/plain", b"not found"
+        return handler(params)
+
+    def start(self):
+        geoserver = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {
+                    k: v[-1]
+                    for k, v in parse_qs(url.query).items()
+                }  # yapf: disable
+                status, content_type, body = geoserver.handle(url.path, params)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
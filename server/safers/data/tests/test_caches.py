@@ -0,0 +1,251 @@
+import base64
+import json
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from django.utils import timezone
+
+from safers.core.authentication import TokenAuthentication
+from safers.data import caches
+from safers.data.caches import GatewayLayersCache, MetadataCache
+from safers.data.models import DataLayerMetadata
+
+
+@pytest.fixture
+def mock_get_layers(monkeypatch):
+    calls = []
+
+    def _mock_get_layers(params=None, auth=None, **kwargs):
+        calls.append(params)
+        return {"layerGroups": [], "n_calls": len(calls)}
+
+    monkeypatch.setattr(caches.GATEWAY_CLIENT, "get_layers", _mock_get_layers)
+    return calls
+
+
+def get_auth(expires_in=3600):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"exp": time.time() + expires_in}).encode()
+    ).decode().rstrip("=")
+    return TokenAuthentication(f"e30.{payload}.signature")
+
+
+@pytest.mark.django_db
+class TestGatewayLayersCache:
+    def test_get_layers(self, mock_get_layers):
+
+        layers_cache = GatewayLayersCache(timeout=60, max_stale=60)
+
+        layers_data = layers_cache.get_layers(
+            params={"a": 1, "b": 2}, organization="org"
+        )
+        assert layers_data["n_calls"] == 1
+
+        # params are normalized
+        layers_data = layers_cache.get_layers(
+            params={"b": 2, "a": 1}, organization="org"
+        )
+        assert layers_data["n_calls"] == 1
+
+        # organizations are cached separately
+        layers_data = layers_cache.get_layers(
+            params={"a": 1, "b": 2}, organization="other_org"
+        )
+        assert layers_data["n_calls"] == 2
+
+        assert layers_cache.as_dict() == {
+            "size": 2, "hits": 1, "stale_hits": 0, "misses": 2
+        }
+
+    def test_stale_while_revalidate(self, mock_get_layers):
+
+        layers_cache = GatewayLayersCache(timeout=60, max_stale=60)
+
+        layers_data = layers_cache.get_layers(organization="org")
+        assert layers_data["n_calls"] == 1
+
+        # pretend the entry has expired
+        key = layers_cache.get_key(organization="org")
+        layers_cache.layers[key] = (
+            layers_data, time.monotonic() - layers_cache.timeout - 1
+        )
+
+        # the stale entry is returned while it is refreshed...
+        layers_data = layers_cache.get_layers(
+            organization="org", auth=get_auth()
+        )
+        assert layers_data["n_calls"] == 1
+
+        for _ in range(100):
+            if not layers_cache.refreshing:
+                break
+            time.sleep(0.01)
+
+        # ...and the refreshed entry is returned after that
+        layers_data = layers_cache.get_layers(organization="org")
+        assert layers_data["n_calls"] == 2
+        assert len(mock_get_layers) == 2
+
+    def test_stale_refresh_once(self, monkeypatch):
+
+        release_refresh = threading.Event()
+        calls = []
+
+        def _mock_get_layers(params=None, auth=None, **kwargs):
+            calls.append(params)
+            if len(calls) > 1:
+                release_refresh.wait(timeout=5)
+            return {"layerGroups": [], "n_calls": len(calls)}
+
+        monkeypatch.setattr(
+            caches.GATEWAY_CLIENT, "get_layers", _mock_get_layers
+        )
+
+        layers_cache = GatewayLayersCache(timeout=60, max_stale=60)
+        layers_data = layers_cache.get_layers(organization="org")
+
+        key = layers_cache.get_key(organization="org")
+        layers_cache.layers[key] = (
+            layers_data, time.monotonic() - layers_cache.timeout - 1
+        )
+
+        # many stale hits only start a single refresh
+        for _ in range(10):
+            layers_data = layers_cache.get_layers(
+                organization="org", auth=get_auth()
+            )
+            assert layers_data["n_calls"] == 1
+        release_refresh.set()
+        layers_cache.refresh_executor.shutdown(wait=True)
+
+        assert len(calls) == 2
+
+    def test_stale_expiring_token(self, mock_get_layers):
+
+        layers_cache = GatewayLayersCache(
+            timeout=60, max_stale=60, min_token_lifetime=30
+        )
+        layers_data = layers_cache.get_layers(organization="org")
+
+        key = layers_cache.get_key(organization="org")
+        layers_cache.layers[key] = (
+            layers_data, time.monotonic() - layers_cache.timeout - 1
+        )
+
+        # the stale entry is served w/out replaying a token that is about to expire
+        layers_data = layers_cache.get_layers(
+            organization="org", auth=get_auth(expires_in=10)
+        )
+        assert layers_data["n_calls"] == 1
+        assert not layers_cache.refreshing
+        assert len(mock_get_layers) == 1
+
+    def test_invalidate(self, mock_get_layers):
+
+        layers_cache = GatewayLayersCache(
+            timeout=60, max_stale=60, check_interval=0
+        )
+
+        layers_data = layers_cache.get_layers(organization="org")
+        assert layers_data["n_calls"] == 1
+
+        # invalidation by a different process (ie: the RMQ consumer)
+        GatewayLayersCache().invalidate()
+
+        layers_data = layers_cache.get_layers(organization="org")
+        assert layers_data["n_calls"] == 2
+
+
+@pytest.fixture
+def mock_get_metadata(monkeypatch):
+    calls = []
+
+    def _mock_get(path, params=None, auth=None, **kwargs):
+        metadata_id = params["MetadataId"]
+        calls.append(metadata_id)
+        if metadata_id.startswith("invalid"):
+            raise ValueError(f"unknown metadata: {metadata_id}")
+        return {"id": metadata_id, "title": f"title {metadata_id}"}
+
+    monkeypatch.setattr(caches.GATEWAY_CLIENT, "get", _mock_get)
+    return calls
+
+
+@pytest.mark.django_db
+class TestMetadataCache:
+    def test_get(self, mock_get_metadata, django_assert_num_queries):
+
+        metadata_cache = MetadataCache(max_size=10, timeout=60)
+
+        assert metadata_cache.get("a") == {"id": "a", "title": "title a"}
+        assert DataLayerMetadata.objects.filter(metadata_id="a").exists()
+
+        with django_assert_num_queries(0):
+            assert metadata_cache.get("a")["id"] == "a"
+        assert mock_get_metadata == ["a"]
+
+        # another process (or a restart) uses the db tier...
+        metadata_cache.clear()
+        assert metadata_cache.get("a")["id"] == "a"
+        assert mock_get_metadata == ["a"]
+
+        assert metadata_cache.as_dict() == {
+            "size": 1, "hits": 0, "db_hits": 1, "misses": 0
+        }
+
+    def test_get_many(self, mock_get_metadata):
+
+        metadata_cache = MetadataCache(max_size=10, timeout=60)
+        metadata_cache.get("b")
+
+        metadata, errors = metadata_cache.get_many(["c", "b", "invalid", "a"])
+        assert list(metadata.keys()) == ["c", "b", "a"]
+        assert list(errors.keys()) == ["invalid"]
+        assert sorted(mock_get_metadata) == ["a", "b", "c", "invalid"]
+
+        # errors are not cached
+        metadata, errors = metadata_cache.get_many(["a", "invalid"])
+        assert list(metadata.keys()) == ["a"]
+        assert list(errors.keys()) == ["invalid"]
+        assert mock_get_metadata.count("invalid") == 2
+
+    def test_bounded(self, mock_get_metadata):
+
+        metadata_cache = MetadataCache(max_size=2, timeout=60)
+        metadata_cache.get_many(["a", "b", "c"])
+
+        assert list(metadata_cache.metadata.keys()) == [(None, "b"), (None, "c")]
+        assert DataLayerMetadata.objects.count() == 3
+
+    def test_organization(self, mock_get_metadata):
+
+        # metadata (which may be private) is never shared across organizations
+        metadata_cache = MetadataCache(max_size=10, timeout=60)
+        metadata_cache.get("a", organization="org1")
+        metadata_cache.get("a", organization="org2")
+        assert mock_get_metadata == ["a", "a"]
+
+        metadata_cache.clear()
+        metadata_cache.get("a", organization="org1")
+        metadata_cache.get("a")
+        assert mock_get_metadata == ["a", "a", "a"]
+        assert set(
+            DataLayerMetadata.objects.values_list("organization", flat=True)
+        ) == {"org1", "org2", ""}
+
+    def test_timeout(self, mock_get_metadata):
+
+        metadata_cache = MetadataCache(max_size=10, timeout=60)
+        metadata_cache.get("a")
+
+        DataLayerMetadata.objects.update(
+            created=timezone.now() - timedelta(seconds=61)
+        )
+        metadata_cache.clear()
+
+        metadata_cache.get("a")
+        assert mock_get_metadata == ["a", "a"]
+        assert DataLayerMetadata.objects.count() == 1
@@ -0,0 +1,64 @@
+import pytest
+from urllib.parse import quote_plus
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from safers.users.tests.factories import UserFactory
+
+from safers.data.tests.mocks import MOCK_OPERATIONAL_LAYERS_DATA
+from safers.data.views import OperationalLayerView
+
+
+@pytest.mark.django_db
+class TestOperationalLayerView:
+    def get_details(self, data):
+        return [
+            detail
+            for group in data
+            for sub_group in group["children"]
+            for layer in sub_group["children"]
+            for detail in layer["children"]
+        ]  # yapf: disable
+
+    def get_response(self, user, params):
+        view = OperationalLayerView.as_view()
+        request = APIRequestFactory().get("/api/data/layers", params)
+        force_authenticate(request, user=user, token="token")
+        return view(request)
+
+    def test_compact(self, mock_get_layers):
+
+        proxy_requests = mock_get_layers(MOCK_OPERATIONAL_LAYERS_DATA)
+        user = UserFactory()
+
+        response = self.get_response(user, {})
+        assert response.status_code == status.HTTP_200_OK
+        compact_response = self.get_response(user, {"compact": True})
+        assert compact_response.status_code == status.HTTP_200_OK
+
+        # "compact" is not passed onto the gateway
+        assert all("compact" not in params for params in proxy_requests)
+        assert proxy_requests[0] == proxy_requests[1]
+
+        details = self.get_details(response.data)
+        compact_details = self.get_details(compact_response.data)
+        assert len(details) == len(compact_details) > 0
+
+        for detail, compact_detail in zip(details, compact_details):
+            assert "urls" not in compact_detail
+            assert "timeseries_urls" not in compact_detail
+            assert compact_detail["timestamps"] == list(detail["urls"].keys())
+
+            # expanding the templates gives the same urls...
+            assert {
+                timestamp: [
+                    url_template.replace("{time}", quote_plus(timestamp))
+                    for url_template in compact_detail["url_templates"]
+                ]
+                for timestamp in compact_detail["timestamps"]
+            } == detail["urls"]
+
+            # ...and everything else is unchanged
+            for key in detail.keys() - {"urls", "timeseries_urls"}:
+                assert compact_detail[key] == detail[key]
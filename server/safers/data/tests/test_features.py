@@ -0,0 +1,183 @@
+import pytest
+
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from safers.users.tests.factories import UserFactory
+
+from safers.data.clients import GEOSERVER_CLIENT
+from safers.data.layers import DATA_TYPE_LOOKUPS, format_feature_string
+from safers.data.tests.factories import DataTypeFactory
+from safers.data.tests.fake_geoserver import FakeGeoServer
+from safers.data.views import LayerFeatureInfoView
+
+BBOX = "1.0,2.0,1.1,2.1"
+
+
+@pytest.fixture
+def fake_geoserver():
+    with FakeGeoServer() as geoserver:
+        with override_settings(SAFERS_GEOSERVER_URL=geoserver.url):
+            yield geoserver
+
+
+def test_format_feature_string():
+    feature_collection = {
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature", "id": "", "properties": {"GRAY_INDEX": 12.5}
+        }],
+    }  # yapf: disable
+
+    assert format_feature_string(
+        "value of pixel: {{$.features[0].properties.GRAY_INDEX}}",
+        feature_collection,
+    ) == "value of pixel: 12.5"
+    assert format_feature_string(
+        "value of pixel: {{GRAY_INDEX}} °C", feature_collection
+    ) == "value of pixel: 12.5 °C"
+    assert format_feature_string("{{t2m}}", feature_collection) is None
+    assert format_feature_string(
+        "{{GRAY_INDEX}}", {"type": "FeatureCollection", "features": []}
+    ) is None
+
+
+class TestGeoServerClient:
+    def test_get_feature_info(self, fake_geoserver):
+
+        names = ["ermes:a", "ermes:b", "ermes:c"]
+        feature_collections, errors = GEOSERVER_CLIENT.get_feature_info(
+            names, BBOX
+        )
+
+        # a single multi-layer request...
+        assert len(fake_geoserver.requests) == 1
+        assert fake_geoserver.requests[0]["query_layers"] == ",".join(names)
+
+        # ...split by layer
+        assert errors == {}
+        assert list(feature_collections.keys()) == names
+        for name in names:
+            features = feature_collections[name]["features"]
+            assert features[0]["properties"]["GRAY_INDEX"] == FakeGeoServer.get_value(name, BBOX)  # yapf: disable
+
+    def test_get_feature_info_fallback(self, fake_geoserver):
+
+        names = ["ermes:a", "ermes:outside_b", "ermes:unknown_c"]
+        feature_collections, errors = GEOSERVER_CLIENT.get_feature_info(
+            names, BBOX
+        )
+
+        # the multi-layer request fails, so each layer is queried separately
+        assert len(fake_geoserver.requests) == 1 + len(names)
+        assert len(feature_collections["ermes:a"]["features"]) == 1
+        assert len(feature_collections["ermes:outside_b"]["features"]) == 0
+        assert list(errors.keys()) == ["ermes:unknown_c"]
+
+
+    def test_split_features(self):
+
+        names = ["ermes:vector", "ermes:raster"]
+        vector_features = [
+            {"type": "Feature", "id": "vector.1", "properties": {"a": 1}},
+            {"type": "Feature", "id": "vector.2", "properties": {"a": 2}},
+        ]
+        raster_feature = {
+            "type": "Feature", "id": "", "properties": {"GRAY_INDEX": 1.0}
+        }
+
+        # vector features are attributed by id...
+        assert GEOSERVER_CLIENT.split_features(names, vector_features) == {
+            "ermes:vector": vector_features, "ermes:raster": []
+        }
+
+        # ...and if some cannot be, then 2 vector features & no raster
+        # feature are not mistaken for one feature per layer
+        assert GEOSERVER_CLIENT.split_features(
+            ["ermes:vector_layer", "ermes:raster"], vector_features
+        ) is None
+        assert GEOSERVER_CLIENT.split_features(
+            names, vector_features[:1] + [raster_feature]
+        ) is None
+
+        # raster features are attributed by position
+        assert GEOSERVER_CLIENT.split_features(
+            ["ermes:a", "ermes:b"], [raster_feature, raster_feature]
+        ) == {"ermes:a": [raster_feature], "ermes:b": [raster_feature]}
+
+@pytest.mark.django_db
+class TestLayerFeatureInfoView:
+    @pytest.fixture
+    def data_type(self):
+        DATA_TYPE_LOOKUPS.clear()
+        return DataTypeFactory(
+            is_on_demand=False,
+            feature_string=
+            "value of pixel: {{$.features[0].properties.GRAY_INDEX}}",
+        )
+
+    @pytest.fixture
+    def mock_layers(self, mock_get_layers, data_type):
+        mock_get_layers(
+            dataTypeId=data_type.datatype_id,
+            unitOfMeasure="°C",
+            details=[
+                {"name": "ermes:a", "timestamps": []},
+                {"name": "ermes:outside_b", "timestamps": []},
+            ],
+        )
+
+    def get_response(self, user, params):
+        view = LayerFeatureInfoView.as_view()
+        request = APIRequestFactory().get("/api/data/layers/features", params)
+        force_authenticate(request, user=user, token="token")
+        return view(request)
+
+    def test_get(self, fake_geoserver, mock_layers, data_type):
+
+        user = UserFactory()
+
+        response = self.get_response(
+            user, {
+                "point": "1.05,2.05",
+                "resolution": 0.1,
+                "layers": ["ermes:a,ermes:outside_b", "ermes:unknown_c"],
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data.keys()) == [
+            "ermes:a", "ermes:outside_b", "ermes:unknown_c"
+        ]
+
+        layer_data = response.data["ermes:a"]
+        assert layer_data["datatype_id"] == data_type.datatype_id
+        assert layer_data["units"] == "°C"
+        assert layer_data["error"] is None
+        value = fake_geoserver.get_value(
+            "ermes:a", fake_geoserver.requests[-1]["bbox"]
+        )
+        assert layer_data["properties"] == {"GRAY_INDEX": value}
+        assert layer_data["value"] == f"value of pixel: {value}"
+
+        assert response.data["ermes:outside_b"]["error"] is None
+        assert response.data["ermes:outside_b"]["value"] is None
+
+        # unknown layers are never sent to GeoServer
+        assert response.data["ermes:unknown_c"]["error"] == "unknown layer"
+        assert all(
+            "ermes:unknown_c" not in request["query_layers"]
+            for request in fake_geoserver.requests
+        )
+
+    def test_invalid_params(self, fake_geoserver, mock_layers):
+
+        user = UserFactory()
+
+        response = self.get_response(user, {"point": "1", "layers": "ermes:a"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.get_response(user, {"point": "1,2", "layers": ""})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert fake_geoserver.requests == []
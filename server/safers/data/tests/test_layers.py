@@ -0,0 +1,174 @@
+import pytest
+from datetime import datetime, timedelta
+
+from django.test import override_settings
+
+from safers.data.layers import DataTypeLookups, DATA_TYPE_LOOKUPS, build_layer_tree, format_timestamp, format_timestamps, get_detail_urls, get_url_templates, index_layer_details
+from safers.data.tests.factories import DataTypeFactory
+from safers.data.tests.mocks import MOCK_OPERATIONAL_LAYERS_DATA
+
+METADATA_URL = "http://testserver/api/data/layers/metadata/{metadata_id}?metadata_format={metadata_format}"
+
+
+class TestUrlTemplates:
+    def test_memoized(self):
+        assert get_url_templates() is get_url_templates()
+
+    def test_settings_changed(self):
+        url_templates = get_url_templates()
+        with override_settings(
+            SAFERS_GEOSERVER_URLS=["https://a.geoserver", "https://b.geoserver"]
+        ):
+            other_url_templates = get_url_templates()
+            assert other_url_templates is not url_templates
+            assert len(other_url_templates.layer_urls) == 2
+            assert other_url_templates.layer_urls[0].startswith(
+                "https://a.geoserver"
+            )
+
+    def test_tile_proxy(self):
+        tile_proxy_url = "http://testserver/api/data/layers/tiles"
+        url_templates = get_url_templates(tile_proxy_url=tile_proxy_url)
+        assert url_templates is not get_url_templates()
+
+        detail_urls = get_detail_urls(
+            {
+                "name": "ermes:a",
+                "timestamps": ["2022-04-05T01:00:00Z"],
+            },
+            METADATA_URL,
+            url_templates=url_templates,
+        )
+        assert detail_urls["urls"] == {
+            "2022-04-05T01:00:00.000Z": [
+                f"{tile_proxy_url}/ermes%3Aa/2022-04-05T01%3A00%3A00.000Z/{{z}}/{{x}}/{{y}}.png"
+            ]
+        }
+
+
+class TestFormatTimestamps:
+    def test_format_timestamps(self):
+        start = datetime(2023, 12, 25)
+        timestamps = [
+            (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            for i in range(24 * 90)  # (spanning a leap day)
+        ]
+        assert format_timestamps(timestamps) == [
+            format_timestamp(timestamp) for timestamp in timestamps
+        ]
+        assert format_timestamps(timestamps[:2]) == [
+            "2023-12-25T00:00:00.000Z", "2023-12-25T01:00:00.000Z"
+        ]
+
+    def test_format_irregular_timestamps(self):
+        timestamps = [
+            "2022-04-05T01:00:00Z",
+            "2022-4-5T1:00:00Z",  # not zero-padded
+            "2024-02-29T00:00:00Z",  # leap day
+        ]
+        assert format_timestamps(timestamps) == [
+            "2022-04-05T01:00:00.000Z",
+            "2022-04-05T01:00:00.000Z",
+            "2024-02-29T00:00:00.000Z",
+        ]
+
+    def test_format_invalid_timestamps(self):
+        with pytest.raises(ValueError):
+            format_timestamps(["2022-04-05T01:00:00Z", "2022-04-31T00:00:00Z"])
+        with pytest.raises(ValueError):
+            format_timestamps(["2022-04-05T01:00:00"])
+        with pytest.raises(TypeError):
+            format_timestamps(["2022-04-05T01:00:00Z", None])
+
+
+@pytest.mark.django_db
+class TestDataTypeLookups:
+    def test_get(self, django_assert_num_queries):
+
+        data_type = DataTypeFactory(source="source", is_on_demand=False)
+        on_demand_data_type = DataTypeFactory(
+            source="on demand source", is_on_demand=True
+        )
+
+        data_type_lookups = DataTypeLookups(check_interval=60)
+
+        lookups = data_type_lookups.get()
+        assert lookups["source"][data_type.datatype_id] == "source"
+        assert on_demand_data_type.datatype_id not in lookups["source"]
+
+        with django_assert_num_queries(0):
+            assert data_type_lookups.get() is lookups
+
+    def test_invalidate(self, django_capture_on_commit_callbacks):
+
+        DATA_TYPE_LOOKUPS.clear()
+
+        data_type = DataTypeFactory(source="source", is_on_demand=False)
+        assert DATA_TYPE_LOOKUPS.get()["source"][data_type.datatype_id
+                                                ] == "source"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            data_type.source = "new source"
+            data_type.save()
+
+        assert DATA_TYPE_LOOKUPS.get()["source"][data_type.datatype_id
+                                                ] == "new source"
+
+
+@pytest.mark.django_db
+class TestLayerTrees:
+    def test_build_layer_tree(self):
+
+        data = build_layer_tree(MOCK_OPERATIONAL_LAYERS_DATA, METADATA_URL)
+
+        url_templates = get_url_templates()
+        for i, group in enumerate(MOCK_OPERATIONAL_LAYERS_DATA["layerGroups"]):
+            assert data[i]["text"] == group["group"]
+            for j, sub_group in enumerate(group["subGroups"]):
+                for k, layer in enumerate(sub_group["layers"]):
+                    most_recent_detail = max(
+                        layer["details"], key=lambda x: x.get("created_At")
+                    )
+                    detail = data[i]["children"][j]["children"][k]["children"][0]
+                    assert detail["id"] == f"{i+1}.{j+1}.{k+1}.1"
+                    assert detail["datatype_id"] == str(layer["dataTypeId"])
+                    assert len(detail["urls"]) == len(
+                        most_recent_detail["timestamps"]
+                    )
+                    for urls in detail["urls"].values():
+                        assert len(urls) == len(url_templates.layer_urls)
+
+    def test_index_layer_details(self):
+
+        layers_data = {
+            "layerGroups": [{
+                "group": "group",
+                "subGroups": [{
+                    "subGroup": "sub_group",
+                    "layers": [{
+                        "dataTypeId": 1,
+                        "name": "layer",
+                        "details": [
+                            {
+                                "name": "ermes:1_a",
+                                "mapRequestCode": "a",
+                                "timestamps": ["2022-04-05T01:00:00Z"],
+                            },
+                            {
+                                "name": "ermes:1_b",
+                                "mapRequestCode": "b",
+                                "timestamps": ["2022-04-05T01:00:00Z"],
+                            },
+                        ],
+                    }],
+                }],
+            }]
+        }  # yapf: disable
+
+        layer_details = index_layer_details(layers_data, {"a"}, METADATA_URL)
+
+        assert list(layer_details.keys()) == ["a"]
+        assert list(layer_details["a"].keys()) == ["1"]
+        assert list(layer_details["a"]["1"]["urls"].keys()) == [
+            "2022-04-05T01:00:00.000Z"
+        ]
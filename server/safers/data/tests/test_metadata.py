@@ -0,0 +1,85 @@
+import pytest
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from safers.users.tests.factories import UserFactory
+
+from safers.data.caches import METADATA_CACHE
+from safers.data.views import DataLayerMetadataListView
+
+
+@pytest.mark.django_db
+class TestDataLayerMetadataListView:
+    @pytest.fixture
+    def mock_fetch(self, monkeypatch):
+        calls = []
+
+        def _mock_fetch(metadata_id, auth=None):
+            calls.append(metadata_id)
+            if metadata_id == "invalid":
+                raise ValueError("unknown metadata")
+            return {"id": metadata_id, "notes": f"notes {metadata_id}"}
+
+        METADATA_CACHE.clear()
+        monkeypatch.setattr(METADATA_CACHE, "fetch", _mock_fetch)
+        return calls
+
+    def get_response(self, user, params):
+        view = DataLayerMetadataListView.as_view()
+        request = APIRequestFactory().get("/api/data/layers/metadata", params)
+        force_authenticate(request, user=user, token="token")
+        return view(request)
+
+    def test_list(self, mock_fetch):
+
+        user = UserFactory()
+
+        response = self.get_response(
+            user, {
+                "metadata_ids": ["a,b", "invalid", "a"],
+                "metadata_format": "text",
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["metadata"] == {"a": "notes a", "b": "notes b"}
+        assert list(response.data["errors"].keys()) == ["invalid"]
+
+        response = self.get_response(user, {"metadata_ids": ["a", "b"]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["metadata"]["b"]["id"] == "b"
+        assert response.data["errors"] == {}
+        assert sorted(mock_fetch) == ["a", "b", "invalid"]
+
+    def test_list_organizations(self, mock_fetch):
+
+        user = UserFactory(organization_name="org1")
+        other_user = UserFactory(organization_name="org2")
+
+        response = self.get_response(user, {"metadata_ids": "a"})
+        assert response.status_code == status.HTTP_200_OK
+        response = self.get_response(other_user, {"metadata_ids": "a"})
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_fetch == ["a", "a"]
+
+    def test_invalid_ids(self, mock_fetch):
+
+        user = UserFactory()
+
+        response = self.get_response(user, {})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.get_response(user, {"metadata_ids": "a,b/c"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.get_response(
+            user, {
+                "metadata_ids": [
+                    str(i) for i in range(
+                        DataLayerMetadataListView.MAX_METADATA_IDS + 1
+                    )
+                ]
+            }
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert mock_fetch == []
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+import pytest
+
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from safers.data.tests.fake_geoserver import FakeGeoServer
+from safers.data.tiles import TileStore
+from safers.data.views import LayerTileView, views_tiles
+
+LAYER_NAME = "ermes:33101_t2m_33001_b7aa380a-20fc-41d2-bfbc-a6ca73310f4d"
+TIME = "2022-04-05T01:00:00.000Z"
+
+
+class TestTileStore:
+    def test_get_put(self, tmp_path):
+
+        tile_store = TileStore(tmp_path)
+        key = tile_store.get_key(LAYER_NAME, TIME, 1, 0, 1)
+
+        assert tile_store.get(key) is None
+        tile_store.put(key, b"tile")
+        assert tile_store.get(key) == b"tile"
+
+        # tiles are sharded
+        assert tile_store.get_path(key).relative_to(tmp_path).parts[:2] == (
+            key[:2], key[2:4]
+        )
+        assert tile_store.as_dict() == {
+            "size": 4, "hits": 1, "misses": 1, "evictions": 0
+        }
+
+    def test_coalesce_misses(self, tmp_path):
+
+        tile_store = TileStore(tmp_path)
+        key = tile_store.get_key(LAYER_NAME, TIME, 1, 0, 1)
+
+        calls = []
+        release_fetch = threading.Event()
+
+        def _fetch():
+            calls.append(key)
+            release_fetch.wait()
+            return b"tile"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(tile_store.get_or_fetch(key, _fetch))
+            ) for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release_fetch.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [b"tile"] * 10
+
+    def test_evict(self, tmp_path):
+
+        tile_store = TileStore(tmp_path, max_size=1000, touch_interval=0)
+        keys = [
+            tile_store.get_key(LAYER_NAME, TIME, 5, x, 0) for x in range(12)
+        ]
+        for i, key in enumerate(keys):
+            tile_store.put(key, b"x" * 100)
+            os.utime(tile_store.get_path(key), (i, i))
+            # reading a tile makes it recently used
+            tile_store.get(keys[0])
+
+        assert tile_store.as_dict()["size"] <= 1000
+        assert tile_store.get(keys[0]) is not None
+        assert tile_store.get(keys[1]) is None
+        assert tile_store.get(keys[-1]) is not None
+
+
+@pytest.mark.django_db
+class TestLayerTileView:
+    @pytest.fixture
+    def fake_geoserver(self):
+        with FakeGeoServer() as geoserver:
+            with override_settings(
+                SAFERS_TILE_PROXY=True,
+                SAFERS_TILE_PROXY_WORKSPACES=["ermes"],
+                SAFERS_GEOSERVER_URLS=[geoserver.url],
+            ):
+                yield geoserver
+
+    @pytest.fixture
+    def tile_store(self, monkeypatch, tmp_path):
+        tile_store = TileStore(tmp_path)
+        monkeypatch.setattr(views_tiles, "TILE_STORE", tile_store)
+        return tile_store
+
+    def get_response(self, layer, time, z, x, y):
+        view = LayerTileView.as_view()
+        request = APIRequestFactory().get(
+            f"/api/data/layers/tiles/{layer}/{time}/{z}/{x}/{y}.png"
+        )
+        return view(request, layer=layer, time=time, z=z, x=x, y=y)
+
+    def test_get(self, fake_geoserver, tile_store):
+
+        response = self.get_response(LAYER_NAME, TIME, 3, 4, 5)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "image/png"
+        assert response.content == FakeGeoServer.get_tile_content(
+            LAYER_NAME, TIME, "3", "4", "5"
+        )
+        assert len(fake_geoserver.requests) == 1
+
+        # the tile is served from the store
+        cached_response = self.get_response(LAYER_NAME, TIME, 3, 4, 5)
+        assert cached_response.content == response.content
+        assert len(fake_geoserver.requests) == 1
+        assert tile_store.as_dict()["hits"] == 1
+
+    def test_invalid_tile(self, fake_geoserver, tile_store):
+
+        response = self.get_response("not a layer", TIME, 3, 4, 5)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.get_response(LAYER_NAME + "\n", TIME, 3, 4, 5)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.get_response(LAYER_NAME, TIME + "\n", 3, 4, 5)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.get_response(LAYER_NAME, TIME, 3, 8, 5)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert fake_geoserver.requests == []
+
+    def test_other_workspace(self, fake_geoserver, tile_store):
+
+        response = self.get_response("private:layer", TIME, 3, 4, 5)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert fake_geoserver.requests == []
+
+    def test_proxy_disabled(self, fake_geoserver, tile_store):
+
+        with override_settings(SAFERS_TILE_PROXY=False):
+            response = self.get_response(LAYER_NAME, TIME, 3, 4, 5)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert fake_geoserver.requests == []
@@ -0,0 +1,138 @@
+import pytest
+from datetime import datetime, timedelta
+
+from django.test import override_settings
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from safers.users.tests.factories import UserFactory
+
+from safers.data.clients import GEOSERVER_CLIENT
+from safers.data.layers import MAX_GEOSERVER_TIMES
+from safers.data.tests.fake_geoserver import FakeGeoServer
+from safers.data.views import LayerTimeSeriesView
+
+LAYER_NAME = "ermes:33101_t2m_33001_b7aa380a-20fc-41d2-bfbc-a6ca73310f4d"
+
+TIMESTAMPS = [
+    (datetime(2022, 4, 5) + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    for i in range(MAX_GEOSERVER_TIMES * 2 + 50)
+]
+
+
+@pytest.fixture
+def fake_geoserver():
+    with FakeGeoServer() as geoserver:
+        with override_settings(SAFERS_GEOSERVER_URL=geoserver.url):
+            yield geoserver
+
+
+class TestGeoServerClient:
+    def test_get_timeseries(self, fake_geoserver):
+
+        lines = list(
+            GEOSERVER_CLIENT.get_timeseries(
+                LAYER_NAME, "1.0,2.0,1.1,2.1", reversed(TIMESTAMPS)
+            )
+        )
+
+        # every chunk is fetched...
+        assert len(fake_geoserver.requests) == 3
+        assert all(
+            len(request["time"].split(",")) <= MAX_GEOSERVER_TIMES
+            for request in fake_geoserver.requests
+        )
+
+        # ...and merged into a single series w/ a single header
+        header, rows = lines[:3], lines[3:]
+        assert header[-1] == f"Time (UTC),{LAYER_NAME}"
+        assert len(rows) == len(TIMESTAMPS)
+        assert rows == sorted(rows)
+        assert rows[0] == f"2022-04-05T00:00:00.000Z,{FakeGeoServer.get_value(LAYER_NAME, TIMESTAMPS[0])}"
+
+
+    def test_merge_timeseries_duplicates(self):
+        class MockResponse:
+            def __init__(self, lines):
+                self.lines = lines
+                self.closed = False
+
+            def iter_lines(self, decode_unicode=False):
+                return iter(self.lines)
+
+            def close(self):
+                self.closed = True
+
+        header = ["# Latitude: 40.0", "Time (UTC),value"]
+        responses = [
+            MockResponse(header + ["2022-04-05T00:00:00.000Z,1", "2022-04-05T00:00:00.000Z,2"]),
+            MockResponse(header + ["2022-04-05T00:00:00.000Z,2", "2022-04-05T01:00:00.000Z,3"]),
+        ]  # yapf: disable
+
+        lines = list(GEOSERVER_CLIENT.merge_timeseries(responses))
+
+        # only exact duplicates are dropped; several rows per time are kept
+        assert lines == header + [
+            "2022-04-05T00:00:00.000Z,1",
+            "2022-04-05T00:00:00.000Z,2",
+            "2022-04-05T01:00:00.000Z,3",
+        ]
+        assert all(response.closed for response in responses)
+
+
+@pytest.mark.django_db
+class TestLayerTimeSeriesView:
+    @pytest.fixture
+    def mock_layers(self, mock_get_layers):
+        mock_get_layers(
+            details=[{"name": LAYER_NAME, "timestamps": TIMESTAMPS}]
+        )
+
+    def get_response(self, user, params):
+        view = LayerTimeSeriesView.as_view()
+        request = APIRequestFactory().get("/api/data/layers/timeseries", params)
+        force_authenticate(request, user=user, token="token")
+        return view(request)
+
+    def test_get(self, fake_geoserver, mock_layers):
+
+        user = UserFactory()
+        params = {
+            "layer": LAYER_NAME,
+            "bbox": "1,2,1.1,2.1",
+            "start": "2022-04-05T10:00:00Z",
+            "end": "2022-04-15T09:00:00Z",
+        }
+
+        response = self.get_response(user, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+
+        # the 1st response is streamed...
+        assert response.streaming
+        content = b"".join(response.streaming_content)
+        rows = content.decode().splitlines()[3:]
+        assert len(rows) == 240
+        assert rows[0].startswith("2022-04-05T10:00:00.000Z")
+        assert rows[-1].startswith("2022-04-15T09:00:00.000Z")
+        assert len(fake_geoserver.requests) == 3
+
+        # ...and then the same layer, (normalized) bbox & time range is cached
+        cached_response = self.get_response(
+            user, dict(params, bbox="1.0,2.0,1.10,2.10")
+        )
+        assert cached_response.content == content
+        assert len(fake_geoserver.requests) == 3
+
+    def test_unknown_layer(self, fake_geoserver, mock_layers):
+
+        user = UserFactory()
+
+        response = self.get_response(
+            user, {
+                "layer": "ermes:unknown", "bbox": "1,2,1.1,2.1"
+            }
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert fake_geoserver.requests == []
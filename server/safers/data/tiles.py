@@ -0,0 +1,209 @@
+"""
+An on-disk store of the WMTS tiles served by LayerTileView (the tile proxy),
+so that popular layers are rendered by GeoServer once rather than once per
+dashboard user.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from safers.core.clients import SingleFlight
+
+
+class TileStore(object):
+    """
+    A store of tiles on the local disk (shared by every process on the host).
+    Tiles are addressed by a hash of their (layer, time, z, x, y) and sharded
+    into two levels of directories (ie: "ab/cd/abcd...png") so that no single
+    directory grows too large.  Tiles are written to a temporary file which is
+    then renamed, so readers never see a partial tile, and are read via mmap.
+
+    Recency is tracked by each file's mtime (which is touched on reads, at
+    most every `touch_interval` seconds); once the store grows beyond
+    `max_size` bytes the least recently used tiles are evicted until it is
+    back under `max_size * low_water`.  Each process keeps its own running
+    estimate of the size of the store, which is corrected whenever it
+    evicts tiles, so max_size is approximate.
+
+    Concurrent misses for the same tile (within a process) share a single
+    fetch.
+    """
+    def __init__(
+        self, root, max_size=1024 * 1024 * 1024, low_water=0.9, touch_interval=60
+    ):
+        self.root = Path(root)
+        self.max_size = max_size
+        self.low_water = low_water
+        self.touch_interval = touch_interval
+        self.lock = threading.Lock()
+        self.eviction_lock = threading.Lock()
+        self.single_flight = SingleFlight()
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def get_key(layer, time, z, x, y):
+        tile_id = f"{layer}\n{time}\n{z}\n{x}\n{y}"
+        return hashlib.sha256(tile_id.encode()).hexdigest()
+
+    def get_path(self, key):
+        return self.root / key[:2] / key[2:4] / f"{key}.png"
+
+    def iter_tiles(self):
+        """
+        yields (path, stat) for every tile in the store
+        """
+        for path in self.root.glob("*/*/*.png"):
+            try:
+                yield path, path.stat()
+            except FileNotFoundError:
+                # (evicted by another process)
+                pass
+
+    def get(self, key):
+        """
+        returns the content of a tile (or None if it is not in the store)
+        """
+        path = self.get_path(key)
+        content = None
+        try:
+            with open(path, "rb") as fp:
+                stat = os.fstat(fp.fileno())
+                if stat.st_size:
+                    with mmap.mmap(
+                        fp.fileno(), 0, access=mmap.ACCESS_READ
+                    ) as tile_map:
+                        content = tile_map[:]
+        except FileNotFoundError:
+            pass
+
+        if content is None:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        if time.time() - stat.st_mtime > self.touch_interval:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return content
+
+    def put(self, key, content):
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self.lock:
+            if self.size is not None:
+                self.size += len(content)
+            size = self.size
+        if size is None:
+            size = self.scan()
+        if size > self.max_size:
+            self.evict()
+
+    def get_or_fetch(self, key, fetch, *args, **kwargs):
+        """
+        returns the content of a tile, calling fetch (and storing its result)
+        if it is not in the store
+        """
+        content = self.get(key)
+        if content is None:
+            content = self.single_flight.do(
+                key, self.fetch_and_put, key, fetch, *args, **kwargs
+            )
+        return content
+
+    def fetch_and_put(self, key, fetch, *args, **kwargs):
+        content = fetch(*args, **kwargs)
+        self.put(key, content)
+        return content
+
+    def scan(self):
+        """
+        (re)computes the size of the store
+        """
+        size = sum(stat.st_size for _, stat in self.iter_tiles())
+        with self.lock:
+            self.size = size
+        return size
+
+    def evict(self):
+        """
+        removes the least recently used tiles until the store is back under
+        `max_size * low_water` bytes
+        """
+        if not self.eviction_lock.acquire(blocking=False):
+            # (another thread is already evicting)
+            return
+        try:
+            tiles = sorted(
+                (stat.st_mtime, stat.st_size, path)
+                for path, stat in self.iter_tiles()
+            )
+            size = sum(tile_size for _, tile_size, _ in tiles)
+            target_size = self.max_size * self.low_water
+            n_evictions = 0
+            for _, tile_size, path in tiles:
+                if size <= target_size:
+                    break
+                try:
+                    path.unlink()
+                    n_evictions += 1
+                except FileNotFoundError:
+                    pass
+                size -= tile_size
+            with self.lock:
+                self.size = size
+                self.evictions += n_evictions
+        finally:
+            self.eviction_lock.release()
+
+    def clear(self):
+        """
+        resets the counters (the tiles are left as-is)
+        """
+        with self.lock:
+            self.size = None
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+TILE_STORE = TileStore(
+    settings.SAFERS_TILE_CACHE_DIR,
+    max_size=settings.SAFERS_TILE_CACHE_MAX_SIZE,
+)
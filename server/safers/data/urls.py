@@ -1,15 +1,25 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework import routers
 
 from safers.data.views import (
+    AsyncDataLayerMetadataView,
+    AsyncOperationalLayerView,
     OperationalLayerView,
     operational_layer_domains_view,
     on_demand_layer_domains_view,
     MapRequestViewSet,
     DataLayerMetadataView,
+    DataLayerMetadataListView,
+    LayerTimeSeriesView,
+    LayerFeatureInfoView,
+    LayerTileView,
 )
 
+# under ASGI the gateway-proxy views can be served asynchronously
+ASYNC_VIEWS = settings.SAFERS_ASYNC_PROXY_VIEWS
+
 api_router = routers.DefaultRouter()
 api_router.register(
     "data/maprequests", MapRequestViewSet, basename="map_requests"
@@ -18,7 +28,10 @@ api_urlpatterns = [
     path("", include(api_router.urls)),
     path(
         "data/layers",
-        OperationalLayerView.as_view(),
+        (
+            AsyncOperationalLayerView
+            if ASYNC_VIEWS else OperationalLayerView
+        ).as_view(),
         name="operational-layers-list",
     ),
     path(
@@ -31,11 +44,39 @@ api_urlpatterns = [
         on_demand_layer_domains_view,
         name="ondemand-layers-domains-list",
     ),
+    path(
+        "data/layers/timeseries",
+        LayerTimeSeriesView.as_view(),
+        name="data-layers-timeseries",
+    ),
+    path(
+        "data/layers/features",
+        LayerFeatureInfoView.as_view(),
+        name="data-layers-features",
+    ),
+    path(
+        "data/layers/metadata",
+        DataLayerMetadataListView.as_view(),
+        name="data-layers-metadata-list",
+    ),
     path(
         "data/layers/metadata/<slug:metadata_id>",
-        DataLayerMetadataView.as_view(),
+        (
+            AsyncDataLayerMetadataView
+            if ASYNC_VIEWS else DataLayerMetadataView
+        ).as_view(),
         name="data-layers-metadata-detail",
     ),
 ]
 
+# the (public) tile proxy only exists when it is switched on
+if settings.SAFERS_TILE_PROXY:
+    api_urlpatterns.append(
+        path(
+            "data/layers/tiles/<str:layer>/<str:time>/<int:z>/<int:x>/<int:y>.png",
+            LayerTileView.as_view(),
+            name="data-layers-tiles",
+        )
+    )
+
 urlpatterns = []
@@ -1,3 +1,6 @@
-from .views_datalayers import OperationalLayerView, operational_layer_domains_view, on_demand_layer_domains_view
-from .views_metadata import DataLayerMetadataView
+from .views_datalayers import AsyncOperationalLayerView, OperationalLayerView, operational_layer_domains_view, on_demand_layer_domains_view
+from .views_metadata import AsyncDataLayerMetadataView, DataLayerMetadataView, DataLayerMetadataListView
 from .views_maprequests import MapRequestViewSet
+from .views_timeseries import LayerTimeSeriesView
+from .views_features import LayerFeatureInfoView
+from .views_tiles import LayerTileView
@@ -0,0 +1,33 @@
+from rest_framework.exceptions import APIException
+
+from safers.core.authentication import TokenAuthentication
+
+from safers.data.caches import GATEWAY_LAYERS_CACHE
+from safers.data.serializers import LayerViewSerializer
+
+
+class LayerCatalogViewMixin(object):
+    """
+    Adds a way to get the (cached) layer catalog to views that need the
+    details of specific layers; operational layers share their catalog w/
+    OperationalLayerView, on-demand layers need their map_request_code.
+    """
+    def get_layers_data(self, map_request_code=None):
+        layers_serializer = LayerViewSerializer(
+            data={},
+            context={
+                "include_map_requests": map_request_code is not None,
+                "map_request_codes": [map_request_code]
+                                     if map_request_code else None,
+            },
+        )
+        layers_serializer.is_valid(raise_exception=True)
+
+        try:
+            return GATEWAY_LAYERS_CACHE.get_layers(
+                auth=TokenAuthentication(self.request.auth),
+                params=layers_serializer.proxy_params,
+                organization=self.request.user.organization_name,
+            )
+        except Exception as e:
+            raise APIException(e)
@@ -1,8 +1,4 @@
-from collections import OrderedDict
-from datetime import datetime
-from urllib.parse import quote_plus, urlencode, urljoin
-
-from django.conf import settings
+from asgiref.sync import sync_to_async
 
 from rest_framework import status, views
 from rest_framework.decorators import api_view, permission_classes
@@ -12,9 +8,10 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
 
 from safers.core.authentication import TokenAuthentication
-from safers.core.clients import GATEWAY_CLIENT
-from safers.core.utils import chunk
+from safers.core.views import AsyncAPIViewMixin
 
+from safers.data.caches import GATEWAY_LAYERS_CACHE
+from safers.data.layers import build_layer_tree, get_metadata_url_template, get_tile_proxy_url
 from safers.data.models import DataType
 from safers.data.serializers import LayerViewSerializer
 
@@ -120,219 +117,68 @@ class OperationalLayerView(views.APIView):
     def get(self, request, *args, **kwargs):
         """
         Returns a hierarchy of available DataLayers. 
-        Each leaf-node provides a URL paramter to retrieve the actual layer.
+        Each leaf-node provides a URL paramter to retrieve the actual layer
+        (or, if compact is True, URL templates and a list of timestamps).
         """
 
-        DATETIME_INPUT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
-        DATETIME_OUTPUT_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
-
-        GEOSERVER_WMS_URL_PATH = "/geoserver/ermes/wms"
-        GEOSERVER_WMTS_URL_PATH = "/geoserver/gwc/service/wmts"
-        METADATA_URL_PATH = "/api/data/layers/metadata"
-
-        WMS_CRS = "EPSG:4326"
-        WMTS_CRS = "EPSG:900913"
-
-        MAX_GEOSERVER_TIMES = 100  # the maximum timestamps that can be passed to GetTimeSeries at once
-
         serializer = self.serializer_class(
             data=request.query_params,
             context={"include_map_requests": False},
         )
         serializer.is_valid(raise_exception=True)
 
-        operational_layers_data = GATEWAY_CLIENT.get_layers(
+        operational_layers_data = GATEWAY_LAYERS_CACHE.get_layers(
             auth=TokenAuthentication(request.auth),
-            params=serializer.validated_data
+            params=serializer.proxy_params,
+            organization=request.user.organization_name,
         )
 
-        geoserver_layer_query_params = urlencode(
-            {
-                "time": "{time}",
-                "layer": "{name}",
-                "service": "WMTS",
-                "request": "GetTile",
-                "version": "1.0.0",
-                "transparent": True,
-                "tilematrixset": WMTS_CRS,
-                "tilematrix": WMTS_CRS + ":{{z}}",
-                "tilecol": "{{x}}",
-                "tilerow": "{{y}}",
-                "format": "image/png",
-            },
-            safe="{}",
+        return self.get_layers_response(
+            operational_layers_data, serializer.validated_data
         )
-        geoserver_layer_urls = [
-            f"{urljoin(geoserver_api_url, GEOSERVER_WMTS_URL_PATH)}?{geoserver_layer_query_params}"
-            for geoserver_api_url in settings.SAFERS_GEOSERVER_URLS
-        ]
 
-        geoserver_legend_query_params = urlencode(
-            {
-                "layer": "{name}",
-                "service": "WMS",
-                "request": "GetLegendGraphic",
-                "srs": WMS_CRS,
-                "width": 512,
-                "height": 256,
-                "format": "image/png",
-                "LEGEND_OPTIONS": "fontsize:80;dpi=72"
-            },
-            safe="{}",
-        )
-        geoserver_legend_url = f"{urljoin(settings.SAFERS_GEOSERVER_URL, GEOSERVER_WMS_URL_PATH)}?{geoserver_legend_query_params}"
+    def get_layers_response(self, operational_layers_data, validated_data):
 
-        geoserver_pixel_query_params = urlencode(
-            {
-                "service": "WMS",
-                "version": "1.1.0",
-                "request": "GetFeatureInfo",
-                "srs": WMS_CRS,
-                "info_format": "application/json",
-                "layers": "{name}",
-                "query_layers": "{name}",
-                "width": 1,
-                "height": 1,
-                "x": 1,
-                "y": 1,
-                "bbox": "{{bbox}}",
-            },
-            safe="{}",
+        data = build_layer_tree(
+            operational_layers_data,
+            get_metadata_url_template(self.request),
+            n_layers=validated_data["n_layers"],
+            compact=validated_data["compact"],
+            tile_proxy_url=get_tile_proxy_url(self.request),
         )
-        geoserver_pixel_url = f"{urljoin(settings.SAFERS_GEOSERVER_URL, GEOSERVER_WMS_URL_PATH)}?{geoserver_pixel_query_params}"
 
-        geoserver_timeseries_query_params = urlencode(
-            # this seems unintuitive, but the GetTimeseries Geoserver API uses the bbox (not x & y)
-            # to determine the region to inspect - therefore I set height & width & x & y to constants
-            # and the frontend injects a pixel-sized bbox into the query
-            {
-                "service": "WMS",
-                "version": "1.1.0",
-                "request": "GetTimeSeries",
-                "srs": WMS_CRS,
-                "format": "text/csv",
-                "styles": "raw",
-                "time": "{time}",
-                "layers": "{name}",
-                "query_layers": "{name}",
-                "width": 1,
-                "height": 1,
-                "x": 1,
-                "y": 1,
-                "bbox": "{{bbox}}",
-            },
-            safe="{}",
-        )
-        geoserver_timeseries_url = f"{urljoin(settings.SAFERS_GEOSERVER_URL, GEOSERVER_WMS_URL_PATH)}?{geoserver_timeseries_query_params}"
+        return Response(data)
 
-        metadata_url = f"{self.request.build_absolute_uri(METADATA_URL_PATH)}/{{metadata_id}}?metadata_format={{metadata_format}}"
 
-        data_type_info = {"None": None}
-        data_type_sources = {"None": None}
-        data_type_domains = {"None": None}
-        data_type_feature_strings = {"None": None}
-        data_type_opacity = {"None": None}
-        for data_type in DataType.objects.operational():
-            data_type_key = (
-                data_type.datatype_id or data_type.subgroup or data_type.group
-            ).upper()
-            data_type_info[data_type_key] = data_type.info or data_type.description  # yapf: disable
-            data_type_sources[data_type_key] = data_type.source
-            data_type_domains[data_type_key] = data_type.domain
-            data_type_feature_strings[data_type_key] = data_type.feature_string
-            data_type_opacity[data_type_key] = data_type.opacity
+class AsyncOperationalLayerView(AsyncAPIViewMixin, OperationalLayerView):
+    @extend_schema(
+        request=None,
+        responses={
+            status.HTTP_200_OK: _operational_layer_view_response,
+        }
+    )
+    async def get(self, request, *args, **kwargs):
+        """
+        Returns a hierarchy of available DataLayers. 
+        Each leaf-node provides a URL paramter to retrieve the actual layer
+        (or, if compact is True, URL templates and a list of timestamps).
+        """
 
-        data = [
-          {
-            "id": f"{i}",
-            "text": group["group"],
-            "domain": data_type_domains.get(group["group"].upper()),
-            "source": data_type_sources.get(group["group"].upper()),
-            "info": data_type_info.get(group["group"].upper()),
-            "info_url": None,
-            "children": [
-              {
-                "id": f"{i}.{j}",
-                "text": sub_group["subGroup"],
-                "domain": data_type_domains.get(sub_group["subGroup"].upper()),
-                "source": data_type_sources.get(sub_group["subGroup"].upper()),
-                "info": data_type_info.get(sub_group["subGroup"].upper()),
-                "info_url": None,
-                "children": [
-                  {
-                    "id": f"{i}.{j}.{k}",
-                    "text": layer["name"],
-                    "units": layer.get("unitOfMeasure"),
-                    "domain": data_type_domains.get(str(layer.get("dataTypeId"))),
-                    "source": data_type_sources.get(str(layer.get("dataTypeId"))),
-                    "info": data_type_info.get(str(layer.get("dataTypeId"))),
-                    "info_url": None,
-                    "children": [
-                      {
-                        "datatype_id": str(layer.get("dataTypeId")),
-                        "id": f"{i}.{j}.{k}.{l}",
-                        "title": layer["name"],
-                        "text": next(iter(detail.get("timestamps") or []), None),
-                        "units": layer.get("unitOfMeasure"),
-                        "opacity": data_type_opacity.get(str(layer.get("dataTypeId"))),
-                        "feature_string": data_type_feature_strings.get(str(layer.get("dataTypeId"))),
-                        "info": None,
-                        "info_url": metadata_url.format(
-                            metadata_id=detail.get("metadata_Id"),
-                            metadata_format="text",
-                        ),
-                        "metadata_url": metadata_url.format(
-                            metadata_id=detail.get("metadata_Id"),
-                            metadata_format="json",
-                        ),
-                        "legend_url": geoserver_legend_url.format(
-                            name=quote_plus(detail["name"]),
-                        ),
-                        "pixel_url": geoserver_pixel_url.format(
-                            name=quote_plus(detail["name"]),
-                        ),
-                        "timeseries_urls": [
-                          geoserver_timeseries_url.format(
-                            name=quote_plus(detail["name"]),
-                            time=quote_plus(",".join(timestamps_chunk)),
-                          )
-                          for timestamps_chunk in chunk(detail["timestamps"], MAX_GEOSERVER_TIMES)
-                        ] if len(detail.get("timestamps", [])) > 1 else None,
-                        "urls": OrderedDict(
-                          [
-                            (
-                                timestamp,
-                                [
-                                  url.format(
-                                    name=quote_plus(detail["name"]),
-                                    time=quote_plus(timestamp),
-                                  )
-                                  for url in geoserver_layer_urls
-                                ]
-                            )
-                            for timestamp in map(
-                              lambda x: datetime.strptime(x, DATETIME_INPUT_FORMAT).strftime(DATETIME_OUTPUT_FORMAT),
-                              detail.get("timestamps", [])
-                            )
-                          ]
-                        )
-                      }
-                      for l, detail in enumerate(
-                        sorted(layer.get("details"), key=lambda x: x.get("created_At"), reverse=True) or [],
-                        start=1
-                      )
-                      if l <= serializer.validated_data["n_layers"]
-                    ]
-                  }
-                  for k, layer in enumerate(sub_group.get("layers") or [], start=1)
-                ]
-              }
-              for j, sub_group in enumerate(group.get("subGroups") or [], start=1)
-            ]
-          } for i, group in enumerate(operational_layers_data.get("layerGroups") or [], start=1)
-        ]  # yapf: disable
+        serializer = self.serializer_class(
+            data=request.query_params,
+            context={"include_map_requests": False},
+        )
+        serializer.is_valid(raise_exception=True)
 
-        return Response(data)
+        operational_layers_data = await GATEWAY_LAYERS_CACHE.aget_layers(
+            auth=TokenAuthentication(request.auth),
+            params=serializer.proxy_params,
+            organization=request.user.organization_name,
+        )
+
+        return await sync_to_async(self.get_layers_response)(
+            operational_layers_data, serializer.validated_data
+        )
 
 
 @extend_schema(
@@ -0,0 +1,135 @@
+from rest_framework import status, views
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
+
+from safers.data.clients import GEOSERVER_CLIENT
+from safers.data.layers import DATA_TYPE_LOOKUPS, format_feature_string, index_layers_by_name
+from safers.data.models import DataType
+from safers.data.serializers import FeatureInfoViewSerializer
+from safers.data.views.views_base import LayerCatalogViewMixin
+
+###########
+# swagger #
+###########
+
+_feature_info_view_response = OpenApiResponse(
+    OpenApiTypes.OBJECT,
+    examples=[
+        OpenApiExample(
+            "valid response",
+            {
+                "ermes:33101_t2m_33001_b7aa380a-20fc-41d2-bfbc-a6ca73310f4d": {
+                    "datatype_id": "33101",
+                    "units": "°C",
+                    "value": "value of pixel: 12.3 °C",
+                    "properties": {
+                        "GRAY_INDEX": 12.3
+                    },
+                    "error": None,
+                },
+                "ermes:unknown": {
+                    "datatype_id": None,
+                    "units": None,
+                    "value": None,
+                    "properties": None,
+                    "error": "unknown layer",
+                },
+            }
+        )
+    ]
+)
+
+#########
+# views #
+#########
+
+
+class LayerFeatureInfoView(LayerCatalogViewMixin, views.APIView):
+    """
+    Returns the values of several layers at a single point, each formatted
+    w/ its DataType.feature_string.  Rather than one GetFeatureInfo request
+    per layer, layers on the same GeoServer are queried w/ a single
+    multi-layer request (see GeoServerClient.get_feature_info).  Layers that
+    cannot be queried report an error; they don't fail the whole request.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = FeatureInfoViewSerializer
+
+    @extend_schema(
+        parameters=[FeatureInfoViewSerializer],
+        responses={status.HTTP_200_OK: _feature_info_view_response},
+    )
+    def get(self, request, *args, **kwargs):
+
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        names = serializer.validated_data["layers"]
+
+        layers = index_layers_by_name(
+            self.get_layers_data(
+                serializer.validated_data.get("map_request_code")
+            ),
+            names,
+        )
+        feature_strings = self.get_feature_strings(
+            str(layer.get("dataTypeId")) for layer, _ in layers.values()
+        )
+
+        feature_collections, errors = GEOSERVER_CLIENT.get_feature_info(
+            [name for name in names if name in layers],
+            serializer.bbox,
+        )
+
+        data = {}
+        for name in names:
+            layer_data = data[name] = {
+                "datatype_id": None,
+                "units": None,
+                "value": None,
+                "properties": None,
+                "error": None,
+            }
+            if name not in layers:
+                layer_data["error"] = "unknown layer"
+                continue
+
+            layer, _ = layers[name]
+            datatype_id = str(layer.get("dataTypeId"))
+            layer_data["datatype_id"] = datatype_id
+            layer_data["units"] = layer.get("unitOfMeasure")
+            if name in errors:
+                layer_data["error"] = str(errors[name])
+                continue
+
+            feature_collection = feature_collections[name]
+            for feature in feature_collection["features"][:1]:
+                layer_data["properties"] = feature.get("properties")
+            layer_data["value"] = format_feature_string(
+                feature_strings.get(datatype_id), feature_collection
+            )
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_feature_strings(self, datatype_ids):
+        """
+        returns a dict of feature_strings keyed by datatype_id; operational
+        DataTypes are already cached, on-demand ones are looked up
+        """
+        datatype_ids = set(datatype_ids)
+        cached_feature_strings = DATA_TYPE_LOOKUPS.get()["feature_string"]
+        feature_strings = {
+            datatype_id: cached_feature_strings[datatype_id.upper()]
+            for datatype_id in datatype_ids
+            if datatype_id.upper() in cached_feature_strings
+        }
+        missing_datatype_ids = datatype_ids - feature_strings.keys()
+        if missing_datatype_ids:
+            feature_strings.update(
+                DataType.objects.filter(
+                    datatype_id__in=missing_datatype_ids
+                ).values_list("datatype_id", "feature_string")
+            )
+        return feature_strings
@@ -1,8 +1,3 @@
-from collections import OrderedDict, defaultdict
-from datetime import datetime
-from urllib.parse import quote_plus, urlencode, urljoin
-
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils.decorators import method_decorator
 
@@ -15,10 +10,9 @@ from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
 from silk.profiling.profiler import silk_profile
 
 from safers.core.decorators import swagger_fake
-from safers.core.clients import GATEWAY_CLIENT
-
-from safers.core.utils import chunk
 
+from safers.data.caches import GATEWAY_LAYERS_CACHE
+from safers.data.layers import get_metadata_url_template, get_tile_proxy_url, index_layer_details
 from safers.data.models import MapRequest, DataType
 from safers.data.permissions import IsReadOnlyOrOwner
 from safers.data.serializers import LayerViewSerializer, MapRequestSerializer
@@ -151,18 +145,7 @@ class MapRequestViewSet(
     permission_classes = [IsAuthenticated, IsReadOnlyOrOwner]
     serializer_class = MapRequestSerializer
 
-    DATETIME_INPUT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
-    DATETIME_OUTPUT_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
-
     GATEWAY_URL_PATH = "/api/services/app/Layers/GetLayers"
-    GEOSERVER_WMS_URL_PATH = "/geoserver/ermes/wms"
-    GEOSERVER_WMTS_URL_PATH = "/geoserver/gwc/service/wmts"
-    METADATA_URL_PATH = "/api/data/layers/metadata"
-
-    MAX_GEOSERVER_TIMES = 100  # the maximum timestamps that can be passed to GetTimeSeries at once
-
-    WMS_CRS = "EPSG:4326"
-    WMTS_CRS = "EPSG:900913"
 
     @swagger_fake(MapRequest.objects.none())
     def get_queryset(self):
@@ -216,89 +199,7 @@ class MapRequestViewSet(
         """
 
         queryset = self.get_queryset()
-        map_requests = {
-            map_request_data["request_id"]: map_request_data
-            for map_request_data in queryset.values()
-        }  # dict of map_request_data keyed by request_id
-
-        geoserver_layer_query_params = urlencode(
-            {
-                "time": "{time}",
-                "layer": "{name}",
-                "service": "WMTS",
-                "request": "GetTile",
-                "version": "1.0.0",
-                "transparent": True,
-                "tilematrixset": self.WMTS_CRS,
-                "tilematrix": self.WMTS_CRS + ":{{z}}",
-                "tilecol": "{{x}}",
-                "tilerow": "{{y}}",
-                "format": "image/png",
-            },
-            safe="{}",
-        )
-        geoserver_layer_urls = [
-            f"{urljoin(geoserver_api_url, self.GEOSERVER_WMTS_URL_PATH)}?{geoserver_layer_query_params}"
-            for geoserver_api_url in settings.SAFERS_GEOSERVER_URLS
-        ]
-
-        geoserver_legend_query_params = urlencode(
-            {
-                "layer": "{name}",
-                "service": "WMS",
-                "request": "GetLegendGraphic",
-                "srs": self.WMS_CRS,
-                "width": 512,
-                "height": 256,
-                "format": "image/png",
-                "LEGEND_OPTIONS": "fontsize:80;dpi=72"
-            },
-            safe="{}",
-        )
-        geoserver_legend_url = f"{urljoin(settings.SAFERS_GEOSERVER_URL, self.GEOSERVER_WMS_URL_PATH)}?{geoserver_legend_query_params}"
-
-        geoserver_pixel_query_params = urlencode(
-            {
-                "service": "WMS",
-                "version": "1.1.0",
-                "request": "GetFeatureInfo",
-                "srs": self.WMS_CRS,
-                "info_format": "application/json",
-                "layers": "{name}",
-                "query_layers": "{name}",
-                "width": 1,
-                "height": 1,
-                "x": 1,
-                "y": 1,
-                "bbox": "{{bbox}}",
-            },
-            safe="{}",
-        )
-        geoserver_pixel_url = f"{urljoin(settings.SAFERS_GEOSERVER_URL, self.GEOSERVER_WMS_URL_PATH)}?{geoserver_pixel_query_params}"
-
-        geoserver_timeseries_query_params = urlencode(
-            {
-                "service": "WMS",
-                "version": "1.1.0",
-                "request": "GetTimeSeries",
-                "srs": self.WMS_CRS,
-                "format":
-                    "text/csv",  # "image/png" or "image/jpg" or "text/csv"
-                "styles": "raw",
-                "time": "{time}",
-                "layers": "{name}",
-                "query_layers": "{name}",
-                "width": 1,
-                "height": 1,
-                "x": 1,
-                "y": 1,
-                "bbox": "{{bbox}}",
-            },
-            safe="{}",
-        )
-        geoserver_timeseries_url = f"{urljoin(settings.SAFERS_GEOSERVER_URL, self.GEOSERVER_WMS_URL_PATH)}?{geoserver_timeseries_query_params}"
-
-        metadata_url = f"{self.request.build_absolute_uri(self.METADATA_URL_PATH)}/{{metadata_id}}?metadata_format={{metadata_format}}"
+        request_ids = set(queryset.values_list("request_id", flat=True))
 
         view_serializer = LayerViewSerializer(
             data=request.query_params,
@@ -307,63 +208,26 @@ class MapRequestViewSet(
                     True,
                 "map_request_codes": [
                     f"{RMQ_USER}.{request_id}"
-                    for request_id in map_requests.keys()
+                    for request_id in request_ids
                 ],
             }
         )
         view_serializer.is_valid(raise_exception=True)
 
-        on_demand_layers_data = GATEWAY_CLIENT.get_layers(
+        on_demand_layers_data = GATEWAY_LAYERS_CACHE.get_layers(
             auth=TokenAuthentication(request.auth),
-            params=view_serializer.validated_data
+            params=view_serializer.proxy_params,
+            organization=request.user.organization_name,
         )
 
         # proxy_details is a dict of dicts: "request_id" followed by "data_type_id"
         # it is passed as context to the serializer below to add links, etc. to the model_serializer data
-        proxy_details = defaultdict(dict)
-        for group in on_demand_layers_data.get("layerGroups") or []:
-            for sub_group in group.get("subGroups") or []:
-                for layer in sub_group.get("layers") or []:
-                    for detail in layer.get("details") or []:
-                        request_id = detail.get("mapRequestCode")
-                        map_request = map_requests.get(request_id)
-                        if map_request is not None:
-                            data_type_id = str(layer["dataTypeId"])
-                            proxy_details[request_id].update({
-                                data_type_id: {
-                                    "units": layer.get("unitOfMeasure"),
-                                    "info_url": metadata_url.format(metadata_id=detail.get("metadata_Id"), metadata_format="text"),
-                                    "metadata_url": metadata_url.format(metadata_id=detail.get("metadata_Id"), metadata_format="json"),
-                                    "legend_url": geoserver_legend_url.format(name=quote_plus(detail["name"])),
-                                    "pixel_url": geoserver_pixel_url.format(name=quote_plus(detail["name"])),
-                                    "timeseries_urls": [
-                                        geoserver_timeseries_url.format(
-                                            name=quote_plus(detail["name"]),
-                                            time=quote_plus(",".join(timestamps_chunk)),
-                                        )
-                                        for timestamps_chunk in chunk(detail["timestamps"], self.MAX_GEOSERVER_TIMES)
-                                    ] if len(detail.get("timestamps", [])) > 1 else None,
-                                    "urls": OrderedDict(
-                                            [
-                                                (
-                                                    timestamp,
-                                                    [
-                                                    url.format(
-                                                        name=quote_plus(detail["name"]),
-                                                        time=quote_plus(timestamp),
-                                                        bbox=quote_plus(map_request["geometry_buffered_extent_str"]),
-                                                    )
-                                                    for url in geoserver_layer_urls
-                                                    ]
-                                                )
-                                                for timestamp in map(
-                                                    lambda x: datetime.strptime(x, self.DATETIME_INPUT_FORMAT).strftime(self.DATETIME_OUTPUT_FORMAT),
-                                                    detail.get("timestamps", [])
-                                                )
-                                            ]
-                                        )
-                                }
-                            })  # yapf: disable
+        proxy_details = index_layer_details(
+            on_demand_layers_data,
+            request_ids,
+            get_metadata_url_template(self.request),
+            tile_proxy_url=get_tile_proxy_url(self.request),
+        )
 
         model_serializer = self.get_serializer(
             queryset,
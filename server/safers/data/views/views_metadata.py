@@ -1,7 +1,4 @@
-import requests
-from urllib.parse import urljoin
-
-from django.conf import settings
+import re
 
 from rest_framework import status, views
 from rest_framework.exceptions import APIException, ValidationError
@@ -11,76 +8,224 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, OpenApiTypes, OpenApiExample
 
 from safers.core.authentication import TokenAuthentication
+from safers.core.views import AsyncAPIViewMixin
+
+from safers.data.caches import METADATA_CACHE
 
 METADATA_FORMAT_TYPES = ["json", "text"]
 
+METADATA_ID_REGEX = re.compile(r"^[-a-zA-Z0-9_]+$")
+
+###########
+# swagger #
+###########
+
+_metadata_view_parameters = [
+    OpenApiParameter(
+        "metadata_format",
+        location="query",
+        description="The type of metadata to return.",
+        enum=METADATA_FORMAT_TYPES,
+        default="json",
+        required=False,
+    )
+]
+
+_metadata_view_response = OpenApiResponse(
+    OpenApiTypes.ANY,
+    examples=[
+        OpenApiExample(
+            "json response",
+            {
+                "key1": "value1",
+                "key2": "value2",
+                "keyN": "valueN",
+            }
+        ),
+        OpenApiExample("text response", "string")
+    ]
+)
+
+_metadata_list_view_parameters = [
+    OpenApiParameter(
+        "metadata_ids",
+        location="query",
+        description="The ids of the metadata to return (either repeated or comma-separated).",
+        type={"type": "array", "items": {"type": "string"}},
+        explode=True,
+        required=True,
+    ),
+] + _metadata_view_parameters
+
+_metadata_list_view_response = OpenApiResponse(
+    OpenApiTypes.OBJECT,
+    examples=[
+        OpenApiExample(
+            "json response",
+            {
+                "metadata": {
+                    "metadata_id1": {
+                        "key1": "value1",
+                        "keyN": "valueN",
+                    },
+                    "metadata_id2": {
+                        "key1": "value1",
+                        "keyN": "valueN",
+                    },
+                },
+                "errors": {
+                    "metadata_idN": "error message",
+                },
+            }
+        ),
+    ]
+)
+
+#########
+# views #
+#########
+
 
 class DataLayerMetadataView(views.APIView):
 
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
-        parameters=[
-            OpenApiParameter(
-                "metadata_format",
-                location="query",
-                description="The type of metadata to return.",
-                enum=METADATA_FORMAT_TYPES,
-                default="json",
-                required=False,
-            )
-        ],
-        responses={
-            status.HTTP_200_OK:
-                OpenApiResponse(
-                    OpenApiTypes.ANY,
-                    examples=[
-                        OpenApiExample(
-                            "json response",
-                            {
-                                "key1": "value1",
-                                "key2": "value2",
-                                "keyN": "valueN",
-                            }
-                        ),
-                        OpenApiExample("text response", "string")
-                    ]
-                ),
-        }
+        parameters=_metadata_view_parameters,
+        responses={status.HTTP_200_OK: _metadata_view_response},
     )
     def get(self, request, *args, **kwargs):
         """
         get metadata for a specific data layer
         """
 
-        GATEWAY_URL_PATH = "/api/services/app/Layers/GetMetadata"
+        metadata_format = self.get_metadata_format()
 
         try:
-            response = requests.get(
-                urljoin(settings.SAFERS_GATEWAY_URL, GATEWAY_URL_PATH),
+            metadata = METADATA_CACHE.get(
+                self.kwargs["metadata_id"],
                 auth=TokenAuthentication(request.auth),
-                params={"MetadataId": self.kwargs["metadata_id"]},
+                organization=request.user.organization_name,
             )
-            response.raise_for_status()
         except Exception as e:
             raise APIException(e)
 
-        metadata = response.json()
+        return Response(
+            data=self.format_metadata(metadata, metadata_format),
+            status=status.HTTP_200_OK,
+        )
 
+    def get_metadata_format(self):
         metadata_format = self.request.query_params.get(
             "metadata_format", "json"
-        )
-        if metadata_format.lower() == "json":
-            data = metadata
-        elif metadata_format.lower() == "text":
-            data = metadata.get("notes") or metadata.get("title")
-        else:
+        ).lower()
+        if metadata_format not in METADATA_FORMAT_TYPES:
             raise ValidationError({
                 "metadata_format":
                     f"must be one of {', '.join(METADATA_FORMAT_TYPES)}"
             })
+        return metadata_format
+
+    @staticmethod
+    def format_metadata(metadata, metadata_format):
+        if metadata_format == "text":
+            return metadata.get("notes") or metadata.get("title")
+        return metadata
+
+
+class AsyncDataLayerMetadataView(AsyncAPIViewMixin, DataLayerMetadataView):
+    @extend_schema(
+        parameters=_metadata_view_parameters,
+        responses={status.HTTP_200_OK: _metadata_view_response},
+    )
+    async def get(self, request, *args, **kwargs):
+        """
+        get metadata for a specific data layer
+        """
+
+        metadata_format = self.get_metadata_format()
+
+        try:
+            metadata = await METADATA_CACHE.aget(
+                self.kwargs["metadata_id"],
+                auth=TokenAuthentication(request.auth),
+                organization=request.user.organization_name,
+            )
+        except Exception as e:
+            raise APIException(e)
+
+        return Response(
+            data=self.format_metadata(metadata, metadata_format),
+            status=status.HTTP_200_OK,
+        )
+
+
+class DataLayerMetadataListView(DataLayerMetadataView):
 
-        return Response(data=data, status=status.HTTP_200_OK)
+    MAX_METADATA_IDS = 100
+
+    @extend_schema(
+        parameters=_metadata_list_view_parameters,
+        responses={status.HTTP_200_OK: _metadata_list_view_response},
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        get metadata for several data layers at once; any metadata that is
+        not already cached is fetched concurrently, and metadata that cannot
+        be fetched is reported in "errors"
+        """
+
+        metadata_format = self.get_metadata_format()
+        metadata_ids = self.get_metadata_ids()
+
+        metadata, errors = METADATA_CACHE.get_many(
+            metadata_ids,
+            auth=TokenAuthentication(request.auth),
+            organization=request.user.organization_name,
+        )
+        if errors and not metadata:
+            raise APIException(next(iter(errors.values())))
+
+        return Response(
+            data={
+                "metadata": {
+                    metadata_id: self.format_metadata(data, metadata_format)
+                    for metadata_id, data in metadata.items()
+                },
+                "errors": {
+                    metadata_id: str(error)
+                    for metadata_id, error in errors.items()
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def get_metadata_ids(self):
+        metadata_ids = list(
+            dict.fromkeys(
+                metadata_id.strip()
+                for value in self.request.query_params.getlist("metadata_ids")
+                for metadata_id in value.split(",")
+                if metadata_id.strip()
+            )
+        )
+        if not metadata_ids:
+            raise ValidationError({"metadata_ids": "this field is required"})
+        if len(metadata_ids) > self.MAX_METADATA_IDS:
+            raise ValidationError({
+                "metadata_ids":
+                    f"no more than {self.MAX_METADATA_IDS} ids can be requested at once"
+            })
+        invalid_metadata_ids = [
+            metadata_id for metadata_id in metadata_ids
+            if not METADATA_ID_REGEX.match(metadata_id)
+        ]
+        if invalid_metadata_ids:
+            raise ValidationError({
+                "metadata_ids":
+                    f"invalid ids: {', '.join(invalid_metadata_ids)}"
+            })
+        return metadata_ids
 
 
 """
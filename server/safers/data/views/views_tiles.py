@@ -0,0 +1,101 @@
+import re
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from requests.exceptions import HTTPError
+
+from rest_framework import status, views
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.permissions import AllowAny
+
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiTypes
+
+from safers.data.clients import GEOSERVER_CLIENT
+from safers.data.tiles import TILE_STORE
+
+LAYER_NAME_REGEX = re.compile(r"(?P<workspace>[\w.-]+):[\w.-]+")
+TIME_REGEX = re.compile(r"[\dTZ:.+-]{1,32}")
+MAX_ZOOM = 30
+
+###########
+# swagger #
+###########
+
+_tile_view_response = OpenApiResponse(
+    OpenApiTypes.BINARY, description="a png tile"
+)
+
+#########
+# views #
+#########
+
+
+class LayerTileView(views.APIView):
+    """
+    Serves WMTS tiles from the local tile store, fetching any missing tiles
+    from GeoServer (see TileStore).  Tiles are requested by map libraries
+    which cannot add the Authorization header, and GeoServer itself is
+    public, so this view is public too.  A (layer, time) tile never changes,
+    so clients may cache it.  Only layers in SAFERS_TILE_PROXY_WORKSPACES
+    can be requested, so that the view cannot be used to proxy (and fill
+    the store with) arbitrary GeoServer content.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    max_age = 24 * 60 * 60
+
+    @extend_schema(responses={status.HTTP_200_OK: _tile_view_response})
+    def get(self, request, *args, **kwargs):
+
+        if not settings.SAFERS_TILE_PROXY:
+            raise NotFound()
+
+        layer, time, z, x, y = self.get_tile_args()
+        key = TILE_STORE.get_key(layer, time, z, x, y)
+
+        try:
+            content = TILE_STORE.get_or_fetch(
+                key,
+                GEOSERVER_CLIENT.get_tile,
+                layer,
+                time,
+                z,
+                x,
+                y,
+                geoserver_url=self.get_geoserver_url(key),
+            )
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == status.HTTP_404_NOT_FOUND:  # yapf: disable
+                raise NotFound()
+            raise APIException(e)
+        except Exception as e:
+            raise APIException(e)
+
+        response = HttpResponse(content, content_type="image/png")
+        response["Cache-Control"] = f"public, max-age={self.max_age}"
+        return response
+
+    def get_tile_args(self):
+        layer = self.kwargs["layer"]
+        time = self.kwargs["time"]
+        z, x, y = self.kwargs["z"], self.kwargs["x"], self.kwargs["y"]
+        layer_match = LAYER_NAME_REGEX.fullmatch(layer)
+        if not layer_match:
+            raise ValidationError({"layer": "invalid layer name"})
+        if layer_match["workspace"] not in settings.SAFERS_TILE_PROXY_WORKSPACES:  # yapf: disable
+            raise NotFound()
+        if not TIME_REGEX.fullmatch(time):
+            raise ValidationError({"time": "invalid time"})
+        if z > MAX_ZOOM or x >= 2**z or y >= 2**z:
+            raise ValidationError("invalid tile")
+        return layer, time, z, x, y
+
+    @staticmethod
+    def get_geoserver_url(key):
+        # spread tiles across GeoServers (consistently, so that each tile is
+        # always rendered by - and cached in - the same GeoServer)
+        geoserver_urls = settings.SAFERS_GEOSERVER_URLS
+        return geoserver_urls[int(key[:8], 16) % len(geoserver_urls)]
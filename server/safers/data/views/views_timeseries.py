@@ -0,0 +1,128 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+
+from rest_framework import status, views
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.permissions import IsAuthenticated
+
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
+
+from safers.data.clients import GEOSERVER_CLIENT
+from safers.data.layers import DATETIME_OUTPUT_FORMAT, format_timestamps, get_layer_timestamps
+from safers.data.serializers import TimeSeriesViewSerializer
+from safers.data.views.views_base import LayerCatalogViewMixin
+
+###########
+# swagger #
+###########
+
+_timeseries_view_response = OpenApiResponse(
+    OpenApiTypes.STR,
+    examples=[
+        OpenApiExample(
+            "valid response",
+            "# Latitude: 40.4\n"
+            "# Longitude: -3.7\n"
+            "Time (UTC),Temperature (K)\n"
+            "2022-04-05T01:00:00.000Z,285.1\n"
+            "2022-04-05T02:00:00.000Z,284.7\n",
+        )
+    ]
+)
+
+#########
+# views #
+#########
+
+
+class LayerTimeSeriesView(LayerCatalogViewMixin, views.APIView):
+    """
+    Returns the values of a layer at a single (pixel-sized) bbox over a time
+    range as one CSV.  GeoServer limits the number of times per GetTimeSeries
+    request, so the layer's timestamps are split into chunks which are
+    requested concurrently and then merged as they are streamed back to the
+    client.  Results are cached (in the shared cache) per layer, bbox &
+    timestamps.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = TimeSeriesViewSerializer
+
+    cache_key_prefix = "layer-timeseries"
+
+    @extend_schema(
+        parameters=[TimeSeriesViewSerializer],
+        responses={status.HTTP_200_OK: _timeseries_view_response},
+    )
+    def get(self, request, *args, **kwargs):
+
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        layer = serializer.validated_data["layer"]
+        bbox = serializer.validated_data["bbox"]
+
+        times = self.get_times(
+            layer,
+            serializer.validated_data.get("start"),
+            serializer.validated_data.get("end"),
+            serializer.validated_data.get("map_request_code"),
+        )
+
+        cache_key = self.get_cache_key(layer, bbox, times)
+        content = cache.get(cache_key)
+        if content is not None:
+            return HttpResponse(content, content_type="text/csv")
+
+        try:
+            lines = GEOSERVER_CLIENT.get_timeseries(layer, bbox, times)
+        except Exception as e:
+            raise APIException(e)
+
+        return StreamingHttpResponse(
+            self.stream_and_cache(cache_key, lines), content_type="text/csv"
+        )
+
+    def stream_and_cache(self, cache_key, lines):
+        """
+        yields the CSV as it is merged and caches it once it is complete (an
+        interrupted stream is not cached)
+        """
+        content = []
+        for line in lines:
+            line = f"{line}\n"
+            content.append(line)
+            yield line
+        cache.set(
+            cache_key,
+            "".join(content),
+            timeout=settings.SAFERS_TIMESERIES_CACHE_TIMEOUT,
+        )
+
+    def get_times(self, layer, start, end, map_request_code):
+        """
+        returns the layer's timestamps (from the layer catalog) between start
+        & end
+        """
+        layers_data = self.get_layers_data(map_request_code)
+
+        timestamps = get_layer_timestamps(layers_data, layer)
+        if timestamps is None:
+            raise NotFound(f"unknown layer: {layer}")
+
+        # (the formatted timestamps can be compared as strings)
+        start = start.strftime(DATETIME_OUTPUT_FORMAT) if start else None
+        end = end.strftime(DATETIME_OUTPUT_FORMAT) if end else None
+        return [
+            timestamp for timestamp, formatted_timestamp in
+            zip(timestamps, format_timestamps(timestamps))
+            if (start is None or formatted_timestamp >= start) and
+            (end is None or formatted_timestamp <= end)
+        ]
+
+    def get_cache_key(self, layer, bbox, times):
+        key = hashlib.sha256(json.dumps([layer, bbox, times]).encode())
+        return f"{self.cache_key_prefix}-{key.hexdigest()}"
@@ -155,10 +155,7 @@ class Event(gis_models.Model):
         ).envelope if geometry_collection.envelope.geom_type == "Point" else geometry_collection.envelope
         self.center = geometry_collection.centroid
 
-        self.country = Country.objects.filter(
-            # geometry__intersects=self.geometry_collection  # TODO: if geometry_collection is malformed can potentially get "GEOSIntersects: TopologyException: side location conflict"
-            geometry__intersects=self.center
-        ).first()
+        self.country = Country.objects.country_for_point(self.center)
 
         if force_save:
             self.save()
@@ -19,7 +19,9 @@ from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema, extend_schema_field, OpenApiTypes
 
 from safers.core.decorators import swagger_fake
+from safers.core.generics import GeoJSONStreamListModelMixin
 from safers.core.filters import DefaultFilterSetMixin, MultiFieldOrderingFilter
+from safers.core.pagination import FavoriteKeysetPagination
 
 from safers.events.models import Event, EventStatusChoices
 from safers.events.serializers import EventSerializer
@@ -35,7 +37,9 @@ class EventFilterSet(DefaultFilterSetMixin, filters.FilterSet):
         fields = {}
 
     order = MultiFieldOrderingFilter(
-        fields=(("start_date", "date"), ), multi_fields=["-favorite"]
+        fields=(("start_date", "date"), ),
+        multi_fields=["-favorite"],
+        default=["-date"],
     )
 
     status = filters.MultipleChoiceFilter(
@@ -116,12 +120,22 @@ class EventFilterSet(DefaultFilterSetMixin, filters.FilterSet):
         return super().filter_queryset(queryset)
 
 
+##############
+# pagination #
+##############
+
+
+class EventPagination(FavoriteKeysetPagination):
+    keyset_field = "start_date"
+
+
 #########
 # views #
 #########
 
 
 class EventViewSet(
+    GeoJSONStreamListModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -129,6 +143,7 @@ class EventViewSet(
 ):
     filter_backends = (filters.DjangoFilterBackend, )
     filterset_class = EventFilterSet
+    pagination_class = EventPagination
 
     lookup_field = "id"
     lookup_url_kwarg = "event_id"
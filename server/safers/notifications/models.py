@@ -4,12 +4,10 @@ from django.contrib.postgres.fields import ArrayField
 from django.db import models, transaction
 from django.db.models import Q
 from django.contrib.gis.db import models as gis_models
-from django.contrib.gis.geos import GeometryCollection
 from django.utils.translation import gettext_lazy as _
 
 from safers.core.mixins import HashableMixin
-from safers.core.models import Country
-from safers.core.utils import CaseInsensitiveTextChoices, cap_area_to_geojson
+from safers.core.utils import CaseInsensitiveTextChoices, aggregate_geometries, cap_area_to_geojson
 from safers.rmq.exceptions import RMQException
 
 # NOTIFICATIONS COME FROM THE SEMANTIC-REASONING-MODULE
@@ -204,28 +202,12 @@ class Notification(models.Model):
         """
         called by signal hander in response to one of the NotificationGeometries having their geometry updated
         """
-        geometries_geometries = self.geometries.values(
-            "geometry", "bounding_box", "center"
-        )
-
-        self.geometry_collection = GeometryCollection(
-            *geometries_geometries.values_list("geometry", flat=True)
-        )
-        self.center = GeometryCollection(
-            *geometries_geometries.values_list("center", flat=True)
-        ).centroid
-        self.bounding_box = GeometryCollection(
-            *geometries_geometries.values_list("bounding_box", flat=True)
-        ).envelope
-
-        country = Country.objects.filter(
-            # geometry__intersects=self.geometry_collection  # TODO: if geometry_collection is malformed can potentially get "GEOSIntersects: TopologyException: side location conflict"
-            geometry__intersects=self.center
-        ).first()
-        self.country = country.admin_name if country else None
+        values = aggregate_geometries(self.geometries, country_field="country")
+        for attr, value in values.items():
+            setattr(self, attr, value)
 
         if force_save:
-            self.save()
+            self.save(update_fields=[*values, "modified"])
 
     @classmethod
     def process_message(cls, message_body, **kwargs):
@@ -3,6 +3,8 @@ from rest_framework_gis import serializers as gis_serializers
 
 from drf_spectacular.utils import extend_schema_field
 
+from safers.core.signals import GeometryRecalculationScope
+
 from safers.notifications.models import Notification, NotificationGeometry
 
 
@@ -67,9 +69,11 @@ class NotificationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         geometries_data = validated_data.pop("geometries", {})
         notification = super().create(validated_data)
-        for geometry_data in geometries_data:
-            notification_geometry = NotificationGeometry(
-                **geometry_data, notification=notification
-            )
-            notification_geometry.save()
+        with GeometryRecalculationScope():
+            # recalculate the notification geometries once, rather than once per NotificationGeometry
+            for geometry_data in geometries_data:
+                notification_geometry = NotificationGeometry(
+                    **geometry_data, notification=notification
+                )
+                notification_geometry.save()
         return notification
@@ -17,7 +17,9 @@ from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema, extend_schema_field, OpenApiResponse, OpenApiTypes, OpenApiExample
 
 from safers.core.decorators import swagger_fake
-from safers.core.filters import DefaultFilterSetMixin, CaseInsensitiveChoiceFilter
+from safers.core.generics import GeoJSONStreamListModelMixin
+from safers.core.filters import DefaultFilterSetMixin, CaseInsensitiveChoiceFilter, MultiFieldOrderingFilter
+from safers.core.pagination import FavoriteKeysetPagination
 
 from safers.notifications.models import Notification, NotificationSourceChoices, NotificationTypeChoices, NotificationScopeChoices, NotificationRestrictionChoices
 from safers.notifications.serializers import NotificationSerializer
@@ -36,7 +38,9 @@ class NotificationFilterSet(DefaultFilterSetMixin, filters.FilterSet):
             "event",
         }
 
-    order = filters.OrderingFilter(fields=(("timestamp", "date"), ))
+    order = MultiFieldOrderingFilter(
+        fields=(("timestamp", "date"), ), default=["-date"]
+    )
 
     source = CaseInsensitiveChoiceFilter(
         choices=NotificationSourceChoices.choices
@@ -128,10 +132,13 @@ class NotificationFilterSet(DefaultFilterSetMixin, filters.FilterSet):
         return super().filter_queryset(queryset)
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(
+    GeoJSONStreamListModelMixin, viewsets.ReadOnlyModelViewSet
+):
 
     filter_backends = (filters.DjangoFilterBackend, )
     filterset_class = NotificationFilterSet
+    pagination_class = FavoriteKeysetPagination
 
     lookup_field = "id"
     lookup_url_kwarg = "notification_id"
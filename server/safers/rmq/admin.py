@@ -1,5 +1,4 @@
 import json
-import re
 
 from django.contrib import admin, messages
 from django.db.models import JSONField
@@ -8,7 +7,7 @@ from rest_framework.utils.encoders import JSONEncoder
 
 from safers.core.admin import JSONAdminWidget
 
-from .rmq import RMQ, BINDING_KEYS, binding_key_to_regex
+from .rmq import RMQ, ROUTING_TABLE
 from .models import Message
 
 
@@ -77,10 +76,6 @@ class MessageAdmin(admin.ModelAdmin):
             msg = f"sent message '{message_name_or_id}' to queue"
             self.message_user(request, msg, messages.INFO)
 
-            unhandled_method = True
-            for pattern, handlers in BINDING_KEYS.items():
-                if re.match(binding_key_to_regex(pattern), message.routing_key):
-                    unhandled_method = False
-            if unhandled_method:
+            if not ROUTING_TABLE.is_bound(message.routing_key):
                 msg = f"message '{message_name_or_id}' with routing_key '{message.routing_key}' will not be received by Dashbaord."
                 self.message_user(request, msg, messages.WARNING)
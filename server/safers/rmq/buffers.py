@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBatch(object):
+    def __init__(self):
+        self.message_bodies = []
+        self.deadline = None
+        self.results = None
+        self.exception = None
+        self.processed = threading.Event()
+
+
+class MessageBuffer(object):
+    """
+    Collects messages from concurrent consumers into batches so that they can be
+    processed in bulk.  A batch is processed once it has max_size messages or
+    once max_wait seconds have passed since its first message was added.
+
+    `add` blocks until the batch containing the message has been processed and
+    returns the result for that message (or raises the exception that the batch
+    raised, or that process_batch returned as the result for that message, so
+    that one bad message need not fail its whole batch); this means that a consumer only acknowledges a message once it has
+    actually been committed.  Batches can only contain more than one message if
+    there are several consumers (ie: DJANGO_RMQ_WORKERS > 1).
+    """
+    def __init__(self, process_batch, max_size=100, max_wait=1.0):
+        """
+        process_batch is a callable which takes a list of message bodies and
+        returns a list of results (one per message body); a result can be an
+        exception, which is raised for that message only
+        """
+        assert max_size >= 1
+        self.process_batch = process_batch
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.batch = MessageBatch()
+
+    def _take_batch(self):
+        # (must be called while holding self.lock)
+        batch = self.batch
+        self.batch = MessageBatch()
+        return batch
+
+    def _process(self, batch):
+        try:
+            batch.results = self.process_batch(batch.message_bodies)
+        except Exception as e:
+            batch.exception = e
+        finally:
+            batch.processed.set()
+
+    def add(self, message_body, **kwargs):
+
+        with self.lock:
+            batch = self.batch
+            index = len(batch.message_bodies)
+            batch.message_bodies.append(message_body)
+            if index == 0:
+                batch.deadline = time.monotonic() + self.max_wait
+            is_full = len(batch.message_bodies) >= self.max_size
+            if is_full:
+                self._take_batch()
+
+        if is_full:
+            self._process(batch)
+
+        elif not batch.processed.wait(
+            timeout=max(0, batch.deadline - time.monotonic())
+        ):
+            # the batch has not filled up in time; the 1st consumer to get here
+            # processes it, everybody else waits for that to finish
+            with self.lock:
+                is_owner = self.batch is batch
+                if is_owner:
+                    self._take_batch()
+            if is_owner:
+                self._process(batch)
+            else:
+                batch.processed.wait()
+
+        if batch.exception is not None:
+            raise batch.exception
+
+        result = batch.results[index]
+        if isinstance(result, Exception):
+            raise result
+
+        return result
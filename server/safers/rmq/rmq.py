@@ -1,13 +1,19 @@
 import json
+import os
 import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache, partial
 
 from django.conf import settings
+from django.db import close_old_connections
 
 import pika
+from pika.exceptions import AMQPError
 from pika.frame import Method
 from pika import BasicProperties
 
@@ -23,19 +29,28 @@ RMQ_USER = "astro"
 
 BINDING_KEYS = {
     # a map of routing_key patterns to handlers
-    f"alert.sem.{RMQ_USER}": ("safers.alerts.models.Alert", ),
+    f"alert.sem.{RMQ_USER}": ("safers.alerts.utils.process_messages", ),
     "event.camera.#": ("safers.cameras.utils.process_messages", ),
     "event.social.wildfire": ("safers.social.models.SocialEvent", ),
     # "mm.communication.*": ("safers.chatbot.models.Communication",),
     # "mm.mission.*": ("safers.chatbot.models.Mission",),
     # "mm.report.*": ("safers.chatbot.models.Report", ),
-    # "newexternaldata.*": ("safers.data.models.Data", ),
+    "newexternaldata.*": ("safers.data.caches.invalidate_layers_cache", ),
     f"notification.sem.{RMQ_USER}": (
         "safers.notifications.models.Notification",
     ),  # TODO: WHY DO I HAVE TO HARD-CODE THE APP_ID FOR THE NEXT 3 KEYS (INSTEAD OF USING "*") ?
-    f"status.brn.*.{RMQ_USER}.#": ("safers.data.models.MapRequest", ),
-    f"status.pwm.*.{RMQ_USER}.#": ("safers.data.models.MapRequest", ),
-    f"status.propagator.*.{RMQ_USER}.#": ("safers.data.models.MapRequest", ),
+    f"status.brn.*.{RMQ_USER}.#": (
+        "safers.data.models.MapRequest",
+        "safers.data.caches.invalidate_layers_cache",
+    ),
+    f"status.pwm.*.{RMQ_USER}.#": (
+        "safers.data.models.MapRequest",
+        "safers.data.caches.invalidate_layers_cache",
+    ),
+    f"status.propagator.*.{RMQ_USER}.#": (
+        "safers.data.models.MapRequest",
+        "safers.data.caches.invalidate_layers_cache",
+    ),
     "status.test.*": (),
 }
 
@@ -69,6 +84,82 @@ def import_callable(path_or_callable):
     return getattr(callable, "process_message")
 
 
+class RoutingTable(object):
+    """
+    Compiled version of a routing table (like BINDING_KEYS).  The binding_key
+    patterns are compiled into regexes once, the handlers are imported once,
+    and the result of matching a routing_key is cached; this avoids rebuilding
+    regexes and re-importing handlers for every message that is received.
+    """
+
+    ROUTING_KEY_CACHE_SIZE = 1024  # (status.* routing_keys include a request_id, so the cache must be bounded)
+
+    def __init__(self, binding_keys):
+        self.binding_keys = binding_keys
+        self.patterns = [
+            (re.compile(binding_key_to_regex(binding_key)), binding_key)
+            for binding_key in binding_keys.keys()
+        ]
+        self._handlers = {}
+        self._lookup = lru_cache(maxsize=self.ROUTING_KEY_CACHE_SIZE)(
+            self._match
+        )
+
+    def get_handlers(self, binding_key):
+        """
+        returns the callables for binding_key, importing them the first time
+        they are needed (they cannot be imported when this module is loaded
+        b/c the models which define handlers themselves import this module)
+        """
+        handlers = self._handlers.get(binding_key)
+        if handlers is None:
+            handlers = tuple(
+                map(import_callable, self.binding_keys[binding_key])
+            )
+            self._handlers[binding_key] = handlers
+        return handlers
+
+    def load(self):
+        """
+        imports all handlers up-front (ie: when starting a consumer)
+        """
+        for binding_key in self.binding_keys.keys():
+            self.get_handlers(binding_key)
+
+    def _match(self, routing_key):
+        return tuple(
+            binding_key for regex, binding_key in self.patterns
+            if regex.match(routing_key)
+        )
+
+    def match(self, routing_key):
+        """
+        returns the binding_keys that routing_key matches
+        """
+        return self._lookup(routing_key)
+
+    def is_bound(self, routing_key):
+        return len(self.match(routing_key)) > 0
+
+    def resolve(self, routing_key):
+        """
+        returns the callables that should process a message w/ routing_key
+        """
+        return tuple(
+            handler for binding_key in self.match(routing_key)
+            for handler in self.get_handlers(binding_key)
+        )
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+    def cache_clear(self):
+        self._lookup.cache_clear()
+
+
+ROUTING_TABLE = RoutingTable(BINDING_KEYS)
+
+
 ##########
 # config #
 ##########
@@ -85,6 +176,117 @@ class RMQConf:
     vhost: str = None
     transport: str = "amqp"
     app_id: str = "dsh"
+    workers: int = 0  # 0 means consume on the I/O thread w/ auto_ack
+    prefetch_count: int = 0  # 0 means use the number of workers
+
+
+#############
+# publisher #
+#############
+
+
+class RMQPublisher(object):
+    """
+    Keeps a single connection & channel open for publishing messages (rather
+    than opening a new connection for every message).  The channel is put into
+    transactional mode so that a batch of messages is confirmed by the broker
+    in a single round-trip.  If the connection has been dropped (ie: because
+    heartbeats were missed while idle) it is re-opened transparently.
+    """
+    def __init__(self, params, config):
+        self.params = params
+        self.config = config
+        self.connection = None
+        self.channel = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return (
+            self.connection is not None and self.connection.is_open and
+            self.channel is not None and self.channel.is_open
+        )
+
+    def connect(self):
+        self.close()
+        self.connection = pika.BlockingConnection(parameters=self.params)
+        # create channel to the broker
+        self.channel = self.connection.channel()
+        # declare the exchange to use passively (just checks it exists), in this case a topic exchange
+        self.channel.exchange_declare(
+            self.config.exchange, exchange_type="topic", passive=True
+        )
+        self.channel.tx_select()
+
+    def close(self):
+        try:
+            if self.connection is not None and self.connection.is_open:
+                self.connection.close()
+        except AMQPError as e:
+            logger.error(e)
+        finally:
+            self.connection = None
+            self.channel = None
+
+    def _publish_batch(self, messages):
+        if not self.is_open:
+            self.connect()
+        else:
+            # respond to any pending heartbeats, etc.
+            self.connection.process_data_events(time_limit=0)
+
+        for message, routing_key, message_id in messages:
+            properties = BasicProperties(
+                content_type="application/json",
+                content_encoding="utf-8",
+                delivery_mode=2,
+                app_id=self.config.app_id,
+                user_id=self.config.username,
+                message_id=message_id,
+            )
+            self.channel.basic_publish(
+                exchange=self.config.exchange,
+                routing_key=routing_key,
+                properties=properties,
+                body=message,
+            )
+        self.channel.tx_commit()
+
+    def publish_batch(self, messages):
+        """
+        publishes a list of (message, routing_key, message_id) tuples;
+        either all of the messages are published or none of them are
+        """
+        messages = list(messages)
+        if not messages:
+            return
+
+        with self.lock:
+            try:
+                self._publish_batch(messages)
+            except AMQPError as e:
+                # the connection may have gone stale; try once more w/ a new one
+                logger.warning(f"retrying publish w/ a new connection: {e}")
+                self.connect()
+                self._publish_batch(messages)
+
+
+_PUBLISHER = None
+_PUBLISHER_PID = None
+_PUBLISHER_LOCK = threading.Lock()
+
+
+def get_publisher(params, config):
+    """
+    returns the process-wide RMQPublisher
+    (a new one is created after forking, since connections cannot be shared)
+    """
+    global _PUBLISHER, _PUBLISHER_PID
+    with _PUBLISHER_LOCK:
+        if _PUBLISHER is None or _PUBLISHER_PID != os.getpid():
+            _PUBLISHER = RMQPublisher(params, config)
+            _PUBLISHER_PID = os.getpid()
+        return _PUBLISHER
 
 
 #####################
@@ -125,7 +327,18 @@ class RMQ(object):
             locale="en_US"
         )
 
-    def subscribe(self):
+    def subscribe(self, workers=None, prefetch_count=None):
+        """
+        consume messages from the queue;  if workers is 0 then messages are
+        auto-acknowledged and processed one at a time on the I/O thread,
+        otherwise they are processed concurrently by a pool of threads and only
+        acknowledged once their handlers have finished (and therefore committed)
+        """
+        if workers is None:
+            workers = int(self.config.workers)
+        if prefetch_count is None:
+            prefetch_count = int(self.config.prefetch_count) or workers
+
         logger.info("\n### STARTING PIKA ###\n")
         with pika.BlockingConnection(parameters=self.params) as connection:
             # create channel to the broker
@@ -147,12 +360,47 @@ class RMQ(object):
                     routing_key=key
                 )
 
-            channel.basic_consume(
-                queue=self.config.queue,
-                on_message_callback=self.callback,
-                auto_ack=True
-            )
-            channel.start_consuming()
+            # import all handlers before any messages arrive
+            ROUTING_TABLE.load()
+
+            if not workers:
+                channel.basic_consume(
+                    queue=self.config.queue,
+                    on_message_callback=self.callback,
+                    auto_ack=True
+                )
+                channel.start_consuming()
+                return
+
+            # the broker will not deliver more than prefetch_count unacknowledged
+            # messages, which also bounds the number of tasks queued in the pool
+            channel.basic_qos(prefetch_count=prefetch_count)
+
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="rmq-worker"
+            ) as executor:
+                channel.basic_consume(
+                    queue=self.config.queue,
+                    on_message_callback=partial(
+                        self.concurrent_callback,
+                        connection=connection,
+                        executor=executor,
+                    ),
+                    auto_ack=False,
+                )
+                try:
+                    channel.start_consuming()
+                finally:
+                    # let in-flight messages finish and flush their acks;
+                    # any message that is not acknowledged before the
+                    # connection closes will be redelivered by the broker
+                    executor.shutdown(wait=True)
+                    if connection.is_open:
+                        connection.process_data_events(time_limit=0)
+
+    @property
+    def publisher(self):
+        return get_publisher(self.params, self.config)
 
     def publish(self, message, routing_key, message_id):
 
@@ -160,57 +408,120 @@ class RMQ(object):
         logger.info("message: ")
         logger.info(message)
 
-        with pika.BlockingConnection(parameters=self.params) as connection:
-            # create channel to the broker
-            channel = connection.channel()
-            # declare the exchange to use passively (just checks it exists), in this case a topic exchange
-            channel.exchange_declare(
-                self.config.exchange, exchange_type="topic", passive=True
-            )
+        self.publisher.publish_batch([(message, routing_key, message_id)])
 
-            properties = BasicProperties(
-                content_type="application/json",
-                content_encoding="utf-8",
-                delivery_mode=2,
-                app_id=self.config.app_id,
-                user_id=self.config.username,
-                message_id=message_id,
-            )
-            channel.basic_publish(
-                exchange=self.config.exchange,
-                routing_key=routing_key,
-                properties=properties,
-                body=message,
-            )
+    def publish_batch(self, messages):
+        """
+        publishes a list of (message, routing_key, message_id) tuples
+        using a single round-trip to the broker
+        """
+        messages = list(messages)
+
+        for message, routing_key, message_id in messages:
+            logger.info(f"[{datetime.now()}] Received {routing_key}:")
+            logger.info("message: ")
+            logger.info(message)
+
+        self.publisher.publish_batch(messages)
 
     @staticmethod
-    def callback(
-        channel, method: Method, properties: BasicProperties, body: str
-    ):
+    def dispatch(method: Method, properties: BasicProperties, body: str):
+        """
+        passes the message to all matching handlers;
+        returns False if any of those handlers failed
+        """
         logger.info(f"[{datetime.now()}] Received {method.routing_key}:")
         logger.info("properties: ")
         logger.info(properties)
         logger.info("body: ")
         logger.info(body)
 
-        unhandled_method = True
-        for pattern, handlers in BINDING_KEYS.items():
-            if re.match(binding_key_to_regex(pattern), method.routing_key):
-                unhandled_method = False
-                for handler in handlers:
-                    try:
-                        callable = import_callable(handler)
-                        result = callable(
-                            json.loads(body),
-                            method=method,
-                            properties=properties
-                        )
-                        if result:
-                            logger.info(result)
-                    except Exception as e:
-                        logger.error(e)
-
-        if unhandled_method:
+        if not ROUTING_TABLE.is_bound(method.routing_key):
             logger.info(
                 f"'{method.routing_key}' does not match any BINDING_KEYS"
             )
+            return True
+
+        try:
+            handlers = ROUTING_TABLE.resolve(method.routing_key)
+        except Exception as e:
+            logger.error(e)
+            return False
+
+        succeeded = True
+        for callable in handlers:
+            try:
+                result = callable(
+                    json.loads(body), method=method, properties=properties
+                )
+                if result:
+                    logger.info(result)
+            except Exception as e:
+                logger.error(e)
+                succeeded = False
+
+        return succeeded
+
+    @staticmethod
+    def callback(
+        channel, method: Method, properties: BasicProperties, body: str
+    ):
+        RMQ.dispatch(method, properties, body)
+
+    @staticmethod
+    def concurrent_callback(
+        channel,
+        method: Method,
+        properties: BasicProperties,
+        body: str,
+        connection=None,
+        executor=None,
+    ):
+        """
+        called on the I/O thread; hands the message off to the pool
+        """
+        executor.submit(
+            RMQ.process_and_acknowledge,
+            connection,
+            channel,
+            method,
+            properties,
+            body,
+        )
+
+    @staticmethod
+    def process_and_acknowledge(
+        connection, channel, method: Method, properties: BasicProperties,
+        body: str
+    ):
+        """
+        called on a worker thread; processes the message and then schedules
+        its (n)ack on the I/O thread (pika channels are not thread-safe)
+        """
+        try:
+            succeeded = RMQ.dispatch(method, properties, body)
+        except Exception as e:
+            logger.error(e)
+            succeeded = False
+        finally:
+            # each worker thread has its own db connection
+            close_old_connections()
+
+        if succeeded:
+            acknowledge = partial(
+                channel.basic_ack, delivery_tag=method.delivery_tag
+            )
+        else:
+            # a failed message is requeued once (in case the failure was
+            # transient); if it fails again it is discarded
+            acknowledge = partial(
+                channel.basic_nack,
+                delivery_tag=method.delivery_tag,
+                requeue=not method.redelivered,
+            )
+
+        try:
+            connection.add_callback_threadsafe(acknowledge)
+        except Exception as e:
+            # the connection has closed; the broker will redeliver the message
+            logger.error(e)
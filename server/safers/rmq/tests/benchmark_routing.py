@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+# Micro-benchmark comparing the compiled RoutingTable w/ the original
+# per-message loop over BINDING_KEYS (run from the "server" directory):
+# $ python -m safers.rmq.tests.benchmark_routing
+
+
+def legacy_resolve(routing_key):
+    """
+    the way that RMQ.callback used to resolve handlers for every message
+    """
+    import re
+    from safers.rmq.rmq import BINDING_KEYS, binding_key_to_regex, import_callable
+
+    handlers = []
+    for pattern, pattern_handlers in BINDING_KEYS.items():
+        if re.match(binding_key_to_regex(pattern), routing_key):
+            for handler in pattern_handlers:
+                handlers.append(import_callable(handler))
+    return tuple(handlers)
+
+
+def run_benchmark(n_messages=100000):
+    import random
+    import timeit
+
+    from safers.rmq.rmq import ROUTING_TABLE, RMQ_USER
+
+    routing_keys = [
+        f"alert.sem.{RMQ_USER}",
+        f"notification.sem.{RMQ_USER}",
+        "event.social.wildfire",
+        "status.test.key",
+        "unbound.routing.key",
+    ] + [
+        f"event.camera.camera-{i}.image" for i in range(10)
+    ] + [
+        f"status.brn.36001.{RMQ_USER}.dsh-{i}" for i in range(500)
+    ]  # yapf: disable
+    messages = random.choices(routing_keys, k=n_messages)
+
+    for routing_key in routing_keys:
+        assert legacy_resolve(routing_key) == ROUTING_TABLE.resolve(routing_key)
+
+    ROUTING_TABLE.cache_clear()
+
+    legacy_time = timeit.timeit(
+        lambda: [legacy_resolve(routing_key) for routing_key in messages],
+        number=1
+    )
+    routing_table_time = timeit.timeit(
+        lambda: [ROUTING_TABLE.resolve(routing_key) for routing_key in messages],
+        number=1
+    )
+
+    print(f"resolved {n_messages} routing_keys")
+    print(f"legacy loop:   {legacy_time:.4f}s ({legacy_time / n_messages * 1e6:.2f}µs per message)")  # yapf: disable
+    print(f"routing table: {routing_table_time:.4f}s ({routing_table_time / n_messages * 1e6:.2f}µs per message)")  # yapf: disable
+    print(f"speedup:       {legacy_time / routing_table_time:.1f}x")
+    print(ROUTING_TABLE.cache_info())
+
+
+if __name__ == "__main__":
+    import os
+
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    run_benchmark()
@@ -1,6 +1,9 @@
 import pytest
 import re
+import threading
+from unittest import mock
 
+from safers.rmq.buffers import MessageBuffer
 from safers.rmq.rmq import *
 
 
@@ -22,3 +25,222 @@ class TestRMQBindingKeys:
         assert re.match(binding_key_to_regex(pattern4), routing_key) is None
         assert re.match(binding_key_to_regex(pattern5), routing_key) is not None
         assert re.match(binding_key_to_regex(pattern6), routing_key) is None
+
+
+def _handler_1(message_body, **kwargs):
+    return "handler_1"
+
+
+def _handler_2(message_body, **kwargs):
+    return "handler_2"
+
+
+class TestRMQRoutingTable:
+    def test_resolve(self):
+
+        routing_table = RoutingTable({
+            "some.#": (_handler_1, ),
+            "some.*.key": (_handler_2, ),
+            "other.*": (),
+        })
+
+        assert routing_table.resolve("some.test.key") == (_handler_1, _handler_2)
+        assert routing_table.resolve("some.test.other") == (_handler_1, )
+        assert routing_table.resolve("invalid.test.key") == ()
+
+        # a routing_key can match a binding_key w/ no handlers
+        assert routing_table.is_bound("other.test") is True
+        assert routing_table.resolve("other.test") == ()
+        assert routing_table.is_bound("other.test.key") is False
+
+    def test_resolve_is_cached(self):
+
+        routing_table = RoutingTable({"some.#": (_handler_1, )})
+
+        routing_table.resolve("some.test.key")
+        routing_table.resolve("some.test.key")
+        routing_table.resolve("some.other.key")
+
+        cache_info = routing_table.cache_info()
+        assert cache_info.hits == 1
+        assert cache_info.misses == 2
+
+    def test_resolve_matches_binding_key_to_regex(self):
+
+        routing_keys = [
+            f"alert.sem.{RMQ_USER}",
+            "event.camera.123.456",
+            "event.social.wildfire",
+            f"status.brn.36001.{RMQ_USER}.dsh-1",
+            "status.test.key",
+            "status.test.key.extra",
+            "invalid.key",
+        ]
+        for routing_key in routing_keys:
+            expected_binding_keys = tuple(
+                binding_key for binding_key in BINDING_KEYS.keys()
+                if re.match(binding_key_to_regex(binding_key), routing_key)
+            )
+            assert ROUTING_TABLE.match(routing_key) == expected_binding_keys
+
+
+class TestRMQConcurrentConsumer:
+    class MockConnection:
+        def add_callback_threadsafe(self, callback):
+            callback()
+
+    @pytest.mark.parametrize(
+        "succeeded, redelivered, expected_ack, expected_requeue", [
+            (True, False, "basic_ack", None),
+            (False, False, "basic_nack", True),
+            (False, True, "basic_nack", False),
+        ]
+    )
+    def test_process_and_acknowledge(
+        self, monkeypatch, succeeded, redelivered, expected_ack,
+        expected_requeue
+    ):
+        monkeypatch.setattr(RMQ, "dispatch", lambda *args: succeeded)
+
+        channel = mock.Mock()
+        method = mock.Mock(delivery_tag=1, redelivered=redelivered)
+
+        RMQ.process_and_acknowledge(
+            self.MockConnection(), channel, method, None, "{}"
+        )
+
+        acknowledge = getattr(channel, expected_ack)
+        acknowledge.assert_called_once()
+        assert acknowledge.call_args.kwargs["delivery_tag"] == 1
+        if expected_requeue is not None:
+            assert acknowledge.call_args.kwargs["requeue"] == expected_requeue
+
+    def test_dispatch_reports_failure(self, monkeypatch):
+        def _failing_handler(message_body, **kwargs):
+            raise ValueError("failed")
+
+        monkeypatch.setattr(
+            "safers.rmq.rmq.ROUTING_TABLE",
+            RoutingTable({
+                "some.#": (_handler_1, ),
+                "failing.#": (_handler_1, _failing_handler),
+            })
+        )
+
+        assert RMQ.dispatch(mock.Mock(routing_key="some.key"), None, "{}")
+        assert not RMQ.dispatch(
+            mock.Mock(routing_key="failing.key"), None, "{}"
+        )
+        # unbound messages are not failures
+        assert RMQ.dispatch(mock.Mock(routing_key="unbound.key"), None, "{}")
+
+
+class TestRMQPublisher:
+    @pytest.fixture
+    def mock_blocking_connection(self, monkeypatch):
+        mock_blocking_connection = mock.Mock()
+        monkeypatch.setattr(
+            "safers.rmq.rmq.pika.BlockingConnection", mock_blocking_connection
+        )
+        return mock_blocking_connection
+
+    @pytest.fixture
+    def publisher(self):
+        config = RMQConf(
+            username="username",
+            password="password",
+            host="host",
+            queue="queue",
+        )
+        return RMQPublisher(None, config)
+
+    def test_publish_batch_reuses_connection(
+        self, mock_blocking_connection, publisher
+    ):
+        messages = [("{}", f"some.key.{i}", str(i)) for i in range(6)]
+
+        publisher.publish_batch(messages)
+        publisher.publish_batch(messages)
+
+        assert mock_blocking_connection.call_count == 1
+        channel = publisher.channel
+        assert channel.basic_publish.call_count == 12
+        # one round-trip per batch
+        assert channel.tx_commit.call_count == 2
+
+    def test_publish_batch_reconnects(
+        self, mock_blocking_connection, publisher
+    ):
+        messages = [("{}", "some.key", "1")]
+
+        publisher.publish_batch(messages)
+
+        # the 1st attempt fails, the 2nd attempt (w/ a new connection) succeeds
+        publisher.channel.basic_publish.side_effect = [
+            pika.exceptions.StreamLostError(), None
+        ]
+
+        publisher.publish_batch(messages)
+
+        assert mock_blocking_connection.call_count == 2
+
+
+class TestRMQMessageBuffer:
+    def test_batches(self):
+
+        N_MESSAGES = 10
+        MAX_SIZE = 4
+
+        batches = []
+
+        def _process_batch(message_bodies):
+            batches.append(list(message_bodies))
+            return [message_body * 10 for message_body in message_bodies]
+
+        message_buffer = MessageBuffer(
+            _process_batch, max_size=MAX_SIZE, max_wait=0.1
+        )
+
+        results = {}
+
+        def _consumer(message_body):
+            results[message_body] = message_buffer.add(message_body)
+
+        threads = [
+            threading.Thread(target=_consumer, args=(i, ))
+            for i in range(N_MESSAGES)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # every message gets its own result...
+        assert results == {i: i * 10 for i in range(N_MESSAGES)}
+        # from a batch no bigger than MAX_SIZE
+        assert sum(map(len, batches)) == N_MESSAGES
+        assert all(len(batch) <= MAX_SIZE for batch in batches)
+
+    def test_batch_exception(self):
+        def _process_batch(message_bodies):
+            raise ValueError("invalid batch")
+
+        message_buffer = MessageBuffer(
+            _process_batch, max_size=2, max_wait=0.01
+        )
+        with pytest.raises(ValueError):
+            message_buffer.add({})
+
+    def test_message_exception(self):
+        def _process_batch(message_bodies):
+            return [
+                ValueError("invalid message") if message_body is None else
+                message_body for message_body in message_bodies
+            ]
+
+        message_buffer = MessageBuffer(
+            _process_batch, max_size=1, max_wait=0.01
+        )
+        assert message_buffer.add({}) == {}
+        with pytest.raises(ValueError):
+            message_buffer.add(None)
@@ -1,15 +1,24 @@
+from django.conf import settings
 from django.urls import include, path, re_path
 
 from rest_framework import routers
 
 from safers.social.views import (
+    AsyncTweetView,
     TweetView,
 )
 
+# under ASGI the gateway-proxy views can be served asynchronously
+ASYNC_VIEWS = settings.SAFERS_ASYNC_PROXY_VIEWS
+
 api_router = routers.DefaultRouter()
 api_urlpatterns = [
     path("", include(api_router.urls)),
-    path("social/tweets", TweetView.as_view(), name="tweet-list"),
+    path(
+        "social/tweets",
+        (AsyncTweetView if ASYNC_VIEWS else TweetView).as_view(),
+        name="tweet-list",
+    ),
 ]
 
 urlpatterns = []
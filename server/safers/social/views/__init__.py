@@ -1 +1 @@
-from .views_tweets import TweetView
\ No newline at end of file
+from .views_tweets import AsyncTweetView, TweetView
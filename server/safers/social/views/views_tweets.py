@@ -1,5 +1,4 @@
-import requests
-from urllib.parse import urljoin
+from asgiref.sync import sync_to_async
 
 from django.conf import settings
 from django.contrib.gis import geos
@@ -13,6 +12,8 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 
 from safers.core.authentication import TokenAuthentication
+from safers.core.clients import ASYNC_GATEWAY_CLIENT, GATEWAY_CLIENT
+from safers.core.views import AsyncAPIViewMixin
 
 from safers.social.models import Tweet
 from safers.social.serializers import TweetSerializer, TweetViewSerializer
@@ -25,6 +26,8 @@ class TweetView(views.APIView):
 
     permission_classes = [IsAuthenticated]
 
+    GATEWAY_URL_PATH = "/api/services/app/Social/GetEvents"
+
     def get_serializer_context(self):
         return {
             'request': self.request, 'format': self.format_kwarg, 'view': self
@@ -44,16 +47,7 @@ class TweetView(views.APIView):
 
         return data
 
-    @extend_schema(
-        request=TweetViewSerializer,
-        responses={status.HTTP_200_OK: TweetSerializer(many=True)}
-    )
-    def get(self, request, *args, **kwargs):
-        """
-        Return all tweets
-        """
-
-        GATEWAY_URL_PATH = "/api/services/app/Social/GetEvents"
+    def get_proxy_params(self, request):
 
         view_serializer = TweetViewSerializer(
             data=request.query_params,
@@ -72,15 +66,9 @@ class TweetView(views.APIView):
             proxy_params["NorthEast"] = (max_y, max_x)
             proxy_params["SouthWest"] = (min_y, min_x)
 
-        try:
-            response = requests.get(
-                urljoin(settings.SAFERS_GATEWAY_URL, GATEWAY_URL_PATH),
-                auth=TokenAuthentication(request.auth),
-                params=proxy_params,
-            )
-            response.raise_for_status()
-        except Exception as e:
-            raise APIException(e)
+        return proxy_params
+
+    def get_tweets_response(self, proxy_data):
 
         tweets = [
             Tweet(
@@ -90,7 +78,7 @@ class TweetView(views.APIView):
                 geometry=geos.Point(
                     event["hotspots_centroid"]["coordinates"]
                 ) if event.get("hotspots_centroid") else None,            )
-            for event in response.json()["items"]
+            for event in proxy_data["items"]
             for tweet in event.get("tweets", [])
         ]  # yapf: disable
         model_serializer = TweetSerializer(
@@ -99,6 +87,53 @@ class TweetView(views.APIView):
 
         return Response(data=model_serializer.data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        request=TweetViewSerializer,
+        responses={status.HTTP_200_OK: TweetSerializer(many=True)}
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Return all tweets
+        """
+
+        proxy_params = self.get_proxy_params(request)
+
+        try:
+            # identical concurrent requests share a single upstream request
+            proxy_data = GATEWAY_CLIENT.get(
+                self.GATEWAY_URL_PATH,
+                auth=TokenAuthentication(request.auth),
+                params=proxy_params,
+            )
+        except Exception as e:
+            raise APIException(e)
+
+        return self.get_tweets_response(proxy_data)
+
+
+class AsyncTweetView(AsyncAPIViewMixin, TweetView):
+    @extend_schema(
+        request=TweetViewSerializer,
+        responses={status.HTTP_200_OK: TweetSerializer(many=True)}
+    )
+    async def get(self, request, *args, **kwargs):
+        """
+        Return all tweets
+        """
+
+        proxy_params = await sync_to_async(self.get_proxy_params)(request)
+
+        try:
+            proxy_data = await ASYNC_GATEWAY_CLIENT.get(
+                self.GATEWAY_URL_PATH,
+                auth=TokenAuthentication(request.auth),
+                params=proxy_params,
+            )
+        except Exception as e:
+            raise APIException(e)
+
+        return self.get_tweets_response(proxy_data)
+
 
 """
 SAMPLE PROXY DATA SHAPE:
@@ -0,0 +1,80 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class AuthenticatedUserCache(object):
+    """
+    A short-lived, bounded (LRU) cache of authenticated users (w/ their
+    default_aoi already loaded) keyed by auth_id; this saves looking up the
+    user on every (polling) request.  Entries are invalidated when the User
+    or their default_aoi is saved (see "safers/users/signals.py"), and expire
+    after `timeout` seconds regardless, in case they were changed by another
+    process.  Each call to `get` returns a copy, so that changes made to the
+    user during one request do not leak into another.
+    """
+    def __init__(self, max_size=1024, timeout=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, auth_id):
+        key = str(auth_id)
+        with self.lock:
+            user, expires_at = self.users.get(key, (None, None))
+            if user is not None and time.monotonic() > expires_at:
+                del self.users[key]
+                user = None
+            if user is None:
+                self.misses += 1
+                return None
+            self.users.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(user)
+
+    def set(self, auth_id, user):
+        if self.max_size <= 0 or self.timeout <= 0:
+            return
+        key = str(auth_id)
+        user = copy.deepcopy(user)
+        with self.lock:
+            self.users[key] = (user, time.monotonic() + self.timeout)
+            self.users.move_to_end(key)
+            while len(self.users) > self.max_size:
+                self.users.popitem(last=False)
+
+    def invalidate(self, auth_id):
+        with self.lock:
+            self.users.pop(str(auth_id), None)
+
+    def invalidate_aoi(self, aoi_id):
+        with self.lock:
+            for key, (user, _) in list(self.users.items()):
+                if user.default_aoi_id == aoi_id:
+                    del self.users[key]
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "size": len(self.users),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+AUTHENTICATED_USER_CACHE = AuthenticatedUserCache(
+    max_size=settings.SAFERS_AUTH_USER_CACHE_SIZE,
+    timeout=settings.SAFERS_AUTH_USER_CACHE_TIMEOUT,
+)
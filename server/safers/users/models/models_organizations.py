@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 from safers.core.clients import GATEWAY_CLIENT
@@ -15,6 +16,7 @@ class OrganizationManager(CachedTransientModelManager):
     queryset_class = OrganizationQuerySet
 
     cache_key = "organizations"
+    cache_timeout = settings.SAFERS_ORGANIZATIONS_CACHE_TIMEOUT
 
     def get_transient_queryset_data(self):
         organizations_data = GATEWAY_CLIENT.get_organizations(timeout=10)
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+
+from safers.aois.models import Aoi
+
+from safers.users.caches import AUTHENTICATED_USER_CACHE
+
+UserModel = get_user_model()
+
+
+def user_changed_handler(sender, *args, **kwargs):
+    """
+    If a User has changed, then any cached copy of it is stale.
+    """
+    instance = kwargs["instance"]
+    if instance.auth_id:
+        AUTHENTICATED_USER_CACHE.invalidate(instance.auth_id)
+
+
+def aoi_changed_handler(sender, *args, **kwargs):
+    """
+    If an Aoi has changed, then any cached Users w/ it as their default_aoi
+    are stale.
+    """
+    instance = kwargs["instance"]
+    AUTHENTICATED_USER_CACHE.invalidate_aoi(instance.pk)
+
+
+post_save.connect(
+    user_changed_handler,
+    sender=UserModel,
+    dispatch_uid="safers_post_save_user_handler",
+)
+
+post_delete.connect(
+    user_changed_handler,
+    sender=UserModel,
+    dispatch_uid="safers_post_delete_user_handler",
+)
+
+post_save.connect(
+    aoi_changed_handler,
+    sender=Aoi,
+    dispatch_uid="safers_post_save_aoi_handler",
+)
@@ -1,21 +1,30 @@
+from django.conf import settings
 from django.urls import include, path, re_path
 
 from rest_framework import routers
 
 from .views import (
+    AsyncTeamsView,
     OrganizationView,
     RoleView,
     UserView,
     teams_view,
 )
 
+# under ASGI the gateway-proxy views can be served asynchronously
+ASYNC_VIEWS = settings.SAFERS_ASYNC_PROXY_VIEWS
+
 api_router = routers.DefaultRouter()
 api_urlpatterns = [
     path("", include(api_router.urls)),
     path("users/<slug:user_id>", UserView.as_view(), name="users"),
     path("organizations/", OrganizationView.as_view(), name="organizations"),
     path("roles/", RoleView.as_view(), name="roles"),
-    path("teams/", teams_view, name="teams"),
+    path(
+        "teams/",
+        AsyncTeamsView.as_view() if ASYNC_VIEWS else teams_view,
+        name="teams",
+    ),
 ]
 
 urlpatterns = []
@@ -1,4 +1,4 @@
 from .views_organizations import OrganizationView
 from .views_roles import RoleView
-from .views_teams import teams_view
+from .views_teams import AsyncTeamsView, teams_view
 from .views_users import UserView
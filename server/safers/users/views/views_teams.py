@@ -1,4 +1,6 @@
-from rest_framework import status
+from asgiref.sync import sync_to_async
+
+from rest_framework import status, views
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -6,7 +8,8 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiTypes
 
 from safers.core.authentication import TokenAuthentication
-from safers.core.clients import GATEWAY_CLIENT
+from safers.core.clients import ASYNC_GATEWAY_CLIENT, GATEWAY_CLIENT
+from safers.core.views import AsyncAPIViewMixin
 
 _teams_view_response = OpenApiResponse(
     OpenApiTypes.ANY,
@@ -27,6 +30,23 @@ _teams_view_response = OpenApiResponse(
 )
 
 
+def serialize_teams(teams_data):
+    return [
+        {
+            "id": team["id"],
+            "name": team["name"],
+            "members": [
+                {
+                    "id": member["id"],
+                    "name": member["displayName"],
+                }
+                for member in team["members"]
+            ]
+        }
+        for team in teams_data
+    ]  # yapf: disable
+
+
 @extend_schema(responses={
     status.HTTP_200_OK: _teams_view_response,
 })
@@ -44,19 +64,30 @@ def teams_view(request):
     else:
         teams_data = []
 
-    teams = [
-        {
-            "id": team["id"],
-            "name": team["name"],
-            "members": [
-                {
-                    "id": member["id"],
-                    "name": member["displayName"],
-                }
-                for member in team["members"]
-            ]
-        }
-        for team in teams_data
-    ]  # yapf: disable
+    return Response(serialize_teams(teams_data), status=status.HTTP_200_OK)
+
+
+class AsyncTeamsView(AsyncAPIViewMixin, views.APIView):
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(responses={
+        status.HTTP_200_OK: _teams_view_response,
+    })
+    async def get(self, request, *args, **kwargs):
+        """
+        Returns a summary of teams for the current user
+        """
+        user = request.user
+        # (roles are read from the cache, which is in the db)
+        is_professional = await sync_to_async(lambda: user.is_professional)()
+        if is_professional:
+            teams_data = (
+                await ASYNC_GATEWAY_CLIENT.get_teams(
+                    auth=TokenAuthentication(request.auth),
+                )
+            )["data"]
+        else:
+            teams_data = []
 
-    return Response(teams, status=status.HTTP_200_OK)
+        return Response(serialize_teams(teams_data), status=status.HTTP_200_OK)